@@ -1,3 +1,4 @@
+import sqlite3
 import streamlit as st
 from podman import PodmanClient
 from components import (
@@ -9,46 +10,112 @@ from components import (
     volume_tab,
     network_tab,
     secret_tab,
-    usage_details
+    usage_details,
+    cleanup,
+    jobs,
+    profiler,
+    usage_trends
 )
+from utils import api_server, prefetch_utils, usage_history
+
+@st.cache_resource(show_spinner=False)
+def start_api_sidecar(uri):
+    """
+    Starts the read-only inventory API once per process, if `PODMAN_STREAMLIT_API_PORT` is set.
+
+    Args:
+        uri (str): The Podman service URI to serve snapshots of.
+
+    Returns:
+        ThreadingHTTPServer: The running server, or None if the API is disabled or couldn't start.
+    """
+    try:
+        return api_server.start_sidecar(uri)
+    except (OSError, ValueError, OverflowError) as e:
+        # a port or TTL that isn't a number raises ValueError, a port out of range OverflowError;
+        # replayed on every rerun from the cache, so the port isn't retried each time
+        st.warning(f"The inventory API couldn't start: {e}")
+        return None
+
+@st.cache_resource(show_spinner=False)
+def start_usage_recorder(uri):
+    """
+    Starts recording disk usage snapshots once per process, unless `PODMAN_STREAMLIT_USAGE_INTERVAL` is 0.
+
+    Args:
+        uri (str): The Podman service URI to record.
+
+    Returns:
+        Recorder: The running recorder, or None if recording is off or the history couldn't be opened.
+    """
+    try:
+        return usage_history.start_recorder(uri)
+    except (OSError, sqlite3.Error) as e:
+        st.warning(f"Disk usage history isn't being recorded: {e}")
+        return None
 
 def main():
     st.set_page_config(page_title="Podman Streamlit 🦭", page_icon="🦭", layout="wide")
-    
-    header.show()
+
+    # shown first, so the switch keeps its state on reruns that stop early
+    profiler.show()
+
+    with profiler.rerun("app"):
+        show_page()
+
+def show_page():
+    start_api_sidecar(next(iter(sidebar.connections.values())))
+
+    with profiler.section("Header"):
+        header.show()
 
     try:
         selected_uri = sidebar.show_uri_selector()
+        # only connections someone opened are recorded, not every configured one
+        start_usage_recorder(selected_uri)
 
-        with PodmanClient(base_url=selected_uri, identity="~/.ssh/id_ed25519") as client:
+        # the listings every tab needs are fetched together up front, so the run waits for the slowest only
+        with PodmanClient(base_url=selected_uri, identity="~/.ssh/id_ed25519") as client, prefetch_utils.prefetched(selected_uri):
 
-            sidebar.show_details(client)
+            with profiler.section("Sidebar"):
+                sidebar.show_details(client)
+
+            with profiler.section("Jobs"):
+                jobs.show(selected_uri)
 
             containerTab, podTab, imageTab, volumeTab, networkTab, secretTab = st.tabs(
                 ["Containers", "Pods", "Images", "Volumes", "Networks", "Secrets"]
             )
 
-            with containerTab:
+            with containerTab, profiler.section("Containers"):
                 container_tab.show(client)
 
-            with podTab:
+            with podTab, profiler.section("Pods"):
                 pod_tab.show(client)
 
-            with imageTab:
+            with imageTab, profiler.section("Images"):
                 image_tab.show(client)
             
-            with volumeTab:
+            with volumeTab, profiler.section("Volumes"):
                 volume_tab.show(client)
 
-            with networkTab:
+            with networkTab, profiler.section("Networks"):
                 network_tab.show(client)
 
-            with secretTab:
+            with secretTab, profiler.section("Secrets"):
                 secret_tab.show(client)  
                     
-        with st.expander("Resource Usage Details"):
+        with st.expander("Resource Usage Details"), profiler.section("Usage"):
             usage_details.show(client)
 
+        with st.expander("📈 Disk Usage Trends"), profiler.section("Usage Trends"):
+            usage_trends.show(client, selected_uri)
+
+        with st.expander("🧹 Cleanup"), profiler.section("Cleanup"):
+            cleanup.show(client)
+
+        sidebar.show_session_footprint()
+
     except Exception as e:
         st.exception(e)
 
@@ -0,0 +1,296 @@
+"""
+Headless command-line interface to the Podman inventory and bulk actions, without the Streamlit UI.
+
+Usage:
+    python cli.py list containers --format csv --output containers.csv
+    python cli.py list images --format parquet --output images.parquet
+    python cli.py action containers stop --match '^web-' --state running
+    python cli.py action images remove 3f1a2b4c5d6e --workers 4
+    python cli.py quadlet containers --match '^web-' --output-dir ~/.config/containers/systemd
+    python cli.py serve --port 8502 --ttl 5
+    python cli.py usage record
+    python cli.py usage changes --days 30 --format csv
+
+The connection defaults to `PODMAN_STREAMLIT_URI`, like the web UI.
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+import threading
+import time
+from datetime import datetime
+from podman import PodmanClient
+from utils import api_server, bulk_utils, inventory_utils, quadlet_utils, usage_history
+
+DEFAULT_URI = os.environ.get("PODMAN_STREAMLIT_URI", "unix:///run/user/1000/podman/podman.sock")
+FORMATS = ("json", "jsonl", "csv", "parquet")
+
+def to_cell(value):
+    """
+    Flattens a row value into a single CSV cell.
+
+    Args:
+        value: The value to flatten.
+
+    Returns:
+        str: Lists are joined with ", ", datetimes are ISO 8601.
+    """
+    if isinstance(value, (list, tuple)):
+        return ", ".join(str(item) for item in value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+def write_rows(rows, output_format, stream):
+    """
+    Writes rows as they arrive, so large inventories are never held in memory except for Parquet.
+
+    Args:
+        rows (iterable): Dictionaries to write.
+        output_format (str): One of `FORMATS`.
+        stream (file): A text stream, or a binary one for Parquet.
+
+    Returns:
+        int: The number of rows written.
+    """
+    count = 0
+    if output_format == "jsonl":
+        for count, row in enumerate(rows, 1):
+            stream.write(json.dumps(row, default=inventory_utils.to_json, ensure_ascii=False) + "\n")
+            stream.flush()
+    elif output_format == "json":
+        stream.write("[")
+        for count, row in enumerate(rows, 1):
+            stream.write(("," if count > 1 else "") + "\n  " + json.dumps(row, default=inventory_utils.to_json, ensure_ascii=False))
+        stream.write("\n]\n" if count else "]\n")
+    elif output_format == "csv":
+        writer = None
+        for count, row in enumerate(rows, 1):
+            if writer is None:
+                writer = csv.DictWriter(stream, fieldnames=list(row), extrasaction="ignore")
+                writer.writeheader()
+            writer.writerow({key: to_cell(value) for key, value in row.items()})
+            stream.flush()
+    elif output_format == "parquet":
+        import pandas as pd
+
+        frame = pd.DataFrame([{key: to_cell(value) for key, value in row.items()} for row in rows])
+        frame.to_parquet(stream, index=False)
+        count = len(frame)
+    else:
+        raise ValueError(f"Unknown output format '{output_format}', expected one of {', '.join(FORMATS)}")
+    return count
+
+def list_command(client, args):
+    """
+    Dumps the inventory of one kind of resource.
+
+    Args:
+        client (PodmanClient): A client object used to connect to the container runtime.
+        args (argparse.Namespace): The parsed arguments.
+
+    Returns:
+        int: The exit code.
+    """
+    if args.format == "parquet" and not args.output:
+        print("Parquet output needs --output.", file=sys.stderr)
+        return 2
+    rows = inventory_utils.iter_rows(client, args.kind, max_workers=args.workers)
+    if args.output:
+        mode, encoding = ("wb", None) if args.format == "parquet" else ("w", "utf-8")
+        with open(args.output, mode, encoding=encoding, newline="" if mode == "w" else None) as stream:
+            count = write_rows(rows, args.format, stream)
+        print(f"Wrote {count} {args.kind} to {args.output}", file=sys.stderr)
+    else:
+        write_rows(rows, args.format, sys.stdout)
+    return 0
+
+def action_command(client, args):
+    """
+    Runs a bulk action and streams one JSON line per object as each finishes.
+
+    Args:
+        client (PodmanClient): A client object used to connect to the container runtime.
+        args (argparse.Namespace): The parsed arguments.
+
+    Returns:
+        int: 0 if every object succeeded, 1 if any failed, 2 if nothing was selected.
+    """
+    if args.action not in bulk_utils.ACTIONS[args.kind]:
+        print(
+            f"{args.kind} support: {', '.join(bulk_utils.ACTIONS[args.kind])}",
+            file=sys.stderr
+        )
+        return 2
+    if not (args.names or args.match or args.state or args.all):
+        print("Select objects by name, --match, --state or --all.", file=sys.stderr)
+        return 2
+
+    objects = bulk_utils.select_objects(client, args.kind, args.names, args.match, args.state)
+    if not objects:
+        print(f"No {args.kind} matched.", file=sys.stderr)
+        return 2
+    if args.dry_run:
+        for obj in objects:
+            print(json.dumps({"Name": bulk_utils.object_names(obj)[0], "ID": obj.short_id, "Action": args.action}))
+        return 0
+
+    failed = 0
+    for result in bulk_utils.run_action(args.kind, args.action, objects, max_workers=args.workers):
+        failed += result["Status"] != "ok"
+        print(json.dumps(result, ensure_ascii=False), flush=True)
+    print(f"{args.action}: {len(objects) - failed} succeeded, {failed} failed", file=sys.stderr)
+    return 1 if failed else 0
+
+def quadlet_command(client, args):
+    """
+    Generates Quadlet units for the selected objects, to stdout or one file per unit.
+
+    Args:
+        client (PodmanClient): A client object used to connect to the container runtime.
+        args (argparse.Namespace): The parsed arguments.
+
+    Returns:
+        int: 0 on success, 2 if nothing was selected.
+    """
+    if not (args.names or args.match or args.all):
+        print("Select objects by name, --match or --all.", file=sys.stderr)
+        return 2
+    objects = bulk_utils.select_objects(client, args.kind, args.names, args.match)
+    if not objects:
+        print(f"No {args.kind} matched.", file=sys.stderr)
+        return 2
+    if args.kind in ("containers", "pods"):
+        # list() payloads don't carry the create command
+        objects = inventory_utils.reload_all(objects, args.workers)
+
+    build = quadlet_utils.UNIT_BUILDERS[args.kind]
+    count = 0
+    for count, obj in enumerate(objects, 1):
+        file_name, text = build(obj.attrs, install=args.install)
+        if args.output_dir:
+            with open(os.path.join(args.output_dir, file_name), "w", encoding="utf-8") as stream:
+                stream.write(text)
+        else:
+            sys.stdout.write(text + "\n")
+    if args.output_dir:
+        print(f"Wrote {count} units to {args.output_dir}", file=sys.stderr)
+    return 0
+
+def serve_command(client, args):
+    """
+    Serves cached inventory snapshots over the read-only JSON API until interrupted.
+
+    Args:
+        client (PodmanClient): Unused; the API opens its own connections when refreshing.
+        args (argparse.Namespace): The parsed arguments.
+
+    Returns:
+        int: The exit code.
+    """
+    cache = api_server.SnapshotCache(args.uri, args.identity, ttl=args.ttl, max_workers=args.workers)
+    server = api_server.serve(cache, args.host, args.port)
+    print(f"Serving inventory snapshots on http://{args.host}:{args.port}{api_server.API_PREFIX}", file=sys.stderr)
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+    return 0
+
+def usage_command(client, args):
+    """
+    Records a disk usage snapshot, or reports the growth and per-object changes over the last days.
+
+    Args:
+        client (PodmanClient): A client object used to connect to the container runtime.
+        args (argparse.Namespace): The parsed arguments.
+
+    Returns:
+        int: The exit code.
+    """
+    history = usage_history.open_history()
+    if args.usage_action == "record":
+        written = usage_history.take_snapshot(history, client, args.uri)
+        print(f"Recorded a snapshot of {args.uri} with {written} changed sizes in {history.path}", file=sys.stderr)
+        return 0
+
+    since = time.time() - args.days * 86400
+    totals = history.totals(args.uri, since)
+    if not totals:
+        print(f"No snapshots of {args.uri} in the last {args.days:g} days.", file=sys.stderr)
+        return 2
+    used = [row["used"] if row["used"] is not None else row["images"] + row["containers"] + row["volumes"] for row in totals]
+    forecast = usage_history.linear_forecast([row["taken"] for row in totals], used, totals[-1]["capacity"])
+    if forecast:
+        summary = f"Growing {forecast['slope'] * 86400 / 1024 ** 3:+.2f} GB/day"
+        if forecast["full_at"]:
+            summary += f", full around {datetime.fromtimestamp(forecast['full_at']):%Y-%m-%d}"
+        print(summary, file=sys.stderr)
+    write_rows(history.deltas(args.uri, since), args.format, sys.stdout)
+    return 0
+
+def build_parser():
+    """
+    Builds the command-line parser.
+
+    Returns:
+        argparse.ArgumentParser: The parser.
+    """
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--uri", default=DEFAULT_URI, help="The Podman service URI")
+    parser.add_argument("--identity", default="~/.ssh/id_ed25519", help="The SSH identity for ssh:// URIs")
+    parser.add_argument("--workers", type=int, default=16, help="How many objects to inspect or act on at once")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    list_parser = commands.add_parser("list", help="Dump the inventory of one kind of resource")
+    list_parser.add_argument("kind", choices=inventory_utils.KINDS)
+    list_parser.add_argument("--format", choices=FORMATS, default="jsonl")
+    list_parser.add_argument("--output", help="Write to this file instead of stdout")
+    list_parser.set_defaults(handler=list_command)
+
+    action_parser = commands.add_parser("action", help="Run an action on many objects concurrently")
+    action_parser.add_argument("kind", choices=list(bulk_utils.ACTIONS))
+    action_parser.add_argument("action", choices=sorted({a for actions in bulk_utils.ACTIONS.values() for a in actions}))
+    action_parser.add_argument("names", nargs="*", help="Names, tags or IDs to act on")
+    action_parser.add_argument("--match", help="A regular expression matched against names, tags and IDs")
+    action_parser.add_argument("--state", help="Only act on containers or pods in this state")
+    action_parser.add_argument("--all", action="store_true", help="Act on every object of this kind")
+    action_parser.add_argument("--dry-run", action="store_true", help="List the selected objects without acting on them")
+    action_parser.set_defaults(handler=action_command)
+
+    quadlet_parser = commands.add_parser("quadlet", help="Generate Quadlet units from existing objects")
+    quadlet_parser.add_argument("kind", choices=list(quadlet_utils.UNIT_BUILDERS))
+    quadlet_parser.add_argument("names", nargs="*", help="Names or IDs to generate units for")
+    quadlet_parser.add_argument("--match", help="A regular expression matched against names and IDs")
+    quadlet_parser.add_argument("--all", action="store_true", help="Generate units for every object of this kind")
+    quadlet_parser.add_argument("--install", action="store_true", help="Add an [Install] section so units start at boot")
+    quadlet_parser.add_argument("--output-dir", help="Write one file per unit here instead of to stdout")
+    quadlet_parser.set_defaults(handler=quadlet_command)
+
+    serve_parser = commands.add_parser("serve", help="Serve cached inventory snapshots over a read-only JSON API")
+    serve_parser.add_argument("--host", default="127.0.0.1")
+    serve_parser.add_argument("--port", type=int, default=8502)
+    serve_parser.add_argument("--ttl", type=float, default=5.0, help="How many seconds snapshots are reused")
+    serve_parser.set_defaults(handler=serve_command)
+
+    usage_parser = commands.add_parser("usage", help="Record disk usage snapshots or report how usage changed")
+    usage_parser.add_argument("usage_action", choices=("record", "changes"))
+    usage_parser.add_argument("--days", type=float, default=7, help="How far back changes are reported")
+    usage_parser.add_argument("--format", choices=("json", "jsonl", "csv"), default="jsonl")
+    usage_parser.set_defaults(handler=usage_command)
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    try:
+        with PodmanClient(base_url=args.uri, identity=args.identity) as client:
+            return args.handler(client, args)
+    except BrokenPipeError:
+        # the reader, e.g. `head`, stopped early; silence the flush at exit too
+        sys.stdout = open(os.devnull, "w")
+        return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,71 @@
+import streamlit as st
+from components import jobs
+from utils import job_utils, prune_utils, usage_utils
+
+def show(client):
+    """
+    Displays a unified cleanup section that previews and runs prunes across resource types.
+
+    The preview shows how many objects and bytes each prune would reclaim, from the cached disk
+    usage report. The selected prunes then run concurrently as a background job, and the report
+    shows the objects removed, the bytes reclaimed and the time taken per type.
+
+    Args:
+        client (PodmanClient): A client object used to connect to the container runtime.
+
+    Returns:
+        None
+    """
+    import pandas as pd
+
+    typeCol, imagesCol = st.columns(2)
+    with typeCol:
+        types = st.multiselect(
+            "Resource types to prune",
+            options=list(prune_utils.PRUNE_TYPES),
+            default=list(prune_utils.PRUNE_TYPES),
+            format_func=str.capitalize,
+        )
+    with imagesCol:
+        all_images = st.checkbox(
+            "Include unused tagged images",
+            help="By default only dangling (untagged) images that no container uses are pruned."
+        )
+
+    estimate = prune_utils.preview(client, usage_utils.get_disk_usage(client), types, all_images)
+    st.dataframe(pd.DataFrame([{
+        "Type": resource_type.capitalize(),
+        "Objects": values["Objects"],
+        "Reclaimable (MB)": round(values["Bytes"] / 1024 / 1024, 2),
+    } for resource_type, values in estimate.items()]), hide_index=True, width="stretch")
+    total = sum(values["Bytes"] for values in estimate.values())
+    st.caption(
+        f"Pruning would reclaim about {round(total / 1024 / 1024, 2)} MB. Images and volumes freed "
+        "by containers pruned in the same run are reclaimed on the next run."
+    )
+
+    if st.button("🧹 Prune Selected", disabled=not types):
+        st.session_state.prune_expected = {resource_type: values["Bytes"] for resource_type, values in estimate.items()}
+        jobs.start(f"Prune {', '.join(types)}", prune_utils.prune_job, (types, all_images), state_key="prune_job")
+
+    job = job_utils.get_runner().get(st.session_state["prune_job"]) if "prune_job" in st.session_state else None
+    if job is not None:
+        if job.active:
+            st.info("Pruning in the background, follow it in the jobs panel.")
+        elif job.status != "done":
+            st.warning(f"The prune was {job.status}.")
+        else:
+            expected = st.session_state.get("prune_expected", {})
+            for result in job.result:
+                if result["Error"]:
+                    st.error(f"Pruning {result['Type']} failed: {result['Error']}")
+            st.dataframe(pd.DataFrame([{
+                "Type": result["Type"].capitalize(),
+                "Deleted": result["Deleted"],
+                "Reclaimed (MB)": round(result["Reclaimed"] / 1024 / 1024, 2),
+                "Expected (MB)": round(expected.get(result["Type"], 0) / 1024 / 1024, 2),
+                "Seconds": round(result["Seconds"], 2),
+            } for result in job.result]), hide_index=True, width="stretch")
+        if not job.active and st.button("Clear Report"):
+            del st.session_state["prune_job"]
+            st.rerun()
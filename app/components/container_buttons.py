@@ -1,5 +1,9 @@
 import streamlit as st
-from utils import container_utils
+import os
+import re
+import time
+from components import inspect_view, jobs, quadlets
+from utils import bulk_utils, container_utils, log_utils, prune_utils, rerun_utils
 
 # inspect button
 def show_inspect(col):
@@ -15,21 +19,29 @@ def show_inspect(col):
     with col:
         return st.button("🔍", help="Inspect Selected Containers")
     
-def handle_inspect(inspect, selected_containers):
+def handle_inspect(inspect, selected_containers, client):
     """
     Handle the inspect button action.
 
     Parameters:
         inspect (bool): The state of the inspect button.
         selected_containers (DataFrame): The DataFrame of selected containers.
+        client (PodmanClient): The client object used to interact with the containers.
 
     Returns:
         None
     """
     if inspect and not selected_containers.empty:
-        for _, row in selected_containers.iterrows():
-            container = st.session_state.container_objects[row['ID']]
-            st.write(container.attrs)
+        short_ids = dict(zip(selected_containers['Name'], selected_containers['ID']))
+        inspect_view.show(
+            inspect_view.cached_payloads(
+                "containers",
+                short_ids,
+                lambda name: container_utils.get_container(client, short_ids[name]).attrs,
+                st.session_state.get("container_fingerprint"),
+            ),
+            "containers",
+        )
 
 # links button
 def show_links(col):
@@ -45,20 +57,21 @@ def show_links(col):
     with col:
         return st.button("🌐", help="Show Selected Links")
     
-def handle_links(show_links, selected_containers):
+def handle_links(show_links, selected_containers, client):
     """
     Handle the show links button action.
 
     Parameters:
         show_links (bool): The state of the show links button.
         selected_containers (DataFrame): The DataFrame of selected containers.
+        client (PodmanClient): The client object used to interact with the containers.
 
     Returns:
         None
     """
     if show_links and not selected_containers.empty:
         for _, row in selected_containers.iterrows():
-            container = st.session_state.container_objects[row['ID']]
+            container = container_utils.get_container(client, row['ID'])
             ports = container.attrs['NetworkSettings']['Ports']
             if ports:
                 for port, mappings in ports.items():
@@ -81,20 +94,21 @@ def show_logs(col):
     with col:
         return st.button("📄", help="Show Selected Logs")
 
-def handle_logs(logs, selected_containers):
+def handle_logs(logs, selected_containers, client):
     """
     Handle the show logs button action.
 
     Parameters:
         logs (bool): The state of the show logs button.
         selected_containers (DataFrame): The DataFrame of selected containers.
+        client (PodmanClient): The client object used to interact with the containers.
 
     Returns:
         None
     """
     if logs and not selected_containers.empty:
         for _, row in selected_containers.iterrows():
-            container = st.session_state.container_objects[row['ID']]
+            container = container_utils.get_container(client, row['ID'])
             logs = container.logs(stream=False, stdout=True, stderr=True)
 
             st.subheader(f"{row['Name']}'s Logs")
@@ -108,6 +122,175 @@ def handle_logs(logs, selected_containers):
                     log_lines.append(decoded_log_line)
             log_placeholder.code("\n".join(log_lines), "log")
 
+# search logs button
+def show_search_logs(col):
+    """
+    Display the search logs button.
+
+    Parameters:
+        col (streamlit.delta_generator.DeltaGenerator): The Streamlit column to place the button in.
+
+    Returns:
+        bool: True if the button is clicked, False otherwise.
+    """
+    with col:
+        return st.button("🔎", help="Search Selected Logs")
+
+def handle_search_logs(search_logs, selected_containers, client):
+    """
+    Handle the search logs button action.
+
+    Shows the search options and, once submitted, scans the selected containers' logs
+    concurrently, rendering only the matching lines and their context.
+
+    Parameters:
+        search_logs (bool): The state of the search logs button.
+        selected_containers (DataFrame): The DataFrame of selected containers.
+        client (PodmanClient): The client object used to interact with the containers.
+
+    Returns:
+        None
+    """
+    if search_logs and not selected_containers.empty:
+        with st.form("search_logs_form"):
+            patternCol, contextCol, limitCol = st.columns([3, 1, 1])
+            with patternCol:
+                pattern = st.text_input("Regex pattern:")
+            with contextCol:
+                context = st.number_input("Context lines", min_value=0, max_value=20, value=2)
+            with limitCol:
+                max_matches = st.number_input("Max matches", min_value=1, max_value=10000, value=500)
+            sinceCol, untilCol = st.columns(2)
+            with sinceCol:
+                since_minutes = st.number_input("From minutes ago (0 = beginning)", min_value=0, value=0)
+            with untilCol:
+                until_minutes = st.number_input("To minutes ago (0 = now)", min_value=0, value=0)
+            submitted = st.form_submit_button("Search")
+
+        if submitted and pattern:
+            now = int(time.time())
+            containers = [container_utils.get_container(client, container_id) for container_id in selected_containers['ID']]
+            try:
+                with st.spinner(f"Searching {len(containers)} containers..."):
+                    results, truncated = log_utils.search_logs(
+                        containers,
+                        pattern,
+                        since=now - since_minutes * 60 if since_minutes else None,
+                        until=now - until_minutes * 60 if until_minutes else None,
+                        context=int(context),
+                        max_matches=int(max_matches),
+                    )
+            except re.error as e:
+                st.error(f"Invalid pattern: {e}")
+                return
+
+            total = sum(len(matches) for matches in results.values())
+            st.caption(f"{total} matches" + (f", stopped at the first {max_matches}." if truncated else "."))
+            for name, matches in results.items():
+                if not matches:
+                    continue
+                st.subheader(f"{name}'s Matches")
+                blocks = [
+                    "\n".join(match["before"] + [f"{match['line_number']}: {match['line']}"] + match["after"])
+                    for match in matches
+                ]
+                st.code("\n--\n".join(blocks), "log")
+
+# export logs button
+def show_export_logs(col):
+    """
+    Display the export logs button.
+
+    Parameters:
+        col (streamlit.delta_generator.DeltaGenerator): The Streamlit column to place the button in.
+
+    Returns:
+        bool: True if the button is clicked, False otherwise.
+    """
+    with col:
+        return st.button("📦", help="Export Selected Logs")
+
+def handle_export_logs(export_logs, selected_containers, client):
+    """
+    Handle the export logs button action.
+
+    Streams the selected containers' logs into compressed files on disk while reporting progress,
+    then offers a download button for each exported file until the exports are cleared.
+
+    Parameters:
+        export_logs (bool): The state of the export logs button.
+        selected_containers (DataFrame): The DataFrame of selected containers.
+        client (PodmanClient): The client object used to interact with the containers.
+
+    Returns:
+        None
+    """
+    if export_logs and not selected_containers.empty:
+        formats = log_utils.export_formats()
+        with st.form("export_logs_form"):
+            formatCol, sinceCol, untilCol = st.columns(3)
+            with formatCol:
+                export_format = st.selectbox("Format", options=list(formats.keys()))
+            with sinceCol:
+                since_minutes = st.number_input("From minutes ago (0 = beginning)", min_value=0, value=0)
+            with untilCol:
+                until_minutes = st.number_input("To minutes ago (0 = now)", min_value=0, value=0)
+            submitted = st.form_submit_button("Export")
+
+        if submitted:
+            now = int(time.time())
+            containers = [container_utils.get_container(client, container_id) for container_id in selected_containers['ID']]
+            progress_bar = st.progress(0.0, text="Starting export...")
+            started = []
+
+            def progress(name, written):
+                if name not in started:
+                    started.append(name)
+                progress_bar.progress(
+                    (len(started) - 1) / len(containers),
+                    text=f"{name}: {written / 1024 / 1024:.1f} MB streamed",
+                )
+
+            try:
+                st.session_state.exported_logs = log_utils.export_logs(
+                    containers,
+                    formats[export_format],
+                    since=now - since_minutes * 60 if since_minutes else None,
+                    until=now - until_minutes * 60 if until_minutes else None,
+                    progress=progress,
+                )
+                progress_bar.progress(1.0, text="Export complete.")
+            except Exception as e:
+                st.error(str(e))
+
+    if "exported_logs" in st.session_state:
+        with st.expander("Exported Logs", True):
+            if st.button("Clear Exports"):
+                for path in st.session_state.exported_logs:
+                    if os.path.exists(path):
+                        os.remove(path)
+                del st.session_state["exported_logs"]
+                rerun_utils.rerun_fragment("container_action")
+            st.caption(
+                f"Exports up to {log_utils.DOWNLOAD_LIMIT / 1024 / 1024:.0f} MB can be downloaded here "
+                "(`PODMAN_STREAMLIT_DOWNLOAD_LIMIT_MB`); larger ones stay in the export directory."
+            )
+            for path in st.session_state.exported_logs:
+                if not os.path.exists(path):
+                    continue
+                size = os.path.getsize(path)
+                if size > log_utils.DOWNLOAD_LIMIT:
+                    st.markdown(f"📁 `{path}` ({size / 1024 / 1024:.1f} MB)")
+                    continue
+                st.download_button(
+                    f"⬇️ {os.path.basename(path)} ({size / 1024 / 1024:.1f} MB)",
+                    # deferred, so the file is only read when the download is requested
+                    data=lambda path=path: log_utils.read_export(path),
+                    file_name=os.path.basename(path),
+                    mime="application/octet-stream",
+                    key=f"download-{path}",
+                )
+
 # generate quadlet button
 def show_generate_quadlet(col):
     """
@@ -135,8 +318,7 @@ def handle_generate_quadlet(generate_quadlet, selected_containers, client):
         None
     """
     if generate_quadlet and not selected_containers.empty:
-        for _, row in selected_containers.iterrows():
-            container_utils.run_podlet(client, row["Name"], row['RunCommand'])
+        quadlets.show([container_utils.derived(client, container_id, "Quadlet") for container_id in selected_containers['ID']], "containers")
 
 # exec button
 def show_exec(col):
@@ -167,17 +349,23 @@ def handle_exec(container_exec, df_containers, selected_containers):
     if container_exec:
         container_utils.execute(df_containers, selected_containers['Name'].tolist())
 
-    if "execute_outputs" in st.session_state:
-        with st.expander("Execution Outputs", True):
-            if st.button("Clear Outputs"):
-                del st.session_state["execute_outputs"]
-                st.rerun()
-            if st.session_state.execute_outputs:
-                st.subheader("Command executed:")
-                st.code(st.session_state.execute_outputs[0]['command'], "bash")
-            for output in st.session_state.execute_outputs:
-                st.subheader(f"{output['container']}'s output:")
-                st.code(output['output'], "text")
+def start_bulk_action(action, selected_containers):
+    """
+    Runs a bulk action on the selected containers as a background job.
+
+    Parameters:
+        action (str): The action, one of the keys of `bulk_utils.ACTIONS["containers"]`.
+        selected_containers (DataFrame): The DataFrame of selected containers.
+
+    Returns:
+        None
+    """
+    jobs.start(
+        f"{action.capitalize()} {len(selected_containers)} containers",
+        bulk_utils.action_job,
+        ("containers", action, selected_containers['ID'].tolist()),
+        reset_keys=("container_action",),
+    )
 
 # start button
 def show_start(col):
@@ -205,13 +393,7 @@ def handle_start(start, selected_containers):
         None
     """
     if start and not selected_containers.empty:
-        for _, row in selected_containers.iterrows():
-            container = st.session_state.container_objects[row['ID']]
-            if container.status == "paused":
-                container.unpause()
-            elif container.status == "exited":
-                container.start(force=True)
-        st.rerun()
+        start_bulk_action("start", selected_containers)
 
 # pause button
 def show_pause(col):
@@ -239,11 +421,7 @@ def handle_pause(pause, selected_containers):
         None
     """
     if pause and not selected_containers.empty:
-        for _, row in selected_containers.iterrows():
-            container = st.session_state.container_objects[row['ID']]
-            if container.status == "running":
-                container.pause()
-        st.rerun()
+        start_bulk_action("pause", selected_containers)
 
 # stop button
 def show_stop(col):
@@ -271,13 +449,7 @@ def handle_stop(stop, selected_containers):
         None
     """
     if stop and not selected_containers.empty:
-        for _, row in selected_containers.iterrows():
-            container = st.session_state.container_objects[row['ID']]
-            if container.status != "paused":
-                container.stop()
-            else:
-                container.kill()
-        st.rerun()
+        start_bulk_action("stop", selected_containers)
 
 # remove button
 def show_remove(col):
@@ -305,10 +477,7 @@ def handle_remove(remove, selected_containers):
         None
     """
     if remove and not selected_containers.empty:
-        for _, row in selected_containers.iterrows():
-            container = st.session_state.container_objects[row['ID']]
-            container.remove(force=True)
-        st.rerun()
+        start_bulk_action("remove", selected_containers)
 
 # prune button
 def show_prune(col):
@@ -336,8 +505,7 @@ def handle_prune(prune, client):
         None
     """
     if prune:
-        client.containers.prune()
-        st.rerun()
+        jobs.start("Prune containers", prune_utils.prune_job, (["containers"],), reset_keys=("container_action",))
 
 # refresh button
 def show_refresh(col):
@@ -365,4 +533,5 @@ def handle_refresh(refresh, client):
         None
     """
     if refresh:
-        st.rerun()
\ No newline at end of file
+        container_utils.invalidate()
+        rerun_utils.rerun_fragment("container_action")
\ No newline at end of file
@@ -1,8 +1,8 @@
 import streamlit as st
-import pandas as pd
-from utils import container_utils
+from utils import container_utils, snapshot_utils
 from . import container_buttons
 
+@st.fragment
 def show(client):
     """
     Displays a tab for managing Podman containers.
@@ -21,8 +21,21 @@ def show(client):
     st.header("📦 Podman Containers")
 
     container_data = container_utils.get(client)
+    fingerprint = st.session_state.container_fingerprint
+    selected_ids = st.session_state.setdefault("selected_container_ids", set())
 
-    df_containers = pd.DataFrame(container_data)         
+    # reuse the previous table (and with it the editor state) unless the inventory changed
+    table = st.session_state.get("container_table")
+    if table and table["fingerprint"] == fingerprint:
+        df_containers = table["df"]
+    else:
+        df_containers = snapshot_utils.patch_frame(
+            table["df"] if table else None, container_data, st.session_state.container_changes
+        )
+        if not df_containers.empty:
+            df_containers["Image"] = [row["Image"] for row in container_data]
+            df_containers["Selected"] = df_containers["ID"].isin(selected_ids)
+        st.session_state.container_table = {"fingerprint": fingerprint, "df": df_containers}
 
     action = st.selectbox(
         "Container Actions",
@@ -31,6 +44,8 @@ def show(client):
             "🔍 Inspect",
             "🔗 Show Links", 
             "📝 View Logs",
+            "🔎 Search Logs",
+            "📦 Export Logs",
             "📄 Generate Quadlet",
             "▶️ Execute Command",
             "▶️ Start",
@@ -39,13 +54,16 @@ def show(client):
             "🗑️ Remove",
             "🧹 Prune",
             "🔄 Refresh"
-        ]
+        ],
+        key="container_action"
     )
 
     # Convert dropdown selection to button clicks
     inspect = action == "🔍 Inspect"
     show_links = action == "🔗 Show Links"
     logs = action == "📝 View Logs"
+    search_logs = action == "🔎 Search Logs"
+    export_logs = action == "📦 Export Logs"
     generate_quadlet = action == "📄 Generate Quadlet"
     container_exec = action == "▶️ Execute Command"
     start = action == "▶️ Start"
@@ -57,6 +75,7 @@ def show(client):
 
     edited_containers_df = st.data_editor(
         df_containers, 
+        key=f"container_editor_{fingerprint}",
         hide_index=True,
         disabled=("Status", "Name", "ID", "Image", "Ports", "Created"), 
         column_config={
@@ -65,15 +84,18 @@ def show(client):
                 help="Select containers for actions"
             ),
         },
-        column_order=["Selected", "Name","ID", "Status", "Image", "Ports", "Created"],
+        column_order=["Selected", *container_utils.TABLE_COLUMNS],
         width='stretch'
     )
 
-    selected_containers = edited_containers_df[edited_containers_df['Selected']]
+    selected_containers = edited_containers_df[edited_containers_df['Selected']] if not edited_containers_df.empty else edited_containers_df
+    st.session_state.selected_container_ids = set(selected_containers['ID']) if not selected_containers.empty else set()
 
-    container_buttons.handle_inspect(inspect, selected_containers)
-    container_buttons.handle_links(show_links, selected_containers)
-    container_buttons.handle_logs(logs, selected_containers)
+    container_buttons.handle_inspect(inspect, selected_containers, client)
+    container_buttons.handle_links(show_links, selected_containers, client)
+    container_buttons.handle_logs(logs, selected_containers, client)
+    container_buttons.handle_search_logs(search_logs, selected_containers, client)
+    container_buttons.handle_export_logs(export_logs, selected_containers, client)
     container_buttons.handle_generate_quadlet(generate_quadlet, selected_containers, client)
     container_buttons.handle_exec(container_exec, df_containers, selected_containers)
     container_buttons.handle_start(start, selected_containers)
@@ -1,7 +1,8 @@
+import os
 import streamlit as st
-import pandas as pd
-from datetime import datetime
-from tzlocal import get_localzone
+from podman.errors import APIError
+from components import inspect_view, jobs
+from utils import build_utils, image_utils, inventory_utils, prefetch_utils, prune_utils, rerun_utils, usage_utils
 
 @st.dialog("Pull Image")
 def pull(client):
@@ -17,24 +18,55 @@ def pull(client):
     repository = st.text_input("Repository:")
     all_tags = st.checkbox("Pull all tags")
     
-    if st.button("Pull"):
-        try:
-            with st.spinner("Pulling..."):
-                output_placeholder = st.empty() 
-
-                if all_tags:
-                    output = client.images.pull(repository, all_tags=True)
-                else:
-                    output = client.images.pull(repository)
+    if st.button("Pull", disabled=not repository):
+        jobs.start(f"Pull {repository}", image_utils.pull_job, ([repository], all_tags), rerun_app=True)
 
-                output_placeholder.write("✅ **Image pulled successfully!**")
+@st.dialog("Build Image")
+def build(client):
+    """
+    Opens a dialog to build an image from a Containerfile and a context directory on the machine
+    running the app. The build runs as a background job, with its output in the jobs panel.
 
-            st.session_state.pull = {"output": output}
-            st.rerun()
+    Args:
+        client (PodmanClient): The client object used to interact with the container runtime.
 
-        except Exception as e:
+    Returns:
+        None
+    """
+    context = st.text_input("Context directory:", placeholder="/home/me/src/app")
+    containerfile = st.text_input("Containerfile:", value="Containerfile", help="Relative to the context, or an absolute path.")
+    tags = st.text_input("Tags:", placeholder="localhost/app:latest, localhost/app:1.0")
+    build_args = st.text_area("Build arguments:", placeholder="KEY=value, one per line")
+    pullCol, cacheCol = st.columns(2)
+    with pullCol:
+        pull_base = st.checkbox("Pull newer base images")
+    with cacheCol:
+        no_cache = st.checkbox("Don't use the layer cache")
+
+    if context and st.button("Preview Context"):
+        try:
+            summary = build_utils.context_summary(os.path.expanduser(context))
+            st.caption(
+                f"{summary['files']} files, {summary['bytes'] / 1024 / 1024:.1f} MB"
+                f" after {summary['ignored']} .containerignore patterns."
+            )
+        except OSError as e:
             st.error(str(e))
 
+    if st.button("Build", disabled=not context):
+        tag_list = [tag.strip() for tag in tags.split(",") if tag.strip()]
+        arguments = dict(
+            line.strip().partition("=")[::2] for line in build_args.splitlines() if line.strip()
+        )
+        jobs.start(
+            f"Build {', '.join(tag_list) or context}",
+            build_utils.build_job,
+            (context, containerfile or "Containerfile", tag_list, arguments, pull_base, no_cache),
+            pool="build",
+            rerun_app=True,
+        )
+
+@st.fragment
 def show(client):
     """
     Displays a tab in Streamlit that shows information about Podman images.
@@ -48,23 +80,21 @@ def show(client):
     Returns:
         None
     """
+    import pandas as pd
+
     st.header("🖼️ Podman Images")
-    images = client.images.list(all=True)
+    images = prefetch_utils.listing(client, "images")
 
     if images:
         image_data = []
-        my_timezone = get_localzone()
+        my_timezone = inventory_utils.local_timezone()
+        full_ids = {image.short_id: image.id for image in images}
+        inspect_attrs = image_utils.get_inspect_attrs(client, list(full_ids.values()))
+        layer_index = image_utils.build_layer_index(images, inspect_attrs, usage_utils.get_disk_usage(client))
+        # built from this run's listings, as the containers tab's index may predate containers created since
+        usage_index = image_utils.ImageUsageIndex(prefetch_utils.listing(client, "containers"), images)
         for image in images:
-            created_timestamp = image.attrs.get("Created", 0)
-            created_time = datetime.fromtimestamp(created_timestamp, my_timezone)
-
-            image_data.append({
-                "Selected": False,
-                "Tags": image.tags,
-                "ID": image.short_id,
-                "Size (MB)": round(image.attrs.get("Size", 0) / 1024 / 1024, 2),
-                "Created": created_time,
-            })
+            image_data.append({"Selected": False, **inventory_utils.image_row(image, layer_index, usage_index, my_timezone)})
 
         df_images = pd.DataFrame(image_data)
 
@@ -77,7 +107,8 @@ def show(client):
                 "🗑️ Remove",
                 "✂️ Prune",
                 "🔄 Refresh"
-            ]
+            ],
+            key="image_action"
         )
 
         # Convert dropdown selection to button clicks
@@ -88,13 +119,11 @@ def show(client):
         refresh_all = action == "🔄 Refresh"
 
         if prune_all:
-            client.images.prune()
-            client.images.prune_builds()
-            st.rerun()
+            jobs.start("Prune images", prune_utils.prune_job, (["images"],), reset_keys=("image_action",))
 
         edited_images_df = st.data_editor(df_images, 
                             hide_index=True,
-                            disabled=("Tags","ID","Size (MB)","Created"), 
+                            disabled=("Tags","ID","Used By","Size (MB)","Unique (MB)","Shared (MB)","Parent","Children","Created"), 
                             column_config={
                                 "Selected": st.column_config.CheckboxColumn(
                                     "",
@@ -105,41 +134,57 @@ def show(client):
 
         selected_images = edited_images_df[edited_images_df['Selected']]
 
+        if not selected_images.empty:
+            reclaimable = layer_index.reclaimable_bytes(full_ids[image_id] for image_id in selected_images['ID'])
+            st.caption(f"Removing the selected images would reclaim {round(reclaimable / 1024 / 1024, 2)} MB.")
+
         if inspect_all and not selected_images.empty:
-            for _, row in selected_images.iterrows():
-                image = client.images.get(row['ID'])
-                st.write(image.attrs)
+            inspect_view.show({
+                row['Tags'][0] if row['Tags'] else row['ID']:
+                    inspect_attrs.get(full_ids[row['ID']]) or client.images.get(row['ID']).attrs
+                for _, row in selected_images.iterrows()
+            }, "images")
 
         if pull_all and not selected_images.empty:
-            for _, row in selected_images.iterrows():
-                client.images.pull(row['Tags'][0])
-            st.rerun()
+            repositories = [row['Tags'][0] for _, row in selected_images.iterrows() if row['Tags']]
+            jobs.start(f"Pull {len(repositories)} images", image_utils.pull_job, (repositories,), reset_keys=("image_action",))
 
         if remove_all and not selected_images.empty:
+            in_use = [row for _, row in selected_images.iterrows() if usage_index.in_use(full_ids[row['ID']])]
+            for row in in_use:
+                st.warning(f"Image {row['ID']} is in use by {', '.join(row['Used By'])} and was not removed.")
+            failed = False
             for _, row in selected_images.iterrows():
-                client.images.remove(row['ID'], force=True)
-            st.rerun()
+                if not usage_index.in_use(full_ids[row['ID']]):
+                    try:
+                        client.images.remove(row['ID'])
+                    except APIError as e:
+                        # e.g. a container was created from it since the listing
+                        st.warning(f"Image {row['ID']} was not removed: {e}")
+                        failed = True
+            usage_utils.clear_disk_usage()
+            if not in_use and not failed:
+                rerun_utils.rerun_fragment("image_action")
         
         if refresh_all:
-            st.rerun()
+            usage_utils.clear_disk_usage()
+            rerun_utils.rerun_fragment("image_action")
 
         with st.expander("Advanced Image Tools"):
-            imageToolsTab, otherTab = st.tabs(["Pull New Image", "Other"])
+            imageToolsTab, buildTab, otherTab = st.tabs(["Pull New Image", "Build Image", "Other"])
             
             with imageToolsTab:
-                pullCols = st.columns(2)
-                with pullCols[0]:
-                    pull_image_button = st.button("📥 Pull New Image")
-                with pullCols[1]:
-                    pull_image_clear = st.button("Clear Output", key="pull-clear-output")
-                if pull_image_button:
+                if st.button("📥 Pull New Image"):
                     pull(client)
-                if pull_image_clear:
-                    if "pull" in st.session_state:
-                        del st.session_state["pull"]
-
-                if "pull" in st.session_state:
-                    st.code(st.session_state.pull["output"])
+                st.caption("Pulls run in the background; their output is shown in the jobs panel.")
+
+            with buildTab:
+                if st.button("🏗️ Build Image"):
+                    build(client)
+                st.caption(
+                    "The context is streamed to Podman as it is read and the build output is shown live in the jobs panel. "
+                    "Several builds can be queued; `PODMAN_STREAMLIT_BUILD_CONCURRENCY` (default 2) run at once."
+                )
 
     else:
         st.info("No images found.")
\ No newline at end of file
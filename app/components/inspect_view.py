@@ -0,0 +1,232 @@
+import json
+import streamlit as st
+from utils import inspect_utils
+
+# the most children, query matches and diff rows sent to the browser at once
+MAX_CHILDREN = 200
+MAX_MATCHES = 50
+MAX_DIFF_ROWS = 2000
+
+def cached_payloads(key, labels, fetch, version=None):
+    """
+    Returns the inspect payloads of the selected objects, fetching them only when the selection changes.
+
+    Browsing, querying and diffing rerun the tab on every click, so the payloads are kept in
+    session state for the current connection and selection instead of being inspected again.
+
+    Args:
+        key (str): A key unique to the calling tab, as passed to `show`.
+        labels (iterable): The selected objects' labels, such as their names.
+        fetch (callable): Returns the inspect payload of one label.
+        version: Anything else whose change means the payloads must be fetched again, such as an
+            inventory fingerprint.
+
+    Returns:
+        dict: The labels mapped to their inspect payloads.
+    """
+    state_key = f"{key}-inspect-payloads"
+    selection = (st.session_state.get("selected_uri"), version, tuple(labels))
+    cached = st.session_state.get(state_key)
+    if cached is None or cached["selection"] != selection:
+        cached = st.session_state[state_key] = {
+            "selection": selection,
+            "payloads": {label: fetch(label) for label in selection[2]},
+        }
+    return cached["payloads"]
+
+def show(payloads, key):
+    """
+    Displays inspect payloads without sending them whole to the browser.
+
+    Payloads stay on the server. Browse renders one level of one payload at a time, Query renders
+    only the subtrees a path matches across every payload, and Diff lines up the leaves that differ
+    between the payloads. Only the selected view is computed.
+
+    Args:
+        payloads (dict): Object labels, such as container names, mapped to their inspect payloads.
+        key (str): A key unique to the calling tab, so several tabs can show a viewer at once.
+
+    Returns:
+        None
+    """
+    if not payloads:
+        return
+    viewCol, reloadCol = st.columns([4, 1], vertical_alignment="bottom")
+    with viewCol:
+        view = st.radio("View", ["Browse", "Query", "Diff"], horizontal=True, key=f"{key}-inspect-view")
+    with reloadCol:
+        st.button(
+            "🔄 Reload",
+            key=f"{key}-inspect-reload",
+            help="Inspect the selected objects again",
+            on_click=st.session_state.pop,
+            args=(f"{key}-inspect-payloads", None),
+        )
+    if view == "Browse":
+        show_browser(payloads, key)
+    elif view == "Query":
+        show_query(payloads, key)
+    else:
+        show_diff(payloads, key)
+
+def set_path(path_key, keys):
+    """
+    Moves the browser to a node. Used as a widget callback, so the path input can still be changed.
+
+    Args:
+        path_key (str): The session state key of the path input.
+        keys (tuple): The keys leading to the node.
+
+    Returns:
+        None
+    """
+    st.session_state[path_key] = inspect_utils.format_path(keys)
+
+def open_child(path_key, open_key, keys):
+    """
+    Moves the browser to the child picked in the "Open" selectbox, then clears the selectbox.
+
+    Args:
+        path_key (str): The session state key of the path input.
+        open_key (str): The session state key of the "Open" selectbox.
+        keys (tuple): The keys leading to the current node.
+
+    Returns:
+        None
+    """
+    child = st.session_state[open_key]
+    if child is not None:
+        set_path(path_key, keys + (child,))
+    st.session_state[open_key] = None
+
+def show_browser(payloads, key):
+    """
+    Displays one level of one payload, with controls to open a child or go up.
+
+    Args:
+        payloads (dict): Object labels mapped to their inspect payloads.
+        key (str): A key unique to the calling tab.
+
+    Returns:
+        None
+    """
+    path_key = f"{key}-inspect-path"
+    open_key = f"{key}-inspect-open"
+    label = st.selectbox("Object", list(payloads), key=f"{key}-inspect-object")
+    path = st.text_input("Path", key=path_key, placeholder="Empty for the top level, e.g. Config or Mounts[0]")
+    try:
+        matches = inspect_utils.query(payloads[label], path) if path.strip() else [((), payloads[label])]
+    except ValueError as e:
+        st.error(str(e))
+        return
+    if not matches:
+        st.info("Nothing at this path.")
+        return
+    if len(matches) > 1:
+        st.caption(f"The path matches {len(matches)} nodes; showing the first. Use Query to see them all.")
+    keys, node = matches[0]
+
+    upCol, openCol = st.columns([1, 4])
+    with upCol:
+        st.button("⬆️ Up", key=f"{key}-inspect-up", disabled=not keys, on_click=set_path, args=(path_key, keys[:-1]))
+    items = inspect_utils.children(node)
+    with openCol:
+        st.selectbox(
+            "Open",
+            [child_key for child_key, child in items if isinstance(child, (dict, list)) and child],
+            index=None,
+            placeholder="Open a nested value...",
+            format_func=str,
+            key=open_key,
+            on_change=open_child,
+            args=(path_key, open_key, keys),
+            label_visibility="collapsed",
+        )
+
+    if not items:
+        st.code(json.dumps(node, indent=2, ensure_ascii=False, default=str), "json")
+        return
+    st.dataframe(
+        [{"Key": str(child_key), "Value": inspect_utils.summarize(child)} for child_key, child in items[:MAX_CHILDREN]],
+        hide_index=True,
+        width="stretch",
+    )
+    if len(items) > MAX_CHILDREN:
+        st.caption(f"Showing the first {MAX_CHILDREN} of {len(items)} entries; narrow the path to see the rest.")
+
+def show_query(payloads, key):
+    """
+    Displays the subtrees a path matches in every payload.
+
+    Args:
+        payloads (dict): Object labels mapped to their inspect payloads.
+        key (str): A key unique to the calling tab.
+
+    Returns:
+        None
+    """
+    expression = st.text_input(
+        "Query",
+        key=f"{key}-inspect-query",
+        placeholder="e.g. Mounts[*].Destination, Config.Labels or Mounts[?Type=='bind']",
+    )
+    if not expression.strip():
+        st.caption("Enter a path to show only the matching parts of each object. `*` and `[*]` match every key or item.")
+        return
+    try:
+        matches = [
+            (label, keys, value)
+            for label, payload in payloads.items()
+            for keys, value in inspect_utils.query(payload, expression)
+        ]
+    except ValueError as e:
+        st.error(str(e))
+        return
+    if not matches:
+        st.info("Nothing matches.")
+        return
+
+    scalars = [(label, keys, value) for label, keys, value in matches if not isinstance(value, (dict, list))]
+    if scalars:
+        st.dataframe([{
+            "Object": label,
+            "Path": inspect_utils.format_path(keys),
+            "Value": json.dumps(value, ensure_ascii=False, default=str),
+        } for label, keys, value in scalars], hide_index=True, width="stretch")
+    subtrees = [(label, keys, value) for label, keys, value in matches if isinstance(value, (dict, list))]
+    for label, keys, value in subtrees[:MAX_MATCHES]:
+        st.markdown(f"**{label}** · `{inspect_utils.format_path(keys)}`")
+        st.json(value, expanded=1)
+    if len(subtrees) > MAX_MATCHES:
+        st.caption(f"Showing the first {MAX_MATCHES} of {len(subtrees)} matches; narrow the query to see the rest.")
+
+def show_diff(payloads, key):
+    """
+    Displays the leaves whose values differ between the payloads, side by side.
+
+    Args:
+        payloads (dict): Object labels mapped to their inspect payloads.
+        key (str): A key unique to the calling tab.
+
+    Returns:
+        None
+    """
+    if len(payloads) < 2:
+        st.info("Select two or more objects to compare them.")
+        return
+    filterCol, differencesCol = st.columns([3, 1])
+    with filterCol:
+        path_filter = st.text_input("Paths containing", key=f"{key}-inspect-diff-filter", placeholder="e.g. Config.Env")
+    with differencesCol:
+        only_differences = st.toggle("Only differences", value=True, key=f"{key}-inspect-diff-only")
+    rows = inspect_utils.diff(payloads, only_differences)
+    if path_filter:
+        rows = [row for row in rows if path_filter.lower() in row["Path"].lower()]
+    if not rows:
+        st.info("The selected objects don't differ." if only_differences else "Nothing matches.")
+        return
+    st.dataframe(rows[:MAX_DIFF_ROWS], hide_index=True, width="stretch")
+    st.caption(
+        f"{len(rows)} paths" + (f", showing the first {MAX_DIFF_ROWS}." if len(rows) > MAX_DIFF_ROWS else ".")
+        + " Missing values are shown as None."
+    )
@@ -0,0 +1,138 @@
+import streamlit as st
+from utils import job_utils, rerun_utils, usage_utils
+
+STATUS_ICONS = {
+    "queued": "⏳",
+    "running": "🔄",
+    "done": "✅",
+    "failed": "❌",
+    "cancelled": "🚫",
+}
+
+def submit(title, func, args=(), pool=None):
+    """
+    Queues a background job against the selected Podman service.
+
+    Args:
+        title (str): A short description shown in the jobs panel.
+        func (callable): Called as `func(job, client, *args)` on a worker thread.
+        args (tuple): Positional arguments for `func`.
+        pool (str): The runner's separate pool to run the job on, such as "build".
+
+    Returns:
+        Job: The queued job.
+    """
+    job = job_utils.get_runner().submit(st.session_state.selected_uri, title, func, *args, pool=pool)
+    st.session_state.jobs_active = True
+    return job
+
+def follow(*reset_keys, rerun_app=False):
+    """
+    Reruns the fragment that submitted jobs, such as a tab, so its action doesn't run again.
+    The jobs panel polls on its own, so it picks the jobs up without a full rerun.
+
+    Args:
+        *reset_keys (str): Widget keys to reset before rerunning, such as the action selectbox
+            that started the jobs.
+        rerun_app (bool): Whether to rerun the whole app instead, e.g. to close the dialog the
+            jobs were started from.
+
+    Returns:
+        None
+    """
+    if rerun_app:
+        for key in reset_keys:
+            st.session_state.pop(key, None)
+        st.rerun()
+    rerun_utils.rerun_fragment(*reset_keys)
+
+def start(title, func, args=(), reset_keys=(), state_key=None, pool=None, rerun_app=False):
+    """
+    Queues a background job and reruns the fragment that started it; the jobs panel follows it.
+
+    Args:
+        title (str): A short description shown in the jobs panel.
+        func (callable): Called as `func(job, client, *args)` on a worker thread.
+        args (tuple): Positional arguments for `func`.
+        reset_keys (iterable): Widget keys to reset before rerunning, such as the action selectbox
+            that started the job.
+        state_key (str): If set, the job's ID is stored in this session state key, so the caller
+            can find the job's result on later runs.
+        pool (str): The runner's separate pool to run the job on, such as "build".
+        rerun_app (bool): Whether to rerun the whole app, e.g. to close the dialog the job was
+            started from.
+
+    Returns:
+        None
+    """
+    job = submit(title, func, args, pool)
+    if state_key:
+        st.session_state[state_key] = job.id
+    follow(*reset_keys, rerun_app=rerun_app)
+
+def show(uri):
+    """
+    Displays the jobs panel for a Podman service.
+
+    Jobs run in the process, not in the session, so the panel shows the same jobs after a rerun,
+    a reconnect or in another browser. The panel reruns on its own every second, so it follows
+    jobs started anywhere without rerunning the page. Once they have all finished the page reruns
+    once so the tabs show their effects, which only re-inspects what the jobs changed.
+
+    Args:
+        uri (str): The Podman service URI.
+
+    Returns:
+        None
+    """
+    st.fragment(show_panel, run_every=1)(uri)
+
+def show_panel(uri):
+    """
+    Displays each job's progress, log and result.
+
+    Args:
+        uri (str): The Podman service URI.
+
+    Returns:
+        None
+    """
+    import pandas as pd
+
+    runner = job_utils.get_runner()
+    jobs = runner.list(uri)
+    active = any(job.active for job in jobs)
+    if st.session_state.get("jobs_active") and not active:
+        # the jobs changed the inventory: the disk usage report is stale, while the tabs' listings
+        # are fingerprinted and only rebuild what changed
+        st.session_state.jobs_active = False
+        usage_utils.clear_disk_usage(uri)
+        st.rerun()
+    st.session_state.jobs_active = active
+
+    running = sum(job.active for job in jobs)
+    label = f"⚙️ Jobs ({running} running)" if running else f"⚙️ Jobs ({len(jobs)})"
+    with st.expander(label, expanded=bool(running)):
+        if not jobs:
+            st.caption("No jobs yet. Pulls, prunes, bulk actions and commands run here in the background.")
+            return
+        if not active and st.button("Clear Finished Jobs"):
+            runner.clear_finished(uri)
+            rerun_utils.rerun_fragment()
+
+        for job in jobs:
+            st.markdown(f"{STATUS_ICONS[job.status]} **{job.title}** · {job.status} · {job.seconds:.1f}s")
+            if job.active:
+                st.progress(job.progress or 0.0, text=job.message or None)
+                if st.button("Cancel", key=f"cancel-job-{job.id}", disabled=job.cancel_event.is_set()):
+                    job.cancel()
+                    rerun_utils.rerun_fragment()
+            if job.error:
+                st.error(job.error)
+            lines = job.log_tail()
+            if lines:
+                st.code("\n".join(lines), "log")
+            if isinstance(job.result, str):
+                st.code(job.result, job.language)
+            elif isinstance(job.result, list) and job.result:
+                st.dataframe(pd.DataFrame(job.result), hide_index=True, width="stretch")
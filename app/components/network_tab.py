@@ -1,8 +1,8 @@
 import streamlit as st
-import pandas as pd
-from dateutil import parser 
-from tzlocal import get_localzone
+from components import inspect_view, quadlets
+from utils import inventory_utils, prefetch_utils, quadlet_utils, rerun_utils
 
+@st.fragment
 def show(client):
     """
     Displays a tab in Streamlit that shows information about Podman networks.
@@ -16,21 +16,15 @@ def show(client):
     Returns:
         None
     """
+    import pandas as pd
+
     st.header("🌐 Podman Networks")
-    networks = client.networks.list()
+    networks = prefetch_utils.listing(client, "networks")
     if networks:
         network_data = []
-        my_timezone = get_localzone()
+        my_timezone = inventory_utils.local_timezone()
         for network in networks:
-            created_timestamp = network.attrs["created"]
-            created_time = parser.isoparse(created_timestamp).astimezone(my_timezone)
-            network_data.append({
-                "Selected": False,
-                "Name": network.name,
-                "ID": network.short_id,
-                "Driver": network.attrs["driver"],
-                "Created": created_time,
-            })
+            network_data.append({"Selected": False, **inventory_utils.network_row(network, my_timezone)})
 
         df_networks = pd.DataFrame(network_data)
 
@@ -39,13 +33,16 @@ def show(client):
             [
                 "Select action...",
                 "🔍 Inspect",
+                "📄 Generate Quadlet",
                 "🗑️ Remove",
                 "🔄 Refresh"
-            ]
+            ],
+            key="network_action"
         )
 
         # Convert dropdown selection to button clicks
         inspect_all = action == "🔍 Inspect"
+        generate_quadlet = action == "📄 Generate Quadlet"
         remove_all = action == "🗑️ Remove"
         refresh_all = action == "🔄 Refresh"
 
@@ -63,19 +60,24 @@ def show(client):
         selected_networks = edited_networks_df[edited_networks_df['Selected']]
 
         if inspect_all and not selected_networks.empty:
-            for _, row in selected_networks.iterrows():
-                network_name = row['Name']
-                network = client.networks.get(network_name)
-                st.write(network.attrs)
+            inspect_view.show(
+                inspect_view.cached_payloads("networks", selected_networks['Name'], lambda name: client.networks.get(name).attrs),
+                "networks",
+            )
+
+        if generate_quadlet and not selected_networks.empty:
+            # network listings carry the full inspect payload
+            attrs = {network.name: network.attrs for network in networks}
+            quadlets.show([quadlet_utils.network_unit(attrs[name]) for name in selected_networks['Name']], "networks")
 
         if remove_all and not selected_networks.empty:
             for _, row in selected_networks.iterrows():
                 network_name = row['Name']
                 network = client.networks.get(network_name)
                 network.remove()
-            st.rerun()
+            rerun_utils.rerun_fragment("network_action")
 
         if refresh_all:
-            st.rerun()
+            rerun_utils.rerun_fragment("network_action")
     else:
         st.info("No networks found.")
\ No newline at end of file
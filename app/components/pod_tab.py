@@ -1,9 +1,8 @@
 import streamlit as st
-import pandas as pd
-from utils.status_icons import *
-from dateutil import parser 
-from tzlocal import get_localzone
+from components import inspect_view, jobs, quadlets
+from utils import bulk_utils, inventory_utils, prefetch_utils, prune_utils, quadlet_utils, rerun_utils
 
+@st.fragment
 def show(client):
     """
     Displays a tab in Streamlit that shows information about Podman pods.
@@ -17,26 +16,15 @@ def show(client):
     Returns:
         None
     """
+    import pandas as pd
+
     st.header("🫛 Podman Pods")
-    pods = client.pods.list()
+    pods = prefetch_utils.listing(client, "pods")
     if pods:
         pod_data = []
-        my_timezone = get_localzone()
+        my_timezone = inventory_utils.local_timezone()
         for pod in pods:
-            created_timestamp = pod.attrs["Created"]
-            created_time = parser.isoparse(created_timestamp).astimezone(my_timezone)
-            containers = pod.attrs['Containers']
-            status_icon = "".join(
-                status_icons.get(c['Status'], '❓') for c in containers
-            )
-
-            pod_data.append({
-                "Selected": False,
-                "Name": pod.name,
-                "Status": status_icon,
-                "ID": pod.short_id,
-                "Created": created_time,
-            })
+            pod_data.append({"Selected": False, **inventory_utils.pod_row(pod, my_timezone)})
 
         df_pods = pd.DataFrame(pod_data)
 
@@ -45,17 +33,20 @@ def show(client):
             [
                 "Select action...",
                 "🔍 Inspect",
+                "📄 Generate Quadlet",
                 "▶️ Start",
                 "⏸️ Pause",
                 "⏹️ Stop",
                 "🗑️ Remove",
                 "✂️ Prune",
                 "🔄 Refresh"
-            ]
+            ],
+            key="pod_action"
         )
 
         # Convert dropdown selection to button clicks
         inspect_all = action == "🔍 Inspect"
+        generate_quadlet = action == "📄 Generate Quadlet"
         start_all = action == "▶️ Start"
         pause_all = action == "⏸️ Pause"
         stop_all = action == "⏹️ Stop"
@@ -64,8 +55,7 @@ def show(client):
         refresh_all = action == "🔄 Refresh"
 
         if prune_all:
-            client.pods.prune()
-            st.rerun()
+            jobs.start("Prune pods", prune_utils.prune_job, (["pods"],), reset_keys=("pod_action",))
 
         edited_pods_df = st.data_editor(df_pods, 
                     hide_index=True,
@@ -81,45 +71,23 @@ def show(client):
         selected_pods = edited_pods_df[edited_pods_df['Selected']]
 
         if inspect_all and not selected_pods.empty:
-            for _, row in selected_pods.iterrows():
-                pod_name = row['Name']
-                pod = client.pods.get(pod_name)
-                st.write(pod.attrs)
-
-        if start_all and not selected_pods.empty:
-            for _, row in selected_pods.iterrows():
-                pod_name = row['Name']
-                pod = client.pods.get(pod_name)
-                if pod.attrs['State'] == 'Paused':
-                    pod.unpause()
-                elif  pod.attrs['State'] == 'Exited':
-                    pod.start()
-            st.rerun()
-
-        if pause_all and not selected_pods.empty:
-            for _, row in selected_pods.iterrows():
-                pod_name = row['Name']
-                pod = client.pods.get(pod_name)
-                if pod.attrs['State'] == 'Running':
-                    pod.pause()
-            st.rerun()
+            inspect_view.show(
+                inspect_view.cached_payloads("pods", selected_pods['Name'], lambda name: client.pods.get(name).attrs), "pods"
+            )
 
-        if stop_all and not selected_pods.empty:
-            for _, row in selected_pods.iterrows():
-                pod_name = row['Name']
-                pod = client.pods.get(pod_name)
-                if pod.attrs['State'] != 'Paused':
-                    pod.stop(timeout=10)
-            st.rerun()
+        if generate_quadlet and not selected_pods.empty:
+            quadlets.show([quadlet_utils.pod_unit(client.pods.get(name).attrs) for name in selected_pods['Name']], "pods")
 
-        if remove_all and not selected_pods.empty:
-            for _, row in selected_pods.iterrows():
-                pod_name = row['Name']
-                pod = client.pods.get(pod_name)
-                pod.remove(force=True)
-            st.rerun()
+        for action, selected in (("start", start_all), ("pause", pause_all), ("stop", stop_all), ("remove", remove_all)):
+            if selected and not selected_pods.empty:
+                jobs.start(
+                    f"{action.capitalize()} {len(selected_pods)} pods",
+                    bulk_utils.action_job,
+                    ("pods", action, selected_pods['Name'].tolist()),
+                    reset_keys=("pod_action",),
+                )
 
         if refresh_all:
-            st.rerun()
+            rerun_utils.rerun_fragment("pod_action")
     else:
         st.info("No pods found.")
\ No newline at end of file
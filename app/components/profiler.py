@@ -0,0 +1,99 @@
+import os
+from collections import deque
+from contextlib import contextmanager
+import streamlit as st
+from utils import profile_utils
+
+# how many profiled reruns each session keeps
+HISTORY = int(os.environ.get("PODMAN_STREAMLIT_PROFILE_HISTORY", "10"))
+
+@contextmanager
+def rerun(name):
+    """
+    Profiles the rerun run inside the block, if profiling was turned on in the sidebar panel.
+
+    Args:
+        name (str): The page being profiled.
+
+    Yields:
+        None
+    """
+    if not st.session_state.get("profile_reruns"):
+        yield
+        return
+    profiles = st.session_state.setdefault("rerun_profiles", deque(maxlen=HISTORY))
+    with profile_utils.profile(name, st.session_state.get("profile_interval", 5) / 1000) as result:
+        try:
+            yield
+        finally:
+            profiles.append(result)
+
+section = profile_utils.section
+
+def show():
+    """
+    Displays the rerun profiler in the sidebar: the switch that turns it on and the last reruns'
+    section timings, hottest functions and largest allocations, with flame graph downloads.
+
+    Returns:
+        None
+    """
+    with st.sidebar.expander("⏱️ Rerun Profiler"):
+        st.toggle(
+            "Profile reruns",
+            key="profile_reruns",
+            help="Samples each rerun's call stack and traces its allocations. Slows reruns down while on.",
+        )
+        st.select_slider("Sample every (ms)", [1, 2, 5, 10, 20], value=5, key="profile_interval")
+        profiles = list(st.session_state.get("rerun_profiles", ()))
+        if not profiles:
+            st.caption(f"Turn profiling on and use the page; the last {HISTORY} reruns are kept.")
+            return
+        if st.button("Clear Profiles"):
+            st.session_state.pop("rerun_profiles")
+            st.rerun()
+
+        selected = st.selectbox(
+            "Rerun",
+            range(len(profiles) - 1, -1, -1),
+            format_func=lambda index: (
+                f"{profiles[index].started:%H:%M:%S} {profiles[index].name} · {profiles[index].seconds:.2f}s"
+            ),
+            key="profile_selected",
+        )
+        result = profiles[selected]
+        st.caption(
+            f"{result.samples} samples, peak traced memory {result.peak / 1024 / 1024:.1f} MB."
+        )
+        st.dataframe(
+            [{**entry, "Section": "  " * entry["Depth"] + entry["Section"]} for entry in result.sections],
+            column_order=("Section", "Wall (ms)", "Allocated (KB)"),
+            hide_index=True,
+        )
+        st.dataframe(profile_utils.top_functions(result), hide_index=True)
+        st.dataframe(result.allocations, hide_index=True)
+
+        stamp = f"{result.started:%Y%m%d-%H%M%S}-{result.name}"
+        st.download_button(
+            "⬇️ Flame Graph (SVG)",
+            profile_utils.flame_svg(result.stacks, f"{result.name} rerun at {result.started:%H:%M:%S}"),
+            file_name=f"flame-{stamp}.svg",
+            mime="image/svg+xml",
+        )
+        st.download_button(
+            "⬇️ Folded Stacks",
+            "".join(profile_utils.folded(profile.stacks) for profile in profiles),
+            file_name=f"stacks-{stamp}.folded",
+            mime="text/plain",
+            help=f"All {len(profiles)} kept reruns, for speedscope or flamegraph.pl.",
+        )
+        st.download_button(
+            "⬇️ Top Allocations (CSV)",
+            "Rerun,Location,Size (KB),Blocks\n" + "".join(
+                f"{profile.started:%H:%M:%S} {profile.name},{row['Location']},{row['Size (KB)']},{row['Blocks']}\n"
+                for profile in profiles
+                for row in profile.allocations
+            ),
+            file_name=f"allocations-{stamp}.csv",
+            mime="text/csv",
+        )
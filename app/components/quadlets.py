@@ -0,0 +1,27 @@
+import streamlit as st
+from utils import quadlet_utils
+
+def show(units, key):
+    """
+    Displays generated Quadlet units with a download of all of them.
+
+    Args:
+        units (list): (file name, contents) pairs from `quadlet_utils`.
+        key (str): A key unique to the calling tab, so several tabs can show units at once.
+
+    Returns:
+        None
+    """
+    if not units:
+        return
+    st.download_button(
+        f"⬇️ Download {len(units)} Quadlet Units",
+        data=quadlet_utils.bundle(units),
+        file_name="quadlets.tar.gz",
+        mime="application/gzip",
+        key=f"download-quadlets-{key}",
+        help="Extract into ~/.config/containers/systemd, then run `systemctl --user daemon-reload`.",
+    )
+    for file_name, text in units:
+        st.subheader(file_name)
+        st.code(text, "ini")
@@ -1,6 +1,7 @@
 import streamlit as st
-from utils import secret_utils
+from utils import rerun_utils, secret_utils
 
+@st.fragment
 def show(client):
     """
     Displays a tab for managing Podman secrets.
@@ -34,7 +35,7 @@ def show(client):
                     st.warning(f"A secret with the name '{secret_name}' already exists.")
                 else:
                     secret_utils.create_secret(client,secret_name, secret_data)
-                    st.rerun()
+                    rerun_utils.rerun_fragment()
 
     with deleteCol:
         secret_names = {secret["Name"]: secret["ID"] for secret in secrets_list}
@@ -43,7 +44,7 @@ def show(client):
             secret_id = secret_names.get(secret_to_delete)
             try:
                 secret_utils.delete_secret(client, secret_id)
-                st.rerun()
+                rerun_utils.rerun_fragment()
             except Exception as e:
                 st.error(f"Error deleting secret: {str(e)}")
 
@@ -1,7 +1,9 @@
+import os
 import streamlit as st
+from utils import prefetch_utils
 
 connections = {
-    "Local User Podman Socket": "unix:///run/user/1000/podman/podman.sock"
+    "Local User Podman Socket": os.environ.get("PODMAN_STREAMLIT_URI", "unix:///run/user/1000/podman/podman.sock")
 }
 
 def show_uri_selector():
@@ -45,9 +47,26 @@ def show_details(client):
     """
     st.sidebar.header("Podman Information")
 
-    version = client.version()
+    version = prefetch_utils.version(client)
     st.sidebar.metric("Release", version["Version"])
     st.sidebar.metric("Compatible API", version["ApiVersion"])
     st.sidebar.metric("OS", version["Components"][0]["Details"]["Os"])
     st.sidebar.metric("Arch", version["Arch"])
-    st.sidebar.metric("Go Version", version["GoVersion"])
\ No newline at end of file
+    st.sidebar.metric("Go Version", version["GoVersion"])
+def show_session_footprint():
+    """
+    Display how much memory this browser session's state holds in the sidebar.
+
+    The total and the largest entries are shown, which helps spot state that grows with the
+    size of the inventory.
+
+    Returns:
+        None
+    """
+    from utils import memory_utils
+
+    sizes = memory_utils.session_footprint(st.session_state)
+    total = sum(size for _, size in sizes)
+    with st.sidebar.expander(f"Session Memory: {total / 1024 / 1024:.2f} MB"):
+        for key, size in sizes[:8]:
+            st.caption(f"{key}: {size / 1024:.1f} KB")
@@ -1,7 +1,7 @@
 import streamlit as st
-import pandas as pd
-import altair as alt
+from utils import usage_utils
 
+@st.fragment
 def show(client):
     """
     Displays usage details for containers, images, and volumes.
@@ -16,7 +16,13 @@ def show(client):
     Returns:
         None
     """
-    resource_data = client.df()
+    import pandas as pd
+    import altair as alt
+
+    if st.button("🔄 Refresh Usage"):
+        usage_utils.clear_disk_usage()
+
+    resource_data = usage_utils.get_disk_usage(client)
 
     st.subheader("Containers")
     container_data = pd.DataFrame(resource_data["Containers"])
@@ -0,0 +1,122 @@
+import sqlite3
+import time
+from datetime import datetime
+import streamlit as st
+from utils import usage_history
+
+# the ranges trends can be shown over, in seconds
+RANGES = {
+    "24 hours": 86400,
+    "7 days": 7 * 86400,
+    "30 days": 30 * 86400,
+    "90 days": 90 * 86400,
+    "1 year": 365 * 86400,
+}
+
+@st.cache_resource(show_spinner=False)
+def get_history():
+    """
+    Opens the disk usage history once per process.
+
+    Returns:
+        UsageHistory: The history configured by `PODMAN_STREAMLIT_USAGE_DB`.
+    """
+    return usage_history.open_history()
+
+@st.fragment
+def show(client, uri):
+    """
+    Displays how disk usage changed over time, when storage is expected to fill up, and which
+    images, containers and volumes grew or shrank the most.
+
+    Args:
+        client (PodmanClient): A client object used to record a snapshot on demand.
+        uri (str): The Podman service URI whose history is shown.
+
+    Returns:
+        None
+    """
+    import altair as alt
+    import pandas as pd
+
+    try:
+        history = get_history()
+    except (OSError, sqlite3.Error) as e:
+        st.warning(f"The disk usage history can't be opened: {e}")
+        return
+    rangeCol, recordCol = st.columns([3, 1], vertical_alignment="bottom")
+    with rangeCol:
+        selected_range = st.selectbox("Range", list(RANGES), index=1, key="usage_trend_range")
+    with recordCol:
+        if st.button("📸 Record Snapshot"):
+            usage_history.take_snapshot(history, client, uri)
+
+    now = time.time()
+    since = now - RANGES[selected_range]
+    totals = history.totals(uri, since, now)
+    if not totals:
+        st.info(
+            "No snapshots in this range yet. They are recorded every `PODMAN_STREAMLIT_USAGE_INTERVAL` "
+            "seconds while the app runs, or with `cli.py usage record`."
+        )
+        return
+
+    data = pd.DataFrame(totals)
+    data["Time"] = pd.to_datetime(data["taken"], unit="s", utc=True).dt.tz_convert(datetime.now().astimezone().tzinfo)
+    stacked = data.melt(
+        id_vars="Time", value_vars=["images", "containers", "volumes"], var_name="Kind", value_name="Bytes"
+    )
+    stacked["Size (GB)"] = stacked["Bytes"] / 1024 ** 3
+    st.altair_chart(
+        alt.Chart(stacked).mark_area(interpolate="step-after").encode(
+            x=alt.X("Time:T", title=None),
+            y=alt.Y("Size (GB):Q", stack=True),
+            color=alt.Color("Kind:N"),
+            tooltip=["Time:T", "Kind:N", alt.Tooltip("Size (GB):Q", format=".2f")],
+        ).properties(height=250),
+        use_container_width=True,
+    )
+
+    # forecast the filesystem if Podman reports it, otherwise what Podman's objects use
+    measured = data["used"].notna().all()
+    used = data["used"] if measured else data["images"] + data["containers"] + data["volumes"]
+    latest_capacity = data["capacity"].dropna().iloc[-1] if data["capacity"].notna().any() else 0
+    capacity_gb = st.number_input(
+        "Storage capacity (GB)",
+        min_value=0.0,
+        value=round(float(latest_capacity) / 1024 ** 3, 1),
+        key="usage_trend_capacity",
+        help="Reported by Podman when available. Set it to forecast when storage fills up.",
+    )
+    forecast = usage_history.linear_forecast(data["taken"].tolist(), used.tolist(), capacity_gb * 1024 ** 3)
+    growthCol, currentCol, fullCol = st.columns(3)
+    growthCol.metric(
+        "Growth per Day", f"{forecast['slope'] * 86400 / 1024 ** 3:+.2f} GB" if forecast else "Not enough data"
+    )
+    currentCol.metric("Filesystem Used" if measured else "Used by Podman", f"{used.iloc[-1] / 1024 ** 3:.2f} GB")
+    if forecast and forecast["full_at"]:
+        full_at = datetime.fromtimestamp(forecast["full_at"])
+        fullCol.metric("Full Around", f"{full_at:%Y-%m-%d}", f"in {max(forecast['full_at'] - now, 0) / 86400:.0f} days", delta_color="off")
+        line = pd.DataFrame({"taken": [data["taken"].iloc[0], forecast["full_at"]]})
+        line["Size (GB)"] = (forecast["intercept"] + forecast["slope"] * line["taken"]) / 1024 ** 3
+        line["Time"] = pd.to_datetime(line["taken"], unit="s", utc=True).dt.tz_convert(data["Time"].dt.tz)
+        observed = pd.DataFrame({"Time": data["Time"], "Size (GB)": used / 1024 ** 3})
+        st.altair_chart(
+            alt.Chart(observed).mark_line(point=True).encode(x=alt.X("Time:T", title=None), y="Size (GB):Q")
+            + alt.Chart(line).mark_line(strokeDash=[6, 4], color="gray").encode(x="Time:T", y="Size (GB):Q")
+            + alt.Chart(pd.DataFrame({"Size (GB)": [capacity_gb]})).mark_rule(color="red").encode(y="Size (GB):Q"),
+            use_container_width=True,
+        )
+    elif forecast and capacity_gb and forecast["slope"] > 0:
+        # growing too slowly to fill up within the forecast horizon
+        fullCol.metric("Full Around", f"Not within {usage_history.FORECAST_HORIZON / (365 * 86400):.0f} years")
+    else:
+        fullCol.metric("Full Around", "Not growing" if forecast and capacity_gb else "Unknown")
+
+    st.subheader(f"Changes over the last {selected_range}")
+    kinds = st.multiselect("Kinds", list(usage_history.KINDS), default=list(usage_history.KINDS), key="usage_trend_kinds")
+    deltas = [row for row in history.deltas(uri, since, now) if row["Kind"] in kinds]
+    if deltas:
+        st.dataframe(deltas, hide_index=True, width="stretch")
+    else:
+        st.caption("Nothing changed in this range.")
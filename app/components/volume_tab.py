@@ -1,8 +1,9 @@
 import streamlit as st
-import pandas as pd
-from dateutil import parser 
-from tzlocal import get_localzone
+from podman.errors import APIError
+from components import inspect_view, jobs, quadlets
+from utils import container_utils, inventory_utils, prefetch_utils, prune_utils, quadlet_utils, rerun_utils, usage_utils, volume_utils
 
+@st.fragment
 def show(client):
     """
     Displays a tab in Streamlit that shows information about Podman volumes.
@@ -16,20 +17,23 @@ def show(client):
     Returns:
         None
     """
+    import pandas as pd
+
     st.header("💽 Podman Volumes")
-    volumes = client.volumes.list()
+    volumes = prefetch_utils.listing(client, "volumes")
     if volumes:
         volume_data = []
-        my_timezone = get_localzone()
+        my_timezone = inventory_utils.local_timezone()
+        # refreshes the container records, re-inspecting only containers that changed since the last listing
+        container_utils.get(client)
+        mount_index = volume_utils.build_mount_index(st.session_state.container_records.values())
+        usage_index = volume_utils.build_usage_index(usage_utils.get_disk_usage(client))
         for volume in volumes:
-            created_timestamp = volume.attrs["CreatedAt"]
-            created_time = parser.isoparse(created_timestamp).astimezone(my_timezone)
             volume_data.append({
                 "Selected": False,
-                "Name": volume.name,
-                "Scope": volume.attrs["Scope"],
-                "Mount Point": f'{volume.attrs["Mountpoint"]}',
-                "Created": created_time,
+                **inventory_utils.volume_row(
+                    volume, mount_index.get(volume.name, []), usage_index.get(volume.name, {}), my_timezone
+                ),
             })
 
         df_volumes = pd.DataFrame(volume_data)
@@ -39,21 +43,24 @@ def show(client):
             [
                 "Select action...",
                 "🔍 Inspect",
+                "📄 Generate Quadlet",
                 "🗑️ Remove",
                 "✂️ Prune",
                 "🔄 Refresh"
-            ]
+            ],
+            key="volume_action"
         )
 
         # Convert dropdown selection to button clicks
         inspect_all = action == "🔍 Inspect"
+        generate_quadlet = action == "📄 Generate Quadlet"
         remove_all = action == "🗑️ Remove"
         prune_all = action == "✂️ Prune"
         refresh_all = action == "🔄 Refresh"
 
         edited_volumes_df = st.data_editor(df_volumes, 
                     hide_index=True,
-                    disabled=("Name","Created"), 
+                    disabled=("Name","Used By","Size (MB)","Reclaimable (MB)","Created"), 
                     column_config={
                         "Selected": st.column_config.CheckboxColumn(
                             "",
@@ -65,23 +72,38 @@ def show(client):
         selected_volumes = edited_volumes_df[edited_volumes_df['Selected']]
 
         if inspect_all and not selected_volumes.empty:
-            for _, row in selected_volumes.iterrows():
-                volume_name = row['Name']
-                volume = client.volumes.get(volume_name)
-                st.write(volume.attrs)
+            inspect_view.show(
+                inspect_view.cached_payloads("volumes", selected_volumes['Name'], lambda name: client.volumes.get(name).attrs),
+                "volumes",
+            )
+
+        if generate_quadlet and not selected_volumes.empty:
+            # volume listings carry the full inspect payload
+            attrs = {volume.name: volume.attrs for volume in volumes}
+            quadlets.show([quadlet_utils.volume_unit(attrs[name]) for name in selected_volumes['Name']], "volumes")
 
         if remove_all and not selected_volumes.empty:
-            for _, row in selected_volumes.iterrows():
+            in_use = selected_volumes[selected_volumes['Used By'].map(len) > 0]
+            for _, row in in_use.iterrows():
+                st.warning(f"Volume '{row['Name']}' is in use by {', '.join(row['Used By'])} and was not removed.")
+            failed = False
+            for _, row in selected_volumes[selected_volumes['Used By'].map(len) == 0].iterrows():
                 volume_name = row['Name']
-                volume = client.volumes.get(volume_name)
-                volume.remove(force=True)
-            st.rerun()
+                try:
+                    client.volumes.get(volume_name).remove()
+                except APIError as e:
+                    # e.g. a container mounted it since the listing
+                    st.warning(f"Volume '{volume_name}' was not removed: {e}")
+                    failed = True
+            usage_utils.clear_disk_usage()
+            if in_use.empty and not failed:
+                rerun_utils.rerun_fragment("volume_action")
 
         if prune_all:
-            client.volumes.prune()  
-            st.rerun()
+            jobs.start("Prune volumes", prune_utils.prune_job, (["volumes"],), reset_keys=("volume_action",))
 
         if refresh_all:
-            st.rerun()
+            usage_utils.clear_disk_usage()
+            rerun_utils.rerun_fragment("volume_action")
     else:
         st.info("No volumes found.")
\ No newline at end of file
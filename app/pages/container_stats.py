@@ -2,26 +2,18 @@ import streamlit as st
 from podman import PodmanClient
 from components import (
     header,
+    profiler,
     sidebar
 )
-import pandas as pd
-import numpy as np
-import altair as alt
+from utils import container_utils, sampling, stats_collector, stats_utils
 import time
-from datetime import datetime
-
-def calculate_cpu_percent(current_stats, previous_stats):
-    if not previous_stats:
-        return 0.0
-    
-    cpu_delta = current_stats['CPUNano'] - previous_stats['CPUNano']
-    system_delta = current_stats['SystemNano'] - previous_stats['SystemNano']
-    
-    if system_delta > 0:
-        return (cpu_delta / system_delta) * 100.0
-    return 0.0
+import uuid
+from datetime import datetime, timedelta
 
 def create_cpu_chart(data):
+    import altair as alt
+    import pandas as pd
+
     # Ensure we have valid data
     if len(data) == 0 or data['cpu_percent'].isnull().all():
         # Create empty chart with domain
@@ -45,6 +37,9 @@ def create_cpu_chart(data):
     ).properties(height=250, title='CPU Usage')
 
 def create_memory_chart(data):
+    import altair as alt
+    import pandas as pd
+
     # Ensure we have valid data
     if len(data) == 0 or data['memory_mb'].isnull().all():
         # Create empty chart with domain
@@ -70,62 +65,129 @@ def create_memory_chart(data):
         tooltip=['timestamp:T', 'memory_mb:Q']
     ).properties(height=250, title='Memory Usage')
 
-def create_network_chart(data):
+def create_series_chart(data, title, y_title, empty_max):
+    """
+    Create a multi-series line chart from long-form data.
+
+    Args:
+        data (DataFrame): Long-form data with "timestamp", "Metric" and "Value" columns.
+        title (str): The chart title.
+        y_title (str): The y axis title.
+        empty_max (float): The y axis maximum to use while there is no data.
+
+    Returns:
+        altair.Chart: The line chart, or an empty chart with a fixed domain if there is no data.
+    """
+    import altair as alt
+    import pandas as pd
+
     # Ensure we have valid data
-    if len(data) == 0 or (data['rx_bytes'].isnull().all() and data['tx_bytes'].isnull().all()):
+    if len(data) == 0 or data['Value'].isnull().all():
         # Create empty chart with domain
-        empty_data = pd.DataFrame({
-            'timestamp': [datetime.now()],
-            'rx_bytes': [0],
-            'tx_bytes': [0]
-        })
-        return alt.Chart(empty_data).transform_fold(
-            ['rx_bytes', 'tx_bytes'],
-            as_=['Metric', 'Value']
-        ).mark_line(
-            point=False
-        ).encode(
-            x=alt.X('timestamp:T', title='Time'),
-            y=alt.Y('Value:Q', title='Network (KB/s)', scale=alt.Scale(domain=[0, 1000])),
-            color=alt.Color('Metric:N'),
-            tooltip=['timestamp:T', 'Value:Q', 'Metric:N']
-        ).properties(height=250, title='Network Traffic')
-
-    max_network = max(
-        data['rx_bytes'].max() if not data['rx_bytes'].isnull().all() else 0,
-        data['tx_bytes'].max() if not data['tx_bytes'].isnull().all() else 0
-    )
-    return alt.Chart(data).transform_fold(
-        ['rx_bytes', 'tx_bytes'],
-        as_=['Metric', 'Value']
-    ).mark_line(
+        data = pd.DataFrame({'timestamp': [datetime.now()], 'Metric': [''], 'Value': [0]})
+        max_value = empty_max
+    else:
+        max_value = data['Value'].max() * 1.1 or empty_max
+
+    return alt.Chart(data).mark_line(
         point=False
     ).encode(
         x=alt.X('timestamp:T', title='Time'),
-        y=alt.Y('Value:Q', title='Network (KB/s)', scale=alt.Scale(domain=[0, max_network * 1.1])),
+        y=alt.Y('Value:Q', title=y_title, scale=alt.Scale(domain=[0, max_value])),
         color=alt.Color('Metric:N'),
         tooltip=['timestamp:T', 'Value:Q', 'Metric:N']
-    ).properties(height=250, title='Network Traffic')
+    ).properties(height=250, title=title)
+
+def create_network_chart(network):
+    return create_series_chart(network, 'Network Traffic', 'Network (KB/s)', 1000)
+
+def create_block_io_chart(data):
+    block_io = data.melt(
+        id_vars='timestamp', value_vars=['block_read_kbs', 'block_write_kbs'], var_name='Metric', value_name='Value'
+    ).replace({'Metric': {'block_read_kbs': 'read', 'block_write_kbs': 'write'}})
+    return create_series_chart(block_io, 'Block I/O', 'Block I/O (KB/s)', 1000)
+
+def create_memory_percent_chart(data):
+    memory_percent = data[['timestamp', 'memory_percent']].rename(columns={'memory_percent': 'Value'}).assign(Metric='% of limit')
+    return create_series_chart(memory_percent, 'Memory Usage (% of Limit)', 'Memory (%)', 100)
+
+def create_pids_chart(data):
+    pids = data[['timestamp', 'pids']].rename(columns={'pids': 'Value'}).assign(Metric='PIDs')
+    return create_series_chart(pids, 'Processes', 'PIDs', 10)
+
+def filter_containers(index, search, running_only, labels):
+    """
+    Filters the container index for the selector.
+
+    Args:
+        index (dict): The container index from `container_utils.get_container_index`.
+        search (str): Text the container's name, short ID or image must contain, case-insensitively.
+        running_only (bool): Whether to keep only running containers.
+        labels (list): "key=value" labels the container must all have.
+
+    Returns:
+        list: The IDs of the matching containers, in listing order.
+    """
+    search = search.strip().lower()
+    labels = set(labels)
+    return [
+        container_id for container_id, entry in index.items()
+        if (not running_only or entry["state"].lower() == "running")
+        and labels <= entry["labels"]
+        and (not search or search in entry["label"].lower() or search in entry["image"].lower())
+    ]
 
 def show_container_selector(client):
-    containers = client.containers.list(all=True)
-    container_options = [(None, "Select a container...")] + [(c.id, f"{c.name} ({c.short_id})") for c in containers]
-    
+    """
+    Shows the container selector, with search, running-only and label filters.
+
+    The options come from the shared container index, which is only re-listed when containers
+    are invalidated, so the page's one-second reruns don't list containers every time.
+
+    Args:
+        client (PodmanClient): A client object used to list the containers when the index is rebuilt.
+
+    Returns:
+        tuple: The selected container's ID and name, or (None, None).
+    """
     if 'current_container_id' not in st.session_state:
         st.session_state.current_container_id = None
-    
+
+    searchCol, labelCol, runningCol, refreshCol = st.columns([3, 3, 1, 1], vertical_alignment="bottom")
+    with refreshCol:
+        if st.button("🔄", help="List the containers again"):
+            container_utils.invalidate_container_index()
+    index = container_utils.get_container_index(client)
+    with searchCol:
+        search = st.text_input("Search containers", key="stats_search", placeholder="Name, ID or image")
+    with labelCol:
+        labels = st.multiselect(
+            "Labels", sorted(set().union(*(entry["labels"] for entry in index.values()))), key="stats_labels"
+        )
+    with runningCol:
+        running_only = st.toggle("Running only", key="stats_running_only")
+
+    options = filter_containers(index, search, running_only, labels)
+    # keep the watched container selectable while the filters change
+    current = st.session_state.current_container_id
+    if current in index and current not in options:
+        options.insert(0, current)
+    st.caption(f"{len(options)} of {len(index)} containers")
+
     selected_id = st.selectbox(
         "Select Container",
-        options=[id for id, _ in container_options],
-        format_func=lambda x: next(name for id, name in container_options if id == x)
+        options=options,
+        index=options.index(current) if current in options else None,
+        format_func=lambda container_id: index[container_id]["label"],
+        placeholder="Select a container...",
     )
-    
+
     if selected_id != st.session_state.current_container_id:
-        st.session_state.stats_data = []
-        st.session_state.previous_stats = None
         st.session_state.current_container_id = selected_id
-    
-    return selected_id
+
+    if selected_id is None:
+        return None, None
+    return selected_id, index[selected_id]["name"]
 
 def clear_placeholders():
     """Clear all placeholder widgets"""
@@ -141,13 +203,20 @@ def cleanup_session_state():
     """Clean up session state when leaving the page"""
     # Clear placeholders first
     clear_placeholders()
+
+    if 'stats_view_id' in st.session_state:
+        stats_collector.get_registry().unsubscribe(st.session_state.stats_view_id)
     
     # Clean up other session state
     keys_to_clear = [
-        'stats_data',
-        'previous_stats',
         'current_container_id',
+        'stats_search',
+        'stats_labels',
+        'stats_running_only',
         'retention_seconds',
+        'sampling_interval',
+        'stats_polled',
+        'stats_view_id',
         'page_active'
     ]
     
@@ -155,23 +224,35 @@ def cleanup_session_state():
         if key in st.session_state:
             del st.session_state[key]
 
-def initialize_stats_data(seconds, end_time=None):
-    """Initialize empty stats data for the specified number of seconds"""
-    if end_time is None:
-        end_time = datetime.now()
-    return [
-        {
-            'timestamp': end_time - pd.Timedelta(seconds=i),
-            'cpu_percent': 0.0,
-            'memory_mb': 0.0,
-            'rx_bytes': 0.0,
-            'tx_bytes': 0.0
-        }
-        for i in range(seconds, 0, -1)
-    ]
+def wait_for_next_sample(delay, placeholder):
+    """
+    Wait until the next sample is due, keeping the page responsive.
+
+    The countdown is re-rendered every half second, which gives Streamlit a chance to interrupt
+    the wait as soon as the user interacts with the page instead of after a long backoff.
+
+    Args:
+        delay (float): Seconds until the next sample.
+        placeholder (streamlit.delta_generator.DeltaGenerator): Where to show the countdown.
+
+    Returns:
+        None
+    """
+    deadline = time.monotonic() + delay
+    while (remaining := deadline - time.monotonic()) > 0:
+        if remaining > 1:
+            placeholder.caption(f"Next sample in {remaining:.0f}s")
+        time.sleep(min(0.5, remaining))
 
-def get_network_interfaces(stats):
-    return list(stats['Network'].keys())
+# chart placeholders in display order, and the function building each chart from the metrics
+CHARTS = {
+    'cpu': lambda metrics, network: create_cpu_chart(metrics),
+    'memory': lambda metrics, network: create_memory_chart(metrics),
+    'memory_percent': lambda metrics, network: create_memory_percent_chart(metrics),
+    'network': lambda metrics, network: create_network_chart(network),
+    'block_io': lambda metrics, network: create_block_io_chart(metrics),
+    'pids': lambda metrics, network: create_pids_chart(metrics),
+}
 
 def create_chart_containers():
     """Create the containers for the charts in vertical layout"""
@@ -179,11 +260,10 @@ def create_chart_containers():
     clear_placeholders()
     
     # Create placeholders for vertical layout
-    st.session_state.placeholders['cpu'] = st.empty()
-    st.session_state.placeholders['memory'] = st.empty()
-    st.session_state.placeholders['network'] = st.empty()
+    for name in CHARTS:
+        st.session_state.placeholders[name] = st.empty()
 
-def show_container_stats(client, container_id):
+def show_container_stats(container_id, container_name):
     # Initialize session state for page activity tracking
     if 'page_active' not in st.session_state:
         st.session_state.page_active = True
@@ -191,29 +271,48 @@ def show_container_stats(client, container_id):
     # Reset page activity when the function starts
     st.session_state.page_active = True
 
-    # Convert container_id to bytes before getting the container
-    container_id_bytes = str(container_id).encode('utf-8')
-    container = client.containers.get(container_id_bytes)
-    container.reload()
-
-    st.header(f"Container Stats: {container.name}")
+    st.header(f"Container Stats: {container_name}")
 
     # Retention period control
     if 'retention_seconds' not in st.session_state:
         st.session_state.retention_seconds = 60
     
-    st.session_state.retention_seconds = st.number_input(
-        "Data retention period (seconds)", 
-        min_value=10, 
-        max_value=3600, 
-        value=st.session_state.retention_seconds,
-        help="How many seconds of historical data to keep in the charts"
+    if 'sampling_interval' not in st.session_state:
+        st.session_state.sampling_interval = 1
+
+    retentionCol, intervalCol = st.columns(2)
+    with retentionCol:
+        st.session_state.retention_seconds = st.number_input(
+            "Data retention period (seconds)", 
+            min_value=10, 
+            max_value=3600, 
+            value=st.session_state.retention_seconds,
+            help="How many seconds of historical data to keep in the charts"
+        )
+    with intervalCol:
+        st.session_state.sampling_interval = st.number_input(
+            "Sampling interval (seconds)",
+            min_value=1,
+            max_value=60,
+            value=st.session_state.sampling_interval,
+            help="How often to sample stats while you're interacting with the page. Idle pages sample less often."
+        )
+
+    # every session watching this container reads the same collector; each rerun is a heartbeat,
+    # and any rerun the live view didn't start itself, e.g. a changed option, counts as activity
+    # and resets the idle backoff
+    if 'stats_view_id' not in st.session_state:
+        st.session_state.stats_view_id = uuid.uuid4().hex
+    collector = stats_collector.get_registry().subscribe(
+        st.session_state.selected_uri,
+        container_id,
+        st.session_state.stats_view_id,
+        st.session_state.sampling_interval,
+        st.session_state.retention_seconds,
+        active=not st.session_state.pop('stats_polled', False)
     )
+    status = st.empty()
 
-    if 'stats_data' not in st.session_state:
-        st.session_state.stats_data = initialize_stats_data(st.session_state.retention_seconds)
-    if 'previous_stats' not in st.session_state:
-        st.session_state.previous_stats = None
     if 'placeholders' not in st.session_state:
         st.session_state.placeholders = {}
 
@@ -222,81 +321,45 @@ def show_container_stats(client, container_id):
         create_chart_containers()
 
     try:
-        stats_response = container.stats(stream=False, decode=True)
-        current_stats = stats_response['Stats'][0]
-        
-        cpu_percent = calculate_cpu_percent(current_stats, st.session_state.previous_stats)
-        
-        network_interfaces = get_network_interfaces(current_stats)
-        selected_interface = network_interfaces[0] if network_interfaces else None
-        
-        if not selected_interface:
-            st.warning("No network interface available.")
-            return
-
-        if st.session_state.previous_stats:
-            time_delta = (current_stats['SystemNano'] - st.session_state.previous_stats['SystemNano']) / 1e9
-            rx_bytes = (current_stats['Network'][selected_interface]['RxBytes'] - 
-                       st.session_state.previous_stats['Network'][selected_interface]['RxBytes']) / (1024 * time_delta)  # Convert to KB/s
-            tx_bytes = (current_stats['Network'][selected_interface]['TxBytes'] - 
-                       st.session_state.previous_stats['Network'][selected_interface]['TxBytes']) / (1024 * time_delta)  # Convert to KB/s
-        else:
-            rx_bytes = tx_bytes = 0
-        
-        current_time = datetime.now()
-        record = {
-            'timestamp': current_time,
-            'cpu_percent': cpu_percent,
-            'memory_mb': current_stats['MemUsage'] / (1024 * 1024),
-            'rx_bytes': rx_bytes,
-            'tx_bytes': tx_bytes
-        }
-        
-        max_points = st.session_state.retention_seconds
-        current_points = len(st.session_state.stats_data)
-        
-        if current_points > max_points:
-            st.session_state.stats_data = st.session_state.stats_data[-max_points:]
-        elif current_points < max_points:
-            padding_needed = max_points - current_points
-            if current_points > 0:
-                oldest_time = st.session_state.stats_data[0]['timestamp']
-                padding = initialize_stats_data(padding_needed, oldest_time)
-                st.session_state.stats_data = padding + st.session_state.stats_data
-            else:
-                st.session_state.stats_data = initialize_stats_data(max_points - 1, current_time)
-        
-        st.session_state.stats_data.append(record)
-        st.session_state.previous_stats = current_stats
-
-        try:
-            # Create DataFrame and ensure timestamp is datetime type
-            stats_df = pd.DataFrame(st.session_state.stats_data)
-            stats_df['timestamp'] = pd.to_datetime(stats_df['timestamp'])
-            
-            # Remove any rows with NaT timestamps or infinite values
-            stats_df = stats_df.replace([np.inf, -np.inf], np.nan)
-            stats_df = stats_df.dropna(subset=['timestamp'])
-
-            # Update charts
-            if 'placeholders' in st.session_state:
-                st.session_state.placeholders['cpu'].altair_chart(create_cpu_chart(stats_df), use_container_width=True)
-                st.session_state.placeholders['memory'].altair_chart(create_memory_chart(stats_df), use_container_width=True)
-                st.session_state.placeholders['network'].altair_chart(create_network_chart(stats_df), use_container_width=True)
-        except Exception as e:
-            # If we can't update the charts, the page is probably being unmounted
-            st.error(f"Error updating charts: {str(e)}")
-            return
-
-        # Check if we should continue updating
-        if st.session_state.page_active:
-            time.sleep(1)
-            st.rerun()
+        if collector.error:
+            raise RuntimeError(collector.error)
+
+        # read the shared buffer, anchored by a timestamp-only record so the x axis spans the retention window
+        window_start = datetime.now() - timedelta(seconds=st.session_state.retention_seconds)
+        samples = collector.window(st.session_state.retention_seconds)
+        if not samples or samples[0]['timestamp'] > window_start:
+            samples.insert(0, {'timestamp': window_start})
+
+        metrics, network = stats_utils.compute_rates(samples)
+
+        # Update charts, each on its own so one missing metric doesn't hide the others
+        if 'placeholders' in st.session_state:
+            for name, create_chart in CHARTS.items():
+                with profiler.section(f"Chart: {name}"):
+                    try:
+                        st.session_state.placeholders[name].altair_chart(create_chart(metrics, network), use_container_width=True)
+                    except Exception as e:
+                        st.session_state.placeholders[name].warning(f"Error updating {name} chart: {str(e)}")
+
     except Exception as e:
         st.error(f"Error updating stats: {str(e)}")
-        if st.session_state.page_active:
-            time.sleep(1)
-            st.rerun()
+
+    # Check if we should continue updating
+    if st.session_state.page_active:
+        # the collector may have just stopped, its replacement starts on the next rerun
+        interval = sampling.get_scheduler().effective_interval(collector.view_id) or st.session_state.sampling_interval
+        viewers = collector.viewer_count()
+        watching = f"{viewers} viewers share this container's samples. " if viewers > 1 else ""
+        if interval > st.session_state.sampling_interval:
+            status.caption(f"{watching}Sampling every {interval:.0f}s while idle. Interact with the page to resume.")
+        elif watching:
+            status.caption(watching)
+        # redraw just after the collector's next sample lands
+        delay = min(max(collector.next_sample - time.monotonic(), 0) + 0.2, interval)
+        with profiler.section("Waiting for sample"):
+            wait_for_next_sample(delay, st.empty())
+        st.session_state.stats_polled = True
+        st.rerun()
 
 def main():
     # Check if we're coming from a different page
@@ -312,7 +375,14 @@ def main():
     # Initialize page state
     if 'page_active' not in st.session_state:
         st.session_state.page_active = True
-    
+
+    # shown first, so the switch keeps its state although every rerun of this page ends early
+    profiler.show()
+
+    with profiler.rerun("container_stats"):
+        show_page()
+
+def show_page():
     header.show()
 
     try:
@@ -322,10 +392,13 @@ def main():
             
             # Only proceed if the page is still active
             if st.session_state.page_active:
-                container_id = show_container_selector(client)
+                with profiler.section("Selector"):
+                    container_id, container_name = show_container_selector(client)
             if container_id is not None:
-                show_container_stats(client, container_id)
+                show_container_stats(container_id, container_name)
             else:
+                if 'stats_view_id' in st.session_state:
+                    stats_collector.get_registry().unsubscribe(st.session_state.stats_view_id)
                 st.info("Please select a container to view its statistics.")
     except Exception as e:
         st.exception(e)
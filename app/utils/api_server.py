@@ -0,0 +1,189 @@
+"""
+Read-only JSON API serving cached inventory snapshots to other tools.
+
+Every kind of resource is fetched from Podman at most once per TTL however many consumers poll,
+and each snapshot carries an ETag so pollers sending If-None-Match get a 304 when nothing changed.
+
+Routes:
+    GET /api/v1/                 the available snapshots
+    GET /api/v1/<kind>           the rows of one kind, as shown in its tab
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from utils import inventory_utils
+
+API_PREFIX = "/api/v1/"
+
+class SnapshotCache:
+    """
+    Holds one serialized snapshot per kind of resource, refreshed on demand once it's older than the TTL.
+
+    Concurrent requests for a stale snapshot wait for a single refresh instead of each querying Podman.
+    """
+
+    def __init__(self, uri, identity="~/.ssh/id_ed25519", ttl=5.0, max_workers=16):
+        """
+        Args:
+            uri (str): The Podman service URI.
+            identity (str): The SSH identity used for SSH connections.
+            ttl (float): How many seconds a snapshot is served before it's refreshed.
+            max_workers (int): How many containers to inspect at once.
+        """
+        self.uri = uri
+        self.identity = identity
+        self.ttl = ttl
+        self.max_workers = max_workers
+        self.locks = {kind: threading.Lock() for kind in inventory_utils.KINDS}
+        self.snapshots = {}
+        self.container_entries = None
+
+    def get(self, kind):
+        """
+        Returns the snapshot of one kind, refreshing it first if it's stale.
+
+        Args:
+            kind (str): One of `inventory_utils.KINDS`.
+
+        Returns:
+            dict: The snapshot's serialized "body", its "etag", when it was "generated" and
+                when it was last "refreshed".
+        """
+        with self.locks[kind]:
+            snapshot = self.snapshots.get(kind)
+            if snapshot is None or time.monotonic() - snapshot["refreshed"] >= self.ttl:
+                snapshot = self.snapshots[kind] = self.refresh(kind, snapshot)
+            return snapshot
+
+    def refresh(self, kind, previous):
+        """
+        Fetches a kind of resource from Podman and serializes it.
+
+        Args:
+            kind (str): One of `inventory_utils.KINDS`.
+            previous (dict): The snapshot being replaced, or None.
+
+        Returns:
+            dict: The new snapshot. If its content is unchanged, it keeps the previous ETag and generation time.
+        """
+        from podman import PodmanClient
+
+        with PodmanClient(base_url=self.uri, identity=self.identity) as client:
+            if kind == "containers":
+                # containers are refreshed incrementally, re-inspecting only the ones that changed
+                self.container_entries = inventory_utils.container_snapshot(
+                    client, self.container_entries, self.max_workers
+                )
+                rows = [entry["row"] for entry in self.container_entries.values()]
+            else:
+                rows = list(inventory_utils.iter_rows(client, kind, self.max_workers))
+
+        body = json.dumps(rows, default=inventory_utils.to_json, ensure_ascii=False).encode()
+        etag = f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+        if previous and previous["etag"] == etag:
+            return {**previous, "refreshed": time.monotonic()}
+        return {"body": body, "etag": etag, "generated": datetime.now(timezone.utc), "refreshed": time.monotonic()}
+
+def make_handler(cache):
+    """
+    Creates a request handler class serving snapshots from a cache.
+
+    Args:
+        cache (SnapshotCache): The snapshots to serve.
+
+    Returns:
+        type: A `BaseHTTPRequestHandler` subclass.
+    """
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, format, *args):
+            pass
+
+        def do_GET(self):
+            path = self.path.partition("?")[0]
+            if path in (API_PREFIX, API_PREFIX.rstrip("/")):
+                return self.respond_json(200, {"snapshots": [API_PREFIX + kind for kind in inventory_utils.KINDS]})
+            if not path.startswith(API_PREFIX) or path[len(API_PREFIX):] not in inventory_utils.KINDS:
+                return self.respond_json(404, {"message": f"{path} not found"})
+
+            try:
+                snapshot = cache.get(path[len(API_PREFIX):])
+            except Exception as e:
+                return self.respond_json(502, {"message": f"Error fetching from Podman: {e}"})
+
+            headers = {
+                "ETag": snapshot["etag"],
+                "Last-Modified": snapshot["generated"].strftime("%a, %d %b %Y %H:%M:%S GMT"),
+                "Cache-Control": f"max-age={int(cache.ttl)}",
+            }
+            if snapshot["etag"] in self.headers.get("If-None-Match", "").replace(" ", "").split(","):
+                return self.respond(304, b"", headers)
+            self.respond(200, snapshot["body"], headers)
+
+        def reject(self):
+            self.respond_json(405, {"message": "This API is read-only"})
+
+        do_POST = do_PUT = do_PATCH = do_DELETE = reject
+
+        def respond_json(self, status, payload):
+            self.respond(status, json.dumps(payload).encode(), {})
+
+        def respond(self, status, body, headers):
+            self.send_response(status)
+            for name, value in headers.items():
+                self.send_header(name, value)
+            if status != 304:
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            if status != 304:
+                self.wfile.write(body)
+
+    return Handler
+
+def serve(cache, host="127.0.0.1", port=8502):
+    """
+    Starts the API on a background thread.
+
+    Args:
+        cache (SnapshotCache): The snapshots to serve.
+        host (str): The address to listen on.
+        port (int): The port to listen on.
+
+    Returns:
+        ThreadingHTTPServer: The running server. Call `shutdown()` to stop it.
+    """
+    server = ThreadingHTTPServer((host, port), make_handler(cache))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="inventory-api", daemon=True).start()
+    return server
+
+def start_sidecar(uri):
+    """
+    Starts the API next to the Streamlit app when `PODMAN_STREAMLIT_API_PORT` is set.
+
+    `PODMAN_STREAMLIT_API_HOST` sets the listen address (default 127.0.0.1) and
+    `PODMAN_STREAMLIT_API_TTL` how many seconds snapshots are reused (default 5).
+
+    Args:
+        uri (str): The Podman service URI to serve snapshots of.
+
+    Returns:
+        ThreadingHTTPServer: The running server, or None if the API is disabled.
+
+    Raises:
+        ValueError: If the port or TTL isn't a number.
+        OverflowError: If the port is out of range.
+        OSError: If the address can't be bound.
+    """
+    port = os.environ.get("PODMAN_STREAMLIT_API_PORT")
+    if not port:
+        return None
+    cache = SnapshotCache(uri, ttl=float(os.environ.get("PODMAN_STREAMLIT_API_TTL", 5)))
+    return serve(cache, os.environ.get("PODMAN_STREAMLIT_API_HOST", "127.0.0.1"), int(port))
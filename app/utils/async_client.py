@@ -0,0 +1,333 @@
+import asyncio
+import json
+import os
+import random
+import tempfile
+from urllib.parse import urlencode, urlparse, unquote
+from podman.api import VERSION
+from podman.errors import APIError
+
+class AsyncPodmanClient:
+    """
+    Minimal asyncio client for the libpod REST API.
+
+    Every request opens its own connection to the Podman socket, so independent calls can
+    be awaited concurrently with `asyncio.gather` and a page only waits for the slowest one.
+    Supports `unix://` and `http+unix://` sockets, and `ssh://` URIs through an SSH-forwarded
+    local socket, mirroring the URIs accepted by `PodmanClient`.
+
+    Usage:
+        async with AsyncPodmanClient(base_url=uri, identity="~/.ssh/id_ed25519") as client:
+            containers, pods = await asyncio.gather(client.containers(), client.pods())
+    """
+
+    def __init__(self, base_url, identity=None, timeout=30):
+        """
+        Args:
+            base_url (str): The Podman API URI, e.g. "unix:///run/user/1000/podman/podman.sock".
+            identity (str): Optional path to an SSH identity key, only used for ssh:// URIs.
+            timeout (float): Seconds to wait for a response before giving up.
+        """
+        self.base_url = base_url
+        self.identity = identity
+        self.timeout = timeout
+        self.socket_path = None
+        self.ssh_process = None
+
+    async def __aenter__(self):
+        await self.open()
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+    async def open(self):
+        """
+        Resolves the socket path, starting an SSH tunnel for ssh:// URIs.
+
+        Returns:
+            None
+        """
+        uri = urlparse(self.base_url)
+        if uri.scheme in ("unix", "http+unix"):
+            # http+unix URIs carry the socket path percent-encoded in the netloc
+            self.socket_path = unquote(uri.netloc) if uri.netloc else uri.path
+        elif uri.scheme in ("ssh", "http+ssh"):
+            await self.open_ssh_tunnel(uri)
+        else:
+            raise ValueError(f"Unsupported Podman URI scheme: {uri.scheme}")
+
+    async def open_ssh_tunnel(self, uri):
+        """
+        Forwards the remote Podman socket to a local socket with `ssh -L`.
+
+        Args:
+            uri (ParseResult): The parsed ssh:// URI.
+
+        Returns:
+            None
+        """
+        self.socket_path = os.path.join(tempfile.gettempdir(), f"podman-forward-{random.getrandbits(80):x}.sock")
+        command = ["ssh", "-N", "-o", "StrictHostKeyChecking no", "-L", f"{self.socket_path}:{uri.path}"]
+        if self.identity:
+            command += ["-i", os.path.expanduser(self.identity)]
+        command += [f"ssh://{uri.netloc}"]
+        # a file rather than a pipe, so ssh never blocks on a full pipe nobody reads while it runs
+        with tempfile.TemporaryFile() as stderr:
+            self.ssh_process = await asyncio.create_subprocess_exec(
+                *command,
+                stdin=asyncio.subprocess.DEVNULL,
+                stdout=asyncio.subprocess.DEVNULL,
+                stderr=stderr,
+            )
+            loop = asyncio.get_running_loop()
+            deadline = loop.time() + self.timeout
+            while not os.path.exists(self.socket_path):
+                if self.ssh_process.returncode is not None or loop.time() > deadline:
+                    await self.close()
+                    stderr.seek(0)
+                    raise APIError(f"SSH tunnel to {uri.netloc} failed", explanation=stderr.read().decode(errors="replace"))
+                await asyncio.sleep(0.1)
+
+    async def close(self):
+        """
+        Stops the SSH tunnel, if any, and removes its local socket.
+
+        Returns:
+            None
+        """
+        if self.ssh_process is not None:
+            if self.ssh_process.returncode is None:
+                self.ssh_process.terminate()
+                await self.ssh_process.wait()
+            self.ssh_process = None
+            if self.socket_path and os.path.exists(self.socket_path):
+                os.unlink(self.socket_path)
+
+    async def send(self, method, path, params=None, body=None):
+        """
+        Sends a request and reads the response status and headers.
+
+        Args:
+            method (str): The HTTP method.
+            path (str): The libpod path, e.g. "/containers/json".
+            params (dict): Optional query parameters. Booleans are sent as "true"/"false".
+            body (bytes): Optional request body.
+
+        Returns:
+            tuple: The status code, a dict of lower-cased headers, and the open stream reader and writer.
+        """
+        query = urlencode({
+            key: str(value).lower() if isinstance(value, bool) else value
+            for key, value in (params or {}).items()
+            if value is not None
+        }, doseq=True)
+        target = f"/v{VERSION}/libpod{path}" + (f"?{query}" if query else "")
+        reader, writer = await asyncio.wait_for(asyncio.open_unix_connection(self.socket_path), self.timeout)
+        request = [f"{method} {target} HTTP/1.1", "Host: d", "Connection: close"]
+        if body is not None:
+            request += ["Content-Type: application/json", f"Content-Length: {len(body)}"]
+        writer.write(("\r\n".join(request) + "\r\n\r\n").encode() + (body or b""))
+        await writer.drain()
+
+        status_line = await asyncio.wait_for(reader.readline(), self.timeout)
+        parts = status_line.split()
+        if len(parts) < 2 or not parts[1].isdigit():
+            writer.close()
+            raise APIError(f"Connection to {self.base_url} closed without a valid response to {method} {path}")
+        status = int(parts[1])
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+        return status, headers, reader, writer
+
+    async def iter_body(self, headers, reader):
+        """
+        Yields the response body in chunks, decoding chunked transfer encoding.
+
+        Args:
+            headers (dict): The lower-cased response headers.
+            reader (StreamReader): The open stream reader.
+
+        Yields:
+            bytes: Body chunks as they arrive.
+        """
+        if headers.get("transfer-encoding", "").lower() == "chunked":
+            while True:
+                size = int((await reader.readline()).split(b";")[0].strip() or b"0", 16)
+                if size == 0:
+                    await reader.readline()
+                    return
+                yield await reader.readexactly(size)
+                await reader.readline()
+        elif "content-length" in headers:
+            remaining = int(headers["content-length"])
+            while remaining > 0:
+                chunk = await reader.read(min(remaining, 65536))
+                if not chunk:
+                    return
+                remaining -= len(chunk)
+                yield chunk
+        else:
+            while chunk := await reader.read(65536):
+                yield chunk
+
+    async def request(self, method, path, params=None, body=None):
+        """
+        Sends a request and returns the decoded JSON response.
+
+        Args:
+            method (str): The HTTP method.
+            path (str): The libpod path.
+            params (dict): Optional query parameters.
+            body (bytes): Optional request body.
+
+        Returns:
+            The decoded JSON payload, or None for an empty body.
+
+        Raises:
+            APIError: If Podman responds with an error status.
+        """
+        status, headers, reader, writer = await self.send(method, path, params, body)
+        try:
+            payload = b"".join([chunk async for chunk in self.iter_body(headers, reader)])
+        finally:
+            writer.close()
+        if status >= 400:
+            raise APIError(f"{status} {method} {path}", explanation=payload.decode(errors="replace"))
+        return json.loads(payload) if payload.strip() else None
+
+    async def stream(self, path, params=None):
+        """
+        Sends a GET request and yields each newline-delimited JSON object as it arrives.
+
+        Args:
+            path (str): The libpod path.
+            params (dict): Optional query parameters.
+
+        Yields:
+            The decoded JSON objects.
+
+        Raises:
+            APIError: If Podman responds with an error status.
+        """
+        status, headers, reader, writer = await self.send("GET", path, params)
+        try:
+            if status >= 400:
+                payload = b"".join([chunk async for chunk in self.iter_body(headers, reader)])
+                raise APIError(f"{status} GET {path}", explanation=payload.decode(errors="replace"))
+            buffer = b""
+            async for chunk in self.iter_body(headers, reader):
+                buffer += chunk
+                *lines, buffer = buffer.split(b"\n")
+                for line in lines:
+                    if line.strip():
+                        yield json.loads(line)
+            if buffer.strip():
+                yield json.loads(buffer)
+        finally:
+            writer.close()
+
+    async def containers(self, all=True):
+        """Lists containers, including stopped ones when `all` is True."""
+        return await self.request("GET", "/containers/json", {"all": all})
+
+    async def inspect_container(self, container_id):
+        """Returns the inspect payload of a container."""
+        return await self.request("GET", f"/containers/{container_id}/json")
+
+    async def container_stats(self, container_id):
+        """Returns a single stats sample for a container."""
+        return await self.request("GET", "/containers/stats", {"containers": [container_id], "stream": False})
+
+    def stream_container_stats(self, container_id, interval=1):
+        """Yields stats samples for a container every `interval` seconds."""
+        return self.stream("/containers/stats", {"containers": [container_id], "stream": True, "interval": interval})
+
+    async def pods(self):
+        """Lists pods."""
+        return await self.request("GET", "/pods/json")
+
+    async def inspect_pod(self, pod_id):
+        """Returns the inspect payload of a pod."""
+        return await self.request("GET", f"/pods/{pod_id}/json")
+
+    async def images(self, all=True):
+        """Lists images, including intermediate images when `all` is True."""
+        return await self.request("GET", "/images/json", {"all": all})
+
+    async def inspect_image(self, image_id):
+        """Returns the inspect payload of an image."""
+        return await self.request("GET", f"/images/{image_id}/json")
+
+    async def volumes(self):
+        """Lists volumes."""
+        return await self.request("GET", "/volumes/json")
+
+    async def inspect_volume(self, volume_name):
+        """Returns the inspect payload of a volume."""
+        return await self.request("GET", f"/volumes/{volume_name}/json")
+
+    async def networks(self):
+        """Lists networks."""
+        return await self.request("GET", "/networks/json")
+
+    async def inspect_network(self, network_name):
+        """Returns the inspect payload of a network."""
+        return await self.request("GET", f"/networks/{network_name}/json")
+
+    async def secrets(self):
+        """Lists secrets metadata."""
+        return await self.request("GET", "/secrets/json")
+
+    async def version(self):
+        """Returns the Podman version report."""
+        return await self.request("GET", "/version")
+
+    async def df(self):
+        """Returns the disk usage report."""
+        return await self.request("GET", "/system/df")
+
+    def events(self, since=None, until=None, filters=None):
+        """Yields Podman events, following new events unless `until` is given."""
+        return self.stream("/events", {
+            "stream": until is None,
+            "since": since,
+            "until": until,
+            "filters": json.dumps(filters) if filters else None,
+        })
+
+    async def inventory(self):
+        """
+        Fetches every resource listing the main page shows, concurrently.
+
+        Returns:
+            dict: The raw payloads keyed by "containers", "pods", "images", "volumes",
+                "networks", "secrets", "version" and "df".
+        """
+        keys = ["containers", "pods", "images", "volumes", "networks", "secrets", "version", "df"]
+        results = await asyncio.gather(
+            self.containers(), self.pods(), self.images(), self.volumes(),
+            self.networks(), self.secrets(), self.version(), self.df(),
+        )
+        return dict(zip(keys, results))
+
+def fetch_inventory(base_url, identity=None):
+    """
+    Fetches the full inventory concurrently from synchronous code, such as a Streamlit script.
+
+    Args:
+        base_url (str): The Podman API URI.
+        identity (str): Optional path to an SSH identity key.
+
+    Returns:
+        dict: The raw payloads returned by `AsyncPodmanClient.inventory`.
+    """
+    async def run():
+        async with AsyncPodmanClient(base_url=base_url, identity=identity) as client:
+            return await client.inventory()
+    return asyncio.run(run())
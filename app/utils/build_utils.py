@@ -0,0 +1,343 @@
+"""
+Image builds from a local context directory, streamed to Podman as they are read.
+
+The build context is sent as a tar archive generated on the fly, one chunk at a time, so neither the
+archive nor any large file in it is ever held in memory or written to a temporary file. Files
+matching the context's `.containerignore` (or `.dockerignore`) are left out, and the build output
+is read line by line while Podman builds.
+"""
+import json
+import os
+import re
+import stat
+import tarfile
+from podman import api
+
+# the most bytes read from a file, or sent to Podman, at once
+CHUNK_SIZE = 256 * 1024
+
+STEP = re.compile(r"^STEP (\d+)/(\d+)")
+
+def translate_pattern(pattern):
+    """
+    Translates an ignore pattern into a regular expression over slash-separated relative paths.
+
+    `*` and `?` don't match `/`, `**` matches any number of directories, and `[...]` is a
+    character class, as in Podman and Docker.
+
+    Args:
+        pattern (str): The pattern, without a leading `!`.
+
+    Returns:
+        re.Pattern: The compiled expression.
+    """
+    segments = os.path.normpath(pattern).replace(os.sep, "/").strip("/").split("/")
+    expression = ""
+    for index, segment in enumerate(segments):
+        last = index == len(segments) - 1
+        if segment == "**":
+            expression += ".*" if last else "(?:.*/)?"
+            continue
+        position = 0
+        while position < len(segment):
+            character = segment[position]
+            if character == "*":
+                expression += "[^/]*"
+            elif character == "?":
+                expression += "[^/]"
+            elif character == "[" and "]" in segment[position + 1:]:
+                end = segment.index("]", position + 1)
+                expression += "[" + segment[position + 1:end].replace("!", "^", 1) + "]"
+                position = end
+            elif character == "\\" and position + 1 < len(segment):
+                position += 1
+                expression += re.escape(segment[position])
+            else:
+                expression += re.escape(character)
+            position += 1
+        if not last:
+            expression += "/"
+    return re.compile(expression)
+
+class IgnoreRules:
+    """
+    The exclusions of a `.containerignore` file. The last pattern matching a path decides whether
+    it is left out, and a pattern matching a directory also matches everything inside it.
+    """
+
+    def __init__(self, patterns):
+        """
+        Args:
+            patterns (list): The file's patterns, `!` marking exceptions.
+        """
+        self.rules = [
+            (translate_pattern(pattern.lstrip("!")), pattern.startswith("!"))
+            for pattern in patterns
+            if pattern.lstrip("!").strip()
+        ]
+        self.has_exceptions = any(negated for _, negated in self.rules)
+
+    @classmethod
+    def from_context(cls, context):
+        """
+        Reads the rules of a build context.
+
+        Args:
+            context (str): The context directory.
+
+        Returns:
+            IgnoreRules: The rules of its `.containerignore`, or `.dockerignore`, if any.
+        """
+        return cls(api.prepare_containerignore(context))
+
+    def ignored(self, path):
+        """
+        Checks whether a path is left out of the context.
+
+        Args:
+            path (str): The path relative to the context, with `/` separators.
+
+        Returns:
+            bool: True if the path is excluded.
+        """
+        parents = path.split("/")
+        candidates = ["/".join(parents[:count]) for count in range(1, len(parents) + 1)]
+        excluded = False
+        for expression, negated in self.rules:
+            if any(expression.fullmatch(candidate) for candidate in candidates):
+                excluded = not negated
+        return excluded
+
+    def prunes(self, path):
+        """
+        Checks whether a directory can be skipped without looking inside it.
+
+        Args:
+            path (str): The directory relative to the context, with `/` separators.
+
+        Returns:
+            bool: True if the directory and everything in it are excluded.
+        """
+        return not self.has_exceptions and self.ignored(path)
+
+def iter_context(context, rules):
+    """
+    Walks a build context, leaving out ignored paths.
+
+    Args:
+        context (str): The context directory.
+        rules (IgnoreRules): What to leave out.
+
+    Yields:
+        tuple: The absolute path and the path relative to the context, with `/` separators,
+            directories before their contents, in a stable order.
+    """
+    for directory, directories, files in os.walk(context):
+        relative_directory = os.path.relpath(directory, context).replace(os.sep, "/")
+        prefix = "" if relative_directory == "." else relative_directory + "/"
+        directories[:] = sorted(name for name in directories if not rules.prunes(prefix + name))
+        for name in directories + sorted(files):
+            if not rules.ignored(prefix + name):
+                yield os.path.join(directory, name), prefix + name
+
+def context_summary(context):
+    """
+    Counts what a build would send, without reading any file.
+
+    Args:
+        context (str): The context directory.
+
+    Returns:
+        dict: The number of "files" and their total "bytes", and the "ignored" patterns in use.
+    """
+    rules = IgnoreRules.from_context(context)
+    files = size = 0
+    for path, _ in iter_context(context, rules):
+        info = os.lstat(path)
+        if stat.S_ISREG(info.st_mode):
+            files += 1
+            size += info.st_size
+    return {"files": files, "bytes": size, "ignored": len(rules.rules)}
+
+def tar_header(info):
+    """
+    Encodes a tar header, owned by root like the contexts Podman creates itself, so layer caching
+    doesn't depend on who runs the app.
+
+    Args:
+        info (TarInfo): The entry.
+
+    Returns:
+        bytes: The header blocks.
+    """
+    info.uid = info.gid = 0
+    info.uname = info.gname = ""
+    return info.tobuf(tarfile.PAX_FORMAT, "utf-8", "surrogateescape")
+
+def stream_context(context, containerfile_name=None, containerfile_path=None, rules=None, chunk_size=CHUNK_SIZE, stats=None):
+    """
+    Generates the build context as an uncompressed tar archive, a chunk at a time.
+
+    Args:
+        context (str): The context directory.
+        containerfile_name (str): The archive name of a Containerfile kept outside the context.
+        containerfile_path (str): The path of that Containerfile.
+        rules (IgnoreRules): What to leave out; the context's own rules by default.
+        chunk_size (int): About how many bytes each chunk holds.
+        stats (dict): Updated with the "files" and "bytes" sent so far, if given.
+
+    Yields:
+        bytes: The next part of the archive.
+    """
+    rules = rules or IgnoreRules.from_context(context)
+    stats = stats if stats is not None else {}
+    stats.update(files=0, bytes=0)
+    builder = tarfile.TarFile(fileobj=open(os.devnull, "wb"), mode="w")
+    pending = bytearray()
+
+    def entries():
+        yield from iter_context(context, rules)
+        if containerfile_path:
+            yield containerfile_path, containerfile_name
+
+    try:
+        for path, name in entries():
+            try:
+                info = builder.gettarinfo(path, name)
+            except OSError:
+                # vanished while walking
+                continue
+            if info is None:
+                # sockets and other files tar can't hold
+                continue
+            pending += tar_header(info)
+            if info.isreg():
+                remaining = info.size
+                with open(path, "rb") as stream:
+                    while remaining:
+                        block = stream.read(min(chunk_size, remaining))
+                        if not block:
+                            # the file shrank while being sent; keep the size the header promised
+                            block = bytes(min(chunk_size, remaining))
+                        pending += block
+                        remaining -= len(block)
+                        if len(pending) >= chunk_size:
+                            stats["bytes"] += len(pending)
+                            yield bytes(pending)
+                            pending.clear()
+                pending += bytes(-info.size % tarfile.BLOCKSIZE)
+                stats["files"] += 1
+            if len(pending) >= chunk_size:
+                stats["bytes"] += len(pending)
+                yield bytes(pending)
+                pending.clear()
+        # two empty blocks end the archive, padded to a whole record like tarfile does
+        pending += bytes(2 * tarfile.BLOCKSIZE)
+        size = stats["bytes"] + len(pending)
+        pending += bytes(-size % tarfile.RECORDSIZE)
+        stats["bytes"] += len(pending)
+        yield bytes(pending)
+    finally:
+        builder.fileobj.close()
+
+def resolve_containerfile(context, containerfile):
+    """
+    Works out how the Containerfile reaches Podman.
+
+    Args:
+        context (str): The context directory.
+        containerfile (str): The Containerfile, relative to the context or absolute.
+
+    Returns:
+        tuple: The name Podman reads it from, and the path to add to the archive when it's
+            outside the context, else None.
+
+    Raises:
+        FileNotFoundError: If the Containerfile doesn't exist.
+    """
+    path = os.path.abspath(os.path.join(context, containerfile))
+    if not os.path.isfile(path):
+        raise FileNotFoundError(f"No Containerfile at {path}")
+    relative = os.path.relpath(path, os.path.abspath(context))
+    if not relative.startswith(".." + os.sep) and relative != "..":
+        return relative.replace(os.sep, "/"), None
+    return f".podman-streamlit.{os.path.basename(path)}", path
+
+def build_job(job, client, context, containerfile="Containerfile", tags=(), build_args=None, pull=False, no_cache=False):
+    """
+    Builds an image from a local context as a background job, streaming the context in and the
+    build output into the job's log.
+
+    Submit it to the job runner's "build" pool, which runs at most `PODMAN_STREAMLIT_BUILD_CONCURRENCY`
+    builds (default 2) at once and queues the rest without taking other jobs' workers.
+
+    Args:
+        job (Job): The job to report progress to, from `job_utils`.
+        client (PodmanClient): The job's client.
+        context (str): The context directory on the machine running the app.
+        containerfile (str): The Containerfile, relative to the context or absolute.
+        tags (list): Names to tag the image with.
+        build_args (dict): Build arguments.
+        pull (bool): Whether to pull newer base images.
+        no_cache (bool): Whether to build without the layer cache.
+
+    Returns:
+        str: The built image's ID.
+    """
+    context = os.path.abspath(os.path.expanduser(context))
+    if not os.path.isdir(context):
+        raise NotADirectoryError(f"No context directory at {context}")
+    containerfile_name, containerfile_path = resolve_containerfile(context, containerfile)
+
+    rules = IgnoreRules.from_context(context)
+    if rules.rules:
+        job.log(f"Leaving out {len(rules.rules)} .containerignore patterns")
+    if containerfile_path is None and rules.ignored(containerfile_name):
+        # the Containerfile is always sent, like Podman does
+        containerfile_path = os.path.join(context, containerfile_name)
+    stats = {}
+
+    def body():
+        for chunk in stream_context(context, containerfile_name, containerfile_path, rules, stats=stats):
+            job.check_cancelled()
+            job.message = f"Sending context: {stats['files']} files, {stats['bytes'] / 1024 / 1024:.1f} MB"
+            yield chunk
+        job.log(f"Sent context: {stats['files']} files, {stats['bytes'] / 1024 / 1024:.1f} MB")
+
+    params = {
+        "dockerfile": containerfile_name,
+        "t": list(tags),
+        "pull": pull,
+        "nocache": no_cache,
+        "rm": True,
+    }
+    if build_args:
+        params["buildargs"] = json.dumps(build_args)
+    response = client.api.post(
+        "/build", params=params, data=body(), headers={"Content-type": "application/x-tar"}, stream=True
+    )
+    try:
+        response.raise_for_status()
+        image_id = None
+        for line in response.iter_lines():
+            job.check_cancelled()
+            if not line:
+                continue
+            result = json.loads(line)
+            if result.get("error"):
+                raise RuntimeError(result["error"].strip())
+            image_id = (result.get("aux") or {}).get("ID") or image_id
+            for text in (result.get("stream") or "").splitlines():
+                job.log(text)
+                step = STEP.match(text)
+                if step:
+                    job.set_progress(int(step.group(1)) - 1, int(step.group(2)), text)
+                elif re.fullmatch(r"[0-9a-f]{64}", text.strip()):
+                    image_id = text.strip()
+    finally:
+        response.close()
+
+    if not image_id:
+        raise RuntimeError("The build finished without reporting an image ID")
+    job.log(f"Built {image_id[:12]}" + (f" as {', '.join(tags)}" if tags else ""))
+    return image_id
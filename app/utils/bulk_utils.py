@@ -0,0 +1,196 @@
+"""
+Bulk actions over many Podman objects, with the same semantics as the action buttons in the tabs.
+"""
+import re
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+def start_container(container):
+    if container.status == "paused":
+        container.unpause()
+    elif container.status == "exited":
+        container.start(force=True)
+
+def pause_container(container):
+    if container.status == "running":
+        container.pause()
+
+def stop_container(container):
+    if container.status != "paused":
+        container.stop()
+    else:
+        container.kill()
+
+def start_pod(pod):
+    if pod.attrs['State'] == 'Paused':
+        pod.unpause()
+    elif pod.attrs['State'] == 'Exited':
+        pod.start()
+
+def pause_pod(pod):
+    if pod.attrs['State'] == 'Running':
+        pod.pause()
+
+def stop_pod(pod):
+    if pod.attrs['State'] != 'Paused':
+        pod.stop(timeout=10)
+
+# the actions each kind of resource supports, keyed by the name used on the command line
+ACTIONS = {
+    "containers": {
+        "start": start_container,
+        "pause": pause_container,
+        "stop": stop_container,
+        "restart": lambda container: container.restart(),
+        "remove": lambda container: container.remove(force=True),
+    },
+    "pods": {
+        "start": start_pod,
+        "pause": pause_pod,
+        "stop": stop_pod,
+        "remove": lambda pod: pod.remove(force=True),
+    },
+    "images": {
+        "remove": lambda image: image.remove(force=True),
+    },
+    "volumes": {
+        "remove": lambda volume: volume.remove(),
+    },
+    "networks": {
+        "remove": lambda network: network.remove(),
+    },
+}
+
+def list_objects(client, kind):
+    """
+    Lists the Podman objects of one kind.
+
+    Args:
+        client (PodmanClient): A client object used to connect to the container runtime.
+        kind (str): One of the keys of `ACTIONS`.
+
+    Returns:
+        list: The Podman objects.
+    """
+    if kind == "containers":
+        return client.containers.list(all=True)
+    if kind == "images":
+        return client.images.list(all=True)
+    return getattr(client, kind).list()
+
+def object_names(obj):
+    """
+    Returns every name an object can be selected by: its name or tags, full ID and short ID.
+
+    Args:
+        obj: A Podman container, pod, image, volume or network object.
+
+    Returns:
+        list: The names.
+    """
+    names = list(getattr(obj, "tags", None) or [])
+    name = getattr(obj, "name", None)
+    if name:
+        names.append(name)
+    if obj.id:
+        names.extend([obj.id, obj.short_id])
+    return names
+
+def select_objects(client, kind, names=(), pattern=None, state=None):
+    """
+    Selects the objects an action applies to.
+
+    Args:
+        client (PodmanClient): A client object used to connect to the container runtime.
+        kind (str): One of the keys of `ACTIONS`.
+        names (iterable): Exact names, tags or IDs to select.
+        pattern (str): A regular expression matched against names, tags and IDs.
+        state (str): Only select containers or pods in this state, e.g. "running" or "exited".
+
+    Returns:
+        list: The selected objects, in listing order.
+    """
+    names = set(names)
+    regex = re.compile(pattern) if pattern else None
+    selected = []
+    for obj in list_objects(client, kind):
+        candidates = object_names(obj)
+        if names and not names.intersection(candidates):
+            continue
+        if regex and not any(regex.search(candidate) for candidate in candidates):
+            continue
+        if state:
+            # list() payloads carry the state as a string, inspect payloads as a dict
+            current = obj.attrs.get("State") or ""
+            if isinstance(current, dict):
+                current = current.get("Status", "")
+            if current.lower() != state.lower():
+                continue
+        selected.append(obj)
+    return selected
+
+def run_action(kind, action, objects, max_workers=8, stop=None):
+    """
+    Runs an action on many objects concurrently.
+
+    Args:
+        kind (str): One of the keys of `ACTIONS`.
+        action (str): The action, one of the keys of `ACTIONS[kind]`.
+        objects (list): The objects from `select_objects`.
+        max_workers (int): How many objects to act on at once.
+        stop (threading.Event): Once set, objects not acted on yet are skipped and reported with
+            the error "cancelled".
+
+    Yields:
+        dict: One result per object as soon as it finishes, with its "Name", "ID", "Action",
+            "Status" ("ok" or "error") and "Error".
+    """
+    handler = ACTIONS[kind][action]
+
+    def apply(obj):
+        if stop is not None and stop.is_set():
+            raise RuntimeError("cancelled")
+        # container and pod actions branch on the inspected state, which list() payloads don't carry
+        if kind in ("containers", "pods"):
+            obj.reload()
+        handler(obj)
+        return obj
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {executor.submit(apply, obj): obj for obj in objects}
+        for future in as_completed(futures):
+            obj = futures[future]
+            error = future.exception()
+            yield {
+                "Name": object_names(obj)[0],
+                "ID": obj.short_id,
+                "Action": action,
+                "Status": "error" if error else "ok",
+                "Error": str(error) if error else "",
+            }
+
+def action_job(job, client, kind, action, names, max_workers=8):
+    """
+    Runs an action on the named objects as a background job, logging each object's result.
+
+    Args:
+        job (Job): The job to report progress to, from `job_utils`.
+        client (PodmanClient): The job's client.
+        kind (str): One of the keys of `ACTIONS`.
+        action (str): The action, one of the keys of `ACTIONS[kind]`.
+        names (iterable): The names, tags or IDs of the objects to act on.
+        max_workers (int): How many objects to act on at once.
+
+    Returns:
+        list: The results from `run_action`.
+    """
+    objects = select_objects(client, kind, names)
+    if not objects:
+        job.log(f"No {kind} matched")
+    results = []
+    job.set_progress(0, len(objects), f"0 of {len(objects)} {kind}")
+    for result in run_action(kind, action, objects, max_workers, job.cancel_event):
+        results.append(result)
+        job.log(f"{result['Name']}: {result['Error'] or result['Status']}")
+        job.set_progress(len(results), len(objects), f"{len(results)} of {len(objects)} {kind}")
+    job.check_cancelled()
+    return results
@@ -1,14 +1,47 @@
+import threading
 import streamlit as st
-from utils.status_icons import *
-from dateutil import parser 
-from tzlocal import get_localzone
+from utils.image_utils import ImageUsageIndex
+from utils import inventory_utils, prefetch_utils, snapshot_utils, volume_utils
 
-def get(client):
+# the columns the container table shows; anything else is computed on demand with `derived`
+TABLE_COLUMNS = ("Name", "ID", "Status", "Image", "Ports", "Created")
+
+# inspected container objects and their rows, shared by every session and keyed by (URI, container ID)
+object_cache = {}
+object_lock = threading.Lock()
+
+class ContainerRecord:
+    """
+    The compact description of a container kept in each session; the full object stays in `object_cache`.
+    """
+    __slots__ = ("id", "short_id", "name", "status", "fingerprint", "volumes")
+
+    def __init__(self, container, fingerprint):
+        """
+        Args:
+            container (Container): An inspected Podman container object.
+            fingerprint (str): The container's list() fingerprint.
+        """
+        self.id = container.id
+        self.short_id = container.short_id
+        self.name = container.name
+        self.status = container.status
+        self.fingerprint = fingerprint
+        self.volumes = tuple(volume_utils.mounted_volumes(container))
+
+def get(client, columns=TABLE_COLUMNS):
     """
     Retrieves a list of Podman containers and their associated metadata.
 
+    Containers are fingerprinted from their list() payload, and only new or changed containers
+    are re-inspected and rebuilt. Inspected objects and their rows are shared process-wide, so a
+    container another session already inspected isn't inspected again, and each session only keeps
+    compact records. Only the requested columns are computed; image tags are only resolved again
+    for changed rows or when the image index changed.
+
     Args:
         client (PodmanClient): A client object used to interact with the Podman socket.
+        columns (iterable): The columns to compute, any of the keys of `inventory_utils.CONTAINER_COLUMNS`.
 
     Returns:
         A list of dictionaries, where each dictionary represents a container and contains the following keys:
@@ -19,55 +52,196 @@ def get(client):
             - "Image": The tags associated with the container's image.
             - "Ports": A string describing the ports exposed by the container.
             - "Created": The creation time of the container, formatted as a string.
+        Columns other than "Selected" are limited to `columns`.
     Notes:
-        This function also updates the `st.session_state.container_objects` dictionary, which maps container IDs to their corresponding Podman client objects.
+        This function also updates `st.session_state.container_records`, which maps short IDs to `ContainerRecord`s
+        (use `get_container` for the full object), and `st.session_state.image_usage_index`, the image-to-container
+        index shared with the images tab. `st.session_state.container_fingerprint` identifies the whole snapshot and
+        `st.session_state.container_changes` lists the short IDs of rows that are new or changed since the previous call.
     """
-    containers = client.containers.list(all=True)
-    
-    st.session_state.container_objects = {}
-    container_data = []
-    
-    if containers:
-        my_timezone = get_localzone() 
+    uri = st.session_state.get("selected_uri")
+    containers = prefetch_utils.listing(client, "containers")
+    previous = {record.id: record for record in st.session_state.get("container_records", {}).values()}
+    columns = tuple(columns)
+
+    entries = {}
+    inspected = []
+    with object_lock:
         for container in containers:
-            container.reload()
-            created_timestamp = container.attrs["Created"]
-            created_time = parser.isoparse(created_timestamp).astimezone(my_timezone)
-            formatted_ports = ", ".join(
-                f"{value.get('HostPort', 'N/A')} -> {key}"
-                for key, values in container.ports.items()
-                if values
-                for value in values
-            ) if container.ports else "No ports"
-
-            create_command = container.attrs["Config"].get("CreateCommand", [""])
-            if create_command[0].endswith("podman"):
-                create_command[0] = "podman"
-
-            status_icon = status_icons.get(container.status.lower(), "❓")
-            
-            container_data.append({
+            row_fingerprint = snapshot_utils.fingerprint(container.attrs.get(key) for key in inventory_utils.FINGERPRINT_KEYS)
+            cached = object_cache.get((uri, container.id))
+            if cached and cached["fingerprint"] == row_fingerprint and cached["columns"] == columns:
+                entries[container.id] = cached
+            else:
+                entries[container.id] = {"fingerprint": row_fingerprint, "container": container, "columns": columns, "row": None}
+                inspected.append(container)
+    for container in inspected:
+        container.reload()
+
+    changed = [
+        container.id for container in containers
+        if container.id not in previous or previous[container.id].fingerprint != entries[container.id]["fingerprint"]
+    ]
+    index_changed = changed or len(entries) != len(previous) or "image_usage_index" not in st.session_state
+    if index_changed:
+        # list() payloads carry each container's image ID, so no inspect is needed here
+        st.session_state.image_usage_index = ImageUsageIndex(containers, prefetch_utils.listing(client, "images"))
+    image_usage_index = st.session_state.image_usage_index
+
+    if inspected:
+        my_timezone = inventory_utils.local_timezone()
+        for container in inspected:
+            entries[container.id]["row"] = {
                 "Selected": False,
-                "Status": f"{status_icon} {container.status}",
-                "Name": container.name,
-                "ID": container.short_id,
-                "Image": container.image.tags,
-                "Ports": formatted_ports,
-                "Created": created_time,
-                "RunCommand": create_command,
-            })
-            
-            st.session_state.container_objects[container.short_id] = container
+                **inventory_utils.container_row(
+                    container, image_usage_index.tags_for_container(container.id), my_timezone, columns
+                ),
+            }
+
+    container_data = []
+    records = {}
+    for container_id, entry in entries.items():
+        if index_changed and "Image" in columns:
+            # rows are shared with other sessions, so the patched row is a copy
+            entry["row"] = {**entry["row"], "Image": image_usage_index.tags_for_container(container_id)}
+        container_data.append(entry["row"])
+        record = previous.get(container_id)
+        if record is None or record.fingerprint != entry["fingerprint"]:
+            record = ContainerRecord(entry["container"], entry["fingerprint"])
+        records[record.short_id] = record
+
+    with object_lock:
+        stale = [key for key in object_cache if key[0] == uri and key[1] not in entries]
+        for key in stale:
+            del object_cache[key]
+        object_cache.update(((uri, container_id), entry) for container_id, entry in entries.items())
+    inventory_utils.forget_derived(stale)
+    if inspected or stale:
+        # containers were added, changed or removed since any session last listed them
+        invalidate_container_index(uri)
+
+    st.session_state.container_records = records
+    st.session_state.container_fingerprint = snapshot_utils.fingerprint(
+        (container_id, entry["fingerprint"]) for container_id, entry in entries.items()
+    )
+    st.session_state.container_changes = [entries[container_id]["container"].short_id for container_id in changed]
     return container_data
 
+def get_container(client, short_id):
+    """
+    Returns the full Podman container object for a container in this session's table.
+
+    Args:
+        client (PodmanClient): The client object used to inspect the container if it was evicted.
+        short_id (str): The container's short ID, as shown in the table.
+
+    Returns:
+        Container: The inspected container, from the shared cache or inspected again if it was evicted.
+    """
+    record = st.session_state.container_records[short_id]
+    uri = st.session_state.get("selected_uri")
+    with object_lock:
+        cached = object_cache.get((uri, record.id))
+    if cached:
+        return cached["container"]
+    return client.containers.get(record.id)
+
+def derived(client, short_id, column):
+    """
+    Returns a column the table doesn't show for a container, computing it on first use.
+
+    Args:
+        client (PodmanClient): The client object used to inspect the container if it was evicted.
+        short_id (str): The container's short ID, as shown in the table.
+        column (str): The column, such as "RunCommand".
+
+    Returns:
+        The column's value, memoized until the container changes.
+    """
+    record = st.session_state.container_records[short_id]
+    key = (st.session_state.get("selected_uri"), record.id)
+    return inventory_utils.derived_column(key, get_container(client, short_id), column, record.fingerprint)
+
+def invalidate():
+    """
+    Discards the cached container rows so the next call to `get` re-inspects every container.
+
+    Returns:
+        None
+    """
+    uri = st.session_state.get("selected_uri")
+    with object_lock:
+        stale = [key for key in object_cache if key[0] == uri]
+        for key in stale:
+            del object_cache[key]
+    inventory_utils.forget_derived(stale)
+    st.session_state.pop("container_records", None)
+    st.session_state.pop("image_usage_index", None)
+    invalidate_container_index(uri)
+
+@st.cache_resource(show_spinner=False, ttl=30)
+def cached_container_index(_client, uri):
+    """
+    Lists the containers of a Podman connection for container selectors, without inspecting them.
+
+    The index is shared by every session and is only rebuilt when `invalidate_container_index` is
+    called, which happens whenever `get` or `invalidate` sees containers change, or after 30 seconds
+    for changes made outside the app. Callers must not modify it.
+
+    Args:
+        _client (PodmanClient): The client object used to list the containers. Excluded from the cache key.
+        uri (str): The connection URI, used as the cache key.
+
+    Returns:
+        dict: A mapping of full container ID to its "label" ("name (short ID)"), "name", "state",
+            "image" and "labels" ("key=value" strings), in listing order.
+    """
+    index = {}
+    for container in prefetch_utils.listing(_client, "containers"):
+        attrs = container.attrs
+        name = (attrs.get("Names") or [container.short_id])[0]
+        index[container.id] = {
+            "label": f"{name} ({container.short_id})",
+            "name": name,
+            "state": attrs.get("State") or "",
+            "image": attrs.get("Image") or "",
+            "labels": frozenset(f"{key}={value}" for key, value in (attrs.get("Labels") or {}).items()),
+        }
+    return index
+
+def get_container_index(client):
+    """
+    Retrieves the cached container index for the currently selected connection.
+
+    Args:
+        client (PodmanClient): The client object used to list the containers.
+
+    Returns:
+        dict: The index from `cached_container_index`.
+    """
+    return cached_container_index(client, st.session_state.get("selected_uri"))
+
+def invalidate_container_index(uri=None):
+    """
+    Clears one connection's cached container index without touching any other cached data.
+
+    Args:
+        uri (str): The connection URI, the currently selected one by default.
+
+    Returns:
+        None
+    """
+    # the client isn't part of the cache key, so only the URI picks the entry to drop
+    cached_container_index.clear(None, uri or st.session_state.get("selected_uri"))
+
 @st.dialog("Execute Container")
 def execute(item, selected_names):
     """
     Execute a command in selected containers.
 
     This function creates a dialog for executing a command in multiple Podman containers.
-    It allows the user to select containers, input a command, and run it.
-    The output of the command is then displayed below the container table.
+    It allows the user to select containers, input a command, and run it as a background job.
+    The output of the command is streamed into the job's log in the jobs panel.
 
     Args:
         item: An object containing information about the available containers.
@@ -76,65 +250,40 @@ def execute(item, selected_names):
     Returns:
         None
     """
+    from components import jobs
+
     selected_names = st.multiselect("Select Containers", options=item.Name, default=selected_names)
     command = st.text_input("Execute command:")
-    selected_ids = [c for c in st.session_state.container_objects.keys() if st.session_state.container_objects[c].name in selected_names]
+    selected_ids = [record.id for record in st.session_state.container_records.values() if record.name in selected_names]
     if st.button("Execute"):
-        st.session_state.execute_outputs = []
-        for container_id in selected_ids:
-            container = st.session_state.container_objects[container_id]
-            with st.spinner(f"Executing in {container.name}..."):
-                output = container.exec_run(command, stderr=True, stdout=True)
-                try:
-                    decoded_output = output[1].decode('utf-8').strip()
-                except UnicodeDecodeError:
-                    decoded_output = output[1].decode('utf-8', errors='replace').strip()
-                cleaned_output = ''.join(char for char in decoded_output if char.isprintable() or char.isspace())
-                st.session_state.execute_outputs.append({
-                    "container": container.name,
-                    "command": command,
-                    "output": cleaned_output
-                })
-        st.rerun()
-
-def run_podlet(client, container_name, run_command):
-    """
-    Runs a container with the Podlet image that generates quadlet files for a passed in run command.
+        jobs.start(
+            f"Execute `{command}` in {len(selected_ids)} containers", exec_job, (selected_ids, command), rerun_app=True
+        )
+
+def exec_job(job, client, container_ids, command):
+    """
+    Executes a command in containers one after another as a background job.
 
     Args:
-        client (PodmanClient): A client object used to connect to the container runtime.
-        run_command (str): The command to run inside the container.
+        job (Job): The job to report progress to, from `job_utils`.
+        client (PodmanClient): The job's client.
+        container_ids (list): The IDs of the containers to execute the command in.
+        command (str): The command to execute.
 
     Returns:
         None
     """
-    try:
-        with st.spinner("Running Podlet..."):
-            # check if podlet container exists and remove it if it does
-            try:
-                podlet_container = client.containers.get(f"podlet-{container_name}")
-                podlet_container.remove(force=True)
-            except Exception:
-                pass
-
-            container = client.containers.run(
-                "ghcr.io/containers/podlet:latest",
-                command=run_command,
-                detach=True,
-                name=f"podlet-{container_name}",
-                network_mode="host",
-            )
-            container.wait(condition=["exited"])
-            logs = container.logs(stream=False, stdout=True, stderr=True)
-            st.subheader(f"{container_name}'s Quadlet")
-            log_placeholder = st.empty()
-            log_lines = []
-            for log_line in logs:
-                decoded_log_line = log_line.decode('utf-8').strip()
-                if decoded_log_line:
-                    log_lines.append(decoded_log_line)
-            log_placeholder.code("\n".join(log_lines),"ini")
-            container.remove()
-            
-    except Exception as e:
-        st.error(str(e))
\ No newline at end of file
+    job.log(f"$ {command}")
+    for done, container_id in enumerate(container_ids):
+        job.check_cancelled()
+        container = client.containers.get(container_id)
+        job.set_progress(done, len(container_ids), f"Executing in {container.name}...")
+        output = container.exec_run(command, stderr=True, stdout=True)
+        try:
+            decoded_output = output[1].decode('utf-8').strip()
+        except UnicodeDecodeError:
+            decoded_output = output[1].decode('utf-8', errors='replace').strip()
+        cleaned_output = ''.join(char for char in decoded_output if char.isprintable() or char.isspace())
+        job.log(f"--- {container.name} (exit code {output[0]}) ---")
+        for line in cleaned_output.splitlines():
+            job.log(line)
@@ -0,0 +1,310 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# image inspect payloads never change for a given ID, so they are shared process-wide, per connection
+inspect_cache = {}
+inspect_lock = threading.Lock()
+
+def connection_key(client):
+    """
+    Identifies the Podman service a client is connected to.
+
+    Args:
+        client (PodmanClient): The client.
+
+    Returns:
+        str: The client's base URL.
+    """
+    return client.api.base_url.geturl()
+
+def get_inspect_attrs(client, image_ids, max_workers=16):
+    """
+    Retrieves inspect payloads for the given images, inspecting only images not seen before.
+
+    Podman has no bulk image inspect, so the missing images are inspected concurrently in one
+    pass. Payloads are cached per connection, and only the images of the same connection that
+    weren't requested are evicted.
+
+    Args:
+        client (PodmanClient): A client object used to connect to the container runtime.
+        image_ids (list): Full IDs of the images to inspect.
+        max_workers (int): How many images to inspect at once.
+
+    Returns:
+        dict: A mapping of image ID to its inspect payload.
+    """
+    uri = connection_key(client)
+    with inspect_lock:
+        cached = inspect_cache.setdefault(uri, {})
+        missing = [image_id for image_id in image_ids if image_id not in cached]
+
+    def inspect(image_id):
+        try:
+            return image_id, client.images.get(image_id).attrs
+        except Exception:
+            # removed between list and inspect, picked up on the next refresh
+            return image_id, None
+
+    fetched = {}
+    if missing:
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(missing))) as executor:
+            fetched = {image_id: attrs for image_id, attrs in executor.map(inspect, missing) if attrs is not None}
+    with inspect_lock:
+        cached = inspect_cache.setdefault(uri, {})
+        cached.update(fetched)
+        wanted = set(image_ids)
+        for stale_id in [image_id for image_id in cached if image_id not in wanted]:
+            del cached[stale_id]
+        return {image_id: cached[image_id] for image_id in image_ids if image_id in cached}
+
+class LayerIndex:
+    """
+    Layer-sharing index over a set of images.
+
+    Images are arranged in a trie keyed by their ordered layer chains, so images that
+    share base layers share trie nodes. The byte size of each node is derived from the
+    total and unique image sizes, which lets the index report unique versus shared bytes
+    per image and the exact bytes freed by removing any set of images.
+    """
+
+    def __init__(self, images):
+        """
+        Builds the index.
+
+        Args:
+            images (list): Dictionaries with the keys "ID", "Parent", "Layers" (ordered layer
+                digests), "Size" (bytes) and optionally "UniqueSize" (bytes, from `client.df()`).
+        """
+        self.ids = [image["ID"] for image in images]
+        self.position = {image_id: i for i, image_id in enumerate(self.ids)}
+        self.sizes = [image.get("Size") or 0 for image in images]
+
+        # trie: node 0 is the empty chain
+        children = [{}]
+        self.node_parent = [-1]
+        self.paths = []
+        for image in images:
+            node = 0
+            path = []
+            for layer in image.get("Layers") or []:
+                child = children[node].get(layer)
+                if child is None:
+                    child = len(self.node_parent)
+                    children[node][layer] = child
+                    children.append({})
+                    self.node_parent.append(node)
+                node = child
+                path.append(node)
+            self.paths.append(path)
+
+        node_count = len(self.node_parent)
+        self.node_users = [0] * node_count
+        for path in self.paths:
+            for node in path:
+                self.node_users[node] += 1
+
+        cumulative = [None] * node_count
+        cumulative[0] = 0
+        for i, path in enumerate(self.paths):
+            if path:
+                tip = path[-1]
+                cumulative[tip] = self.sizes[i] if cumulative[tip] is None else min(cumulative[tip], self.sizes[i])
+        for i, image in enumerate(images):
+            unique_size = image.get("UniqueSize")
+            path = self.paths[i]
+            if unique_size is None or not path:
+                continue
+            # the deepest node another image also uses is where this image's unique layers start
+            shared = next((node for node in reversed(path) if self.node_users[node] > 1), 0)
+            if cumulative[shared] is None and shared != path[-1]:
+                cumulative[shared] = max(self.sizes[i] - unique_size, 0)
+
+        # nodes are numbered parents-first, so walking backwards visits children before parents
+        for node in range(node_count - 1, 0, -1):
+            parent = self.node_parent[node]
+            if cumulative[node] is None:
+                cumulative[node] = min(cumulative[c] for c in children[node].values()) if children[node] else 0
+            if cumulative[parent] is None or cumulative[parent] > cumulative[node]:
+                if parent != 0:
+                    cumulative[parent] = cumulative[node]
+        self.node_bytes = [0] * node_count
+        for node in range(1, node_count):
+            self.node_bytes[node] = max(cumulative[node] - cumulative[self.node_parent[node]], 0)
+
+        self.parents = {}
+        self.children = {image_id: [] for image_id in self.ids}
+        tip_owner = {}
+        for i, path in enumerate(self.paths):
+            if path:
+                tip_owner.setdefault(path[-1], self.ids[i])
+        for i, image in enumerate(images):
+            parent_id = image.get("Parent") or None
+            if parent_id not in self.position:
+                # fall back to the nearest image whose layers are a strict prefix of this one
+                parent_id = next(
+                    (tip_owner[node] for node in reversed(self.paths[i][:-1]) if node in tip_owner),
+                    None,
+                )
+            if parent_id and parent_id != self.ids[i]:
+                self.parents[self.ids[i]] = parent_id
+                self.children[parent_id].append(self.ids[i])
+
+    def unique_bytes(self, image_id):
+        """
+        Returns the bytes used only by the given image.
+
+        Args:
+            image_id (str): The full image ID.
+
+        Returns:
+            int: The size of the layers no other image uses.
+        """
+        return sum(self.node_bytes[node] for node in self.paths[self.position[image_id]] if self.node_users[node] == 1)
+
+    def shared_bytes(self, image_id):
+        """
+        Returns the bytes the given image shares with at least one other image.
+
+        Args:
+            image_id (str): The full image ID.
+
+        Returns:
+            int: The size of the layers other images also use.
+        """
+        return sum(self.node_bytes[node] for node in self.paths[self.position[image_id]] if self.node_users[node] > 1)
+
+    def reclaimable_bytes(self, image_ids):
+        """
+        Returns the bytes freed if all of the given images were removed.
+
+        Args:
+            image_ids (iterable): Full IDs of the images to remove.
+
+        Returns:
+            int: The size of the layers used only by the given images.
+        """
+        hits = {}
+        for image_id in set(image_ids):
+            for node in self.paths[self.position[image_id]]:
+                hits[node] = hits.get(node, 0) + 1
+        return sum(self.node_bytes[node] for node, count in hits.items() if count == self.node_users[node])
+
+def build_layer_index(images, inspect_attrs, disk_usage):
+    """
+    Builds a layer index from an image listing, its inspect payloads and the disk usage report.
+
+    Args:
+        images (list): Podman image objects from `client.images.list()`.
+        inspect_attrs (dict): A mapping of image ID to inspect payload, from `get_inspect_attrs`.
+        disk_usage (dict): The disk usage report returned by `client.df()`.
+
+    Returns:
+        LayerIndex: The layer-sharing index for the listed images.
+    """
+    unique_sizes = {
+        entry["ImageID"]: entry["UniqueSize"]
+        for entry in disk_usage.get("Images") or []
+        if "UniqueSize" in entry
+    }
+    records = []
+    for image in images:
+        attrs = inspect_attrs.get(image.id, {})
+        records.append({
+            "ID": image.id,
+            "Parent": attrs.get("Parent") or image.attrs.get("ParentId"),
+            "Layers": (attrs.get("RootFS") or {}).get("Layers") or [],
+            "Size": image.attrs.get("Size", 0),
+            "UniqueSize": unique_sizes.get(image.id),
+        })
+    return LayerIndex(records)
+
+class ImageUsageIndex:
+    """
+    Bidirectional index between images and the containers created from them.
+
+    Built from one container listing and one image listing, it answers image tag, "used by"
+    and safe-removal lookups in constant time.
+    """
+
+    def __init__(self, containers, images):
+        """
+        Builds the index.
+
+        Args:
+            containers (iterable): Podman container objects.
+            images (iterable): Podman image objects.
+        """
+        self.image_tags = {image.id: image.tags for image in images}
+        self.container_image = {}
+        self.image_containers = {image_id: [] for image_id in self.image_tags}
+        for container in containers:
+            # list() payloads carry "ImageID", inspect payloads carry the ID under "Image"
+            image_id = container.attrs.get("ImageID") or container.attrs.get("Image")
+            self.container_image[container.id] = image_id
+            self.image_containers.setdefault(image_id, []).append(container.name)
+
+    def tags_for_container(self, container_id):
+        """
+        Returns the tags of the image a container was created from.
+
+        Args:
+            container_id (str): The full container ID.
+
+        Returns:
+            list: The image tags, empty if the image is unknown or untagged.
+        """
+        return self.image_tags.get(self.container_image.get(container_id), [])
+
+    def used_by(self, image_id):
+        """
+        Returns the names of the containers created from an image.
+
+        Args:
+            image_id (str): The full image ID.
+
+        Returns:
+            list: The container names.
+        """
+        return self.image_containers.get(image_id, [])
+
+    def in_use(self, image_id):
+        """
+        Checks whether any container was created from an image.
+
+        Args:
+            image_id (str): The full image ID.
+
+        Returns:
+            bool: True if at least one container uses the image, False otherwise.
+        """
+        return bool(self.image_containers.get(image_id))
+
+def pull_job(job, client, repositories, all_tags=False):
+    """
+    Pulls images one after another as a background job, streaming Podman's pull output into the job's log.
+
+    Args:
+        job (Job): The job to report progress to, from `job_utils`.
+        client (PodmanClient): The job's client.
+        repositories (list): The repositories to pull, optionally with tags.
+        all_tags (bool): Whether to pull every tag of each repository.
+
+    Returns:
+        None
+    """
+    for done, repository in enumerate(repositories):
+        job.set_progress(done, len(repositories), f"Pulling {repository}...")
+        for line in client.images.pull(repository, all_tags=all_tags, stream=True, decode=True):
+            job.check_cancelled()
+            if not isinstance(line, dict):
+                job.log(line)
+                continue
+            if line.get("error"):
+                raise RuntimeError(line["error"])
+            text = line.get("stream") or " ".join(
+                str(line[key]) for key in ("id", "status", "progress") if line.get(key)
+            )
+            if text:
+                job.log(text)
+                job.message = text.strip()
+        job.log(f"Pulled {repository}")
@@ -0,0 +1,204 @@
+"""
+Path queries, summaries and structural diffs over inspect payloads, so only the parts a user asks
+for are rendered instead of whole payloads.
+
+Paths are a small JMESPath-like language:
+    Config.Env                  a key, then a key below it
+    Mounts[0]                   a list item; negative indexes count from the end
+    Mounts[*].Destination       every item of a list
+    NetworkSettings.Ports.*     every value of a mapping
+    Mounts[?Type=='bind']       the list items whose key equals a value
+    Mounts[?RW]                 the list items whose key is truthy
+    "io.podman.label"           a key containing dots, quoted
+"""
+import json
+import re
+
+# one path step: a key, a quoted key, a wildcard, an index, a list wildcard or a filter
+TOKEN = re.compile(
+    r"""\s*(?:
+        (?P<key>[^.\[\]"'\s]+)
+      | "(?P<quoted>(?:[^"\\]|\\.)*)"
+      | \[\s*(?P<index>-?\d+)\s*\]
+      | \[\s*(?P<every>\*)\s*\]
+      | \[\s*\?\s*(?P<field>[^=!\]\s]+)\s*(?:(?P<operator>==|!=)\s*(?P<literal>'[^']*'|"[^"]*"|[^\]\s]+))?\s*\]
+    )\s*(?P<dot>\.)?""",
+    re.VERBOSE,
+)
+
+def parse_path(expression):
+    """
+    Parses a path expression into steps.
+
+    Args:
+        expression (str): The path, e.g. "Mounts[*].Destination".
+
+    Returns:
+        list: ("key", name), ("index", number), ("every", None) or ("filter", (field, operator, value)) steps.
+
+    Raises:
+        ValueError: If the expression isn't a valid path.
+    """
+    steps = []
+    position = 0
+    expression = expression.strip()
+    while position < len(expression):
+        match = TOKEN.match(expression, position)
+        if not match or match.end() == position:
+            raise ValueError(f"Invalid path at '{expression[position:]}'")
+        if match.group("key") is not None:
+            key = match.group("key")
+            steps.append(("every", None) if key == "*" else ("key", key))
+        elif match.group("quoted") is not None:
+            steps.append(("key", re.sub(r"\\(.)", r"\1", match.group("quoted"))))
+        elif match.group("index") is not None:
+            steps.append(("index", int(match.group("index"))))
+        elif match.group("every") is not None:
+            steps.append(("every", None))
+        else:
+            literal = match.group("literal")
+            if literal is not None:
+                try:
+                    literal = json.loads(literal.replace("'", '"') if literal[0] == "'" else literal)
+                except ValueError:
+                    pass
+            steps.append(("filter", (match.group("field"), match.group("operator"), literal)))
+        position = match.end()
+    return steps
+
+def format_path(keys):
+    """
+    Formats concrete keys and indexes as a path that `parse_path` reads back.
+
+    Args:
+        keys (iterable): Mapping keys and list indexes, from the root down.
+
+    Returns:
+        str: The path, e.g. 'Mounts[0].Destination' or 'Config.Labels."io.podman.label"'.
+    """
+    path = ""
+    for key in keys:
+        if isinstance(key, int):
+            path += f"[{key}]"
+        else:
+            name = key if re.fullmatch(r"[^.\[\]\"'\s]+", key) and key != "*" else json.dumps(key)
+            path += f".{name}" if path else name
+    return path
+
+def query(value, expression):
+    """
+    Finds the subtrees a path matches.
+
+    Args:
+        value: The payload, e.g. a container's `attrs`.
+        expression (str): The path, see `parse_path`.
+
+    Returns:
+        list: (keys, subtree) pairs, where keys lead from the root to the subtree. Missing keys
+            simply don't match.
+    """
+    matches = [((), value)]
+    for kind, argument in parse_path(expression):
+        found = []
+        for keys, current in matches:
+            if kind == "key" and isinstance(current, dict) and argument in current:
+                found.append((keys + (argument,), current[argument]))
+            elif kind == "index" and isinstance(current, list) and -len(current) <= argument < len(current):
+                found.append((keys + (argument % len(current),), current[argument]))
+            elif kind == "every" and isinstance(current, dict):
+                found.extend((keys + (key,), child) for key, child in current.items())
+            elif kind == "every" and isinstance(current, list):
+                found.extend((keys + (index,), child) for index, child in enumerate(current))
+            elif kind == "filter" and isinstance(current, list):
+                field, operator, literal = argument
+                for index, child in enumerate(current):
+                    if not isinstance(child, dict):
+                        continue
+                    if operator is None:
+                        keep = bool(child.get(field))
+                    else:
+                        keep = (child.get(field) == literal) == (operator == "==")
+                    if keep:
+                        found.append((keys + (index,), child))
+        matches = found
+    return matches
+
+def summarize(value, width=80):
+    """
+    Describes a value in one short line, without rendering what's inside collections.
+
+    Args:
+        value: The value.
+        width (int): The longest summary of a scalar.
+
+    Returns:
+        str: "{n keys}", "[n items]" or the value as compact JSON, shortened to `width` characters.
+    """
+    if isinstance(value, dict):
+        return f"{{{len(value)} keys}}"
+    if isinstance(value, list):
+        return f"[{len(value)} items]"
+    text = json.dumps(value, ensure_ascii=False, default=str)
+    return text if len(text) <= width else text[:width - 1] + "…"
+
+def children(value):
+    """
+    Lists a collection's direct children.
+
+    Args:
+        value: A mapping, a list or a scalar.
+
+    Returns:
+        list: (key, child) pairs; empty for scalars.
+    """
+    if isinstance(value, dict):
+        return list(value.items())
+    if isinstance(value, list):
+        return list(enumerate(value))
+    return []
+
+def flatten(value, keys=()):
+    """
+    Flattens a payload into its leaves.
+
+    Args:
+        value: The payload.
+        keys (tuple): The keys leading to `value`.
+
+    Returns:
+        dict: Leaf paths, as key tuples, mapped to scalar values. Empty collections are leaves too.
+    """
+    if isinstance(value, (dict, list)) and value:
+        leaves = {}
+        for key, child in children(value):
+            leaves.update(flatten(child, keys + (key,)))
+        return leaves
+    return {keys: value}
+
+def diff(payloads, only_differences=True):
+    """
+    Lines up the leaves of several payloads, e.g. the attrs of the selected containers.
+
+    Args:
+        payloads (dict): Labels mapped to payloads.
+        only_differences (bool): Whether to leave out leaves that are the same in every payload.
+
+    Returns:
+        list: One dict per leaf path, in first-seen order, with the "Path" and each label's value
+            as compact JSON. Labels missing the leaf get None.
+    """
+    flattened = {label: flatten(payload) for label, payload in payloads.items()}
+    paths = {}
+    for leaves in flattened.values():
+        paths.update(dict.fromkeys(leaves))
+    missing = object()
+    rows = []
+    for keys in paths:
+        values = [leaves.get(keys, missing) for leaves in flattened.values()]
+        if only_differences and all(value == values[0] for value in values[1:]):
+            continue
+        row = {"Path": format_path(keys)}
+        for label, value in zip(flattened, values):
+            row[label] = None if value is missing else json.dumps(value, ensure_ascii=False, default=str)
+        rows.append(row)
+    return rows
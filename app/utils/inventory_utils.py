@@ -0,0 +1,359 @@
+"""
+Normalized inventory rows shared by the Streamlit tabs, the command-line interface and the JSON API.
+
+Nothing here touches Streamlit, so the same rows can be built from scripts and background threads.
+"""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from utils import quadlet_utils, snapshot_utils
+from utils.status_icons import status_icons
+
+KINDS = ("containers", "pods", "images", "volumes", "networks")
+
+# list() fields that change whenever a container's row would change
+FINGERPRINT_KEYS = ("Id", "Names", "State", "Created", "StartedAt", "ExitedAt", "ImageID")
+
+def to_json(value):
+    """
+    Converts row values JSON can't encode, such as datetimes. Meant as `json.dumps(default=...)`.
+
+    Args:
+        value: The value to convert.
+
+    Returns:
+        str: An ISO 8601 string for datetimes, `str(value)` otherwise.
+    """
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+def local_timezone():
+    """
+    Returns the local timezone used to format creation times.
+
+    Returns:
+        tzinfo: The local timezone.
+    """
+    from tzlocal import get_localzone
+
+    return get_localzone()
+
+def parse_created(timestamp, timezone):
+    """
+    Parses an ISO 8601 creation timestamp into the local timezone.
+
+    Args:
+        timestamp (str): The timestamp from a Podman payload.
+        timezone (tzinfo): The timezone to convert to.
+
+    Returns:
+        datetime: The creation time.
+    """
+    from dateutil import parser
+
+    return parser.isoparse(timestamp).astimezone(timezone)
+
+def short_id(object_id):
+    """
+    Shortens an ID the way podman-py's `short_id` does, so IDs in different columns match.
+
+    Args:
+        object_id (str): The full ID.
+
+    Returns:
+        str: The first 10 characters, or 17 when the ID keeps its "sha256:" prefix.
+    """
+    return object_id[:17] if object_id.startswith("sha256:") else object_id[:10]
+
+def format_ports(container):
+    """
+    Formats a container's published ports.
+
+    Args:
+        container (Container): A Podman container object, after `reload()`.
+
+    Returns:
+        str: The "host -> container" port pairs, or "No ports".
+    """
+    return ", ".join(
+        f"{value.get('HostPort', 'N/A')} -> {key}"
+        for key, values in container.ports.items()
+        if values
+        for value in values
+    ) if container.ports else "No ports"
+
+def run_command(container):
+    """
+    Returns the command that created a container, with the podman binary path shortened.
+
+    Args:
+        container (Container): A Podman container object, after `reload()`.
+
+    Returns:
+        list: The command line arguments.
+    """
+    create_command = list(container.attrs["Config"].get("CreateCommand") or [""])
+    if create_command[0].endswith("podman"):
+        create_command[0] = "podman"
+    return create_command
+
+# how each container column is computed from an inspected container, its image tags and the timezone
+CONTAINER_COLUMNS = {
+    "Status": lambda container, image_tags, timezone: f"{status_icons.get(container.status.lower(), '❓')} {container.status}",
+    "Name": lambda container, image_tags, timezone: container.name,
+    "ID": lambda container, image_tags, timezone: container.short_id,
+    "Image": lambda container, image_tags, timezone: image_tags,
+    "Ports": lambda container, image_tags, timezone: format_ports(container),
+    "Created": lambda container, image_tags, timezone: parse_created(container.attrs["Created"], timezone),
+    "RunCommand": lambda container, image_tags, timezone: run_command(container),
+    "Quadlet": lambda container, image_tags, timezone: quadlet_utils.container_unit(container.attrs),
+}
+
+# the columns of a full container row; "Quadlet" is only computed on demand
+ROW_COLUMNS = ("Status", "Name", "ID", "Image", "Ports", "Created", "RunCommand")
+
+def container_row(container, image_tags, timezone, columns=ROW_COLUMNS):
+    """
+    Builds the row describing an inspected container, computing only the requested columns.
+
+    Args:
+        container (Container): A Podman container object, after `reload()`.
+        image_tags (list): The tags of the container's image.
+        timezone (tzinfo): The timezone creation times are shown in.
+        columns (iterable): The columns to compute, any of the keys of `CONTAINER_COLUMNS`.
+
+    Returns:
+        dict: The requested columns, `ROW_COLUMNS` by default.
+    """
+    return {column: CONTAINER_COLUMNS[column](container, image_tags, timezone) for column in columns}
+
+# columns computed on first use, memoized per (URI, container ID) and list() fingerprint
+derived_cache = {}
+derived_lock = threading.Lock()
+
+def derived_column(key, container, column, fingerprint):
+    """
+    Returns a container column that's only computed when an action needs it, such as "RunCommand".
+
+    Values are shared process-wide and recomputed only when the container's fingerprint changes.
+    Call `forget_derived` once a container is gone.
+
+    Args:
+        key (tuple): The connection URI and full container ID.
+        container (Container): A Podman container object, after `reload()`.
+        column (str): One of the keys of `CONTAINER_COLUMNS` that doesn't depend on image tags or timezone.
+        fingerprint (str): The container's list() fingerprint, from `FINGERPRINT_KEYS`.
+
+    Returns:
+        The column's value.
+    """
+    with derived_lock:
+        entry = derived_cache.get(key)
+        if entry is None or entry["fingerprint"] != fingerprint:
+            entry = derived_cache[key] = {"fingerprint": fingerprint, "values": {}}
+        if column in entry["values"]:
+            return entry["values"][column]
+    value = CONTAINER_COLUMNS[column](container, None, None)
+    with derived_lock:
+        entry["values"][column] = value
+    return value
+
+def forget_derived(keys):
+    """
+    Drops the memoized columns of containers that are gone.
+
+    Args:
+        keys (iterable): (URI, container ID) tuples, as passed to `derived_column`.
+
+    Returns:
+        None
+    """
+    with derived_lock:
+        for key in keys:
+            derived_cache.pop(key, None)
+
+def pod_row(pod, timezone):
+    """
+    Builds the row describing a pod.
+
+    Args:
+        pod (Pod): A Podman pod object.
+        timezone (tzinfo): The timezone creation times are shown in.
+
+    Returns:
+        dict: The pod's "Name", "Status", "ID" and "Created".
+    """
+    return {
+        "Name": pod.name,
+        "Status": "".join(status_icons.get(c['Status'], '❓') for c in pod.attrs['Containers']),
+        "ID": pod.short_id,
+        "Created": parse_created(pod.attrs["Created"], timezone),
+    }
+
+def image_row(image, layer_index, usage_index, timezone):
+    """
+    Builds the row describing an image.
+
+    Args:
+        image (Image): A Podman image object.
+        layer_index (LayerIndex): The layer-sharing index for the listed images.
+        usage_index (ImageUsageIndex): The image-to-container index.
+        timezone (tzinfo): The timezone creation times are shown in.
+
+    Returns:
+        dict: The image's "Tags", "ID", "Used By", sizes in MB, "Parent", "Children" and "Created".
+    """
+    parent_id = layer_index.parents.get(image.id)
+    return {
+        "Tags": image.tags,
+        "ID": image.short_id,
+        "Used By": usage_index.used_by(image.id),
+        "Size (MB)": round(image.attrs.get("Size", 0) / 1024 / 1024, 2),
+        "Unique (MB)": round(layer_index.unique_bytes(image.id) / 1024 / 1024, 2),
+        "Shared (MB)": round(layer_index.shared_bytes(image.id) / 1024 / 1024, 2),
+        "Parent": short_id(parent_id) if parent_id else "",
+        "Children": len(layer_index.children[image.id]),
+        "Created": datetime.fromtimestamp(image.attrs.get("Created", 0), timezone),
+    }
+
+def volume_row(volume, users, usage, timezone):
+    """
+    Builds the row describing a volume.
+
+    Args:
+        volume (Volume): A Podman volume object.
+        users (list): The names of the containers mounting the volume.
+        usage (dict): The volume's disk usage entry from `volume_utils.build_usage_index`.
+        timezone (tzinfo): The timezone creation times are shown in.
+
+    Returns:
+        dict: The volume's "Name", "Used By", sizes in MB, "Scope", "Mount Point" and "Created".
+    """
+    return {
+        "Name": volume.name,
+        "Used By": users,
+        "Size (MB)": round(usage.get("Size", 0) / 1024 / 1024, 2),
+        "Reclaimable (MB)": round(usage.get("ReclaimableSize", 0) / 1024 / 1024, 2),
+        "Scope": volume.attrs["Scope"],
+        "Mount Point": f'{volume.attrs["Mountpoint"]}',
+        "Created": parse_created(volume.attrs["CreatedAt"], timezone),
+    }
+
+def network_row(network, timezone):
+    """
+    Builds the row describing a network.
+
+    Args:
+        network (Network): A Podman network object.
+        timezone (tzinfo): The timezone creation times are shown in.
+
+    Returns:
+        dict: The network's "Name", "ID", "Driver" and "Created".
+    """
+    return {
+        "Name": network.name,
+        "ID": network.short_id,
+        "Driver": network.attrs["driver"],
+        "Created": parse_created(network.attrs["created"], timezone),
+    }
+
+def reload_all(containers, max_workers=16):
+    """
+    Inspects containers concurrently, yielding them in listing order as soon as each is ready.
+
+    Args:
+        containers (list): Podman container objects from `client.containers.list()`.
+        max_workers (int): How many containers to inspect at once.
+
+    Yields:
+        Container: Each container, after `reload()`.
+    """
+    def reload(container):
+        container.reload()
+        return container
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        yield from executor.map(reload, containers)
+
+def container_snapshot(client, previous=None, max_workers=16):
+    """
+    Builds the container rows, re-inspecting only containers whose list() payload changed.
+
+    Args:
+        client (PodmanClient): A client object used to connect to the container runtime.
+        previous (dict): The result of the previous call, or None to inspect every container.
+        max_workers (int): How many containers to inspect at once.
+
+    Returns:
+        dict: A mapping of full container ID to its "fingerprint" and "row", in listing order.
+    """
+    from utils.image_utils import ImageUsageIndex
+
+    previous = previous or {}
+    containers = client.containers.list(all=True)
+    usage_index = ImageUsageIndex(containers, client.images.list(all=True))
+
+    entries = {}
+    changed = []
+    for container in containers:
+        row_fingerprint = snapshot_utils.fingerprint(container.attrs.get(key) for key in FINGERPRINT_KEYS)
+        cached = previous.get(container.id)
+        if cached and cached["fingerprint"] == row_fingerprint:
+            entries[container.id] = cached
+        else:
+            entries[container.id] = {"fingerprint": row_fingerprint, "row": None}
+            changed.append(container)
+
+    timezone = local_timezone()
+    for container in reload_all(changed, max_workers):
+        entries[container.id]["row"] = container_row(container, [], timezone)
+    # image tags can change without the container changing, so they're always looked up again
+    for container_id, entry in entries.items():
+        entry["row"]["Image"] = usage_index.tags_for_container(container_id)
+    return entries
+
+def iter_rows(client, kind, max_workers=16):
+    """
+    Streams the normalized rows of one kind of resource.
+
+    Listings are fetched once; per-object inspects run concurrently and rows are yielded as they
+    become available, so the first rows arrive long before the last on hosts with thousands of objects.
+
+    Args:
+        client (PodmanClient): A client object used to connect to the container runtime.
+        kind (str): One of `KINDS`.
+        max_workers (int): How many objects to inspect at once.
+
+    Yields:
+        dict: One row per object, as shown in the matching tab.
+    """
+    from utils import image_utils, volume_utils
+
+    timezone = local_timezone()
+    if kind == "containers":
+        containers = client.containers.list(all=True)
+        usage_index = image_utils.ImageUsageIndex(containers, client.images.list(all=True))
+        for container in reload_all(containers, max_workers):
+            yield container_row(container, usage_index.tags_for_container(container.id), timezone)
+    elif kind == "pods":
+        for pod in client.pods.list():
+            yield pod_row(pod, timezone)
+    elif kind == "images":
+        images = client.images.list(all=True)
+        inspect_attrs = image_utils.get_inspect_attrs(client, [image.id for image in images])
+        layer_index = image_utils.build_layer_index(images, inspect_attrs, client.df())
+        usage_index = image_utils.ImageUsageIndex(client.containers.list(all=True), images)
+        for image in images:
+            yield image_row(image, layer_index, usage_index, timezone)
+    elif kind == "volumes":
+        volumes = client.volumes.list()
+        mount_index = volume_utils.build_mount_index(reload_all(client.containers.list(all=True), max_workers))
+        usage_index = volume_utils.build_usage_index(client.df())
+        for volume in volumes:
+            yield volume_row(volume, mount_index.get(volume.name, []), usage_index.get(volume.name, {}), timezone)
+    elif kind == "networks":
+        for network in client.networks.list():
+            yield network_row(network, timezone)
+    else:
+        raise ValueError(f"Unknown resource kind '{kind}', expected one of {', '.join(KINDS)}")
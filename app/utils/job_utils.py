@@ -0,0 +1,296 @@
+import itertools
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+import streamlit as st
+
+ACTIVE_STATES = ("queued", "running")
+
+class JobCancelled(Exception):
+    """
+    Raised inside a job's function when the job was cancelled.
+    """
+
+class Job:
+    """
+    A long operation, such as a pull or a prune, running on the process-wide worker pool.
+
+    The job's function reports progress and log lines through the job, and checks `check_cancelled`
+    between units of work. Jobs outlive the session that started them, so any session connected to
+    the same Podman service can follow, cancel or read the result of a job.
+    """
+
+    def __init__(self, job_id, title, uri, func, args, kwargs, max_log_lines=1000):
+        """
+        Args:
+            job_id (int): The job's ID, unique within the process.
+            title (str): A short description shown in the jobs panel.
+            uri (str): The Podman service URI the job runs against.
+            func (callable): Called as `func(job, client, *args, **kwargs)` on a worker thread.
+            args (tuple): Positional arguments for `func`.
+            kwargs (dict): Keyword arguments for `func`.
+            max_log_lines (int): How many of the latest log lines are kept.
+        """
+        self.id = job_id
+        self.title = title
+        self.uri = uri
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+        self.lock = threading.Lock()
+        self.lines = deque(maxlen=max_log_lines)
+        self.status = "queued"
+        self.progress = None
+        self.message = ""
+        self.result = None
+        # how a text result is highlighted in the jobs panel
+        self.language = "text"
+        self.error = None
+        self.created = time.time()
+        self.started = None
+        self.finished = None
+        self.cancel_event = threading.Event()
+
+    @property
+    def active(self):
+        return self.status in ACTIVE_STATES
+
+    @property
+    def seconds(self):
+        """
+        Returns:
+            float: How long the job has been running, or ran, in seconds.
+        """
+        if self.started is None:
+            return 0.0
+        return (self.finished or time.time()) - self.started
+
+    def log(self, line):
+        """
+        Appends a line to the job's log.
+
+        Args:
+            line (str): The line, without a trailing newline.
+
+        Returns:
+            None
+        """
+        with self.lock:
+            self.lines.append(str(line).rstrip("\n"))
+
+    def log_tail(self, count=200):
+        """
+        Args:
+            count (int): How many lines to return.
+
+        Returns:
+            list: The latest log lines, oldest first.
+        """
+        with self.lock:
+            return list(self.lines)[-count:]
+
+    def set_progress(self, done, total=None, message=None):
+        """
+        Reports how far the job got.
+
+        Args:
+            done (float): The units of work done, or a fraction if `total` is None.
+            total (float): The units of work in total.
+            message (str): What the job is doing now.
+
+        Returns:
+            None
+        """
+        self.progress = min(1.0, done / total) if total else min(1.0, done)
+        if message is not None:
+            self.message = message
+
+    def cancel(self):
+        """
+        Asks the job to stop. Queued jobs never start; running jobs stop at their next `check_cancelled`.
+
+        Returns:
+            None
+        """
+        self.cancel_event.set()
+        with self.lock:
+            if self.status == "queued":
+                self.status = "cancelled"
+                self.finished = time.time()
+
+    def check_cancelled(self):
+        """
+        Raises `JobCancelled` if the job was asked to stop.
+
+        Returns:
+            None
+        """
+        if self.cancel_event.is_set():
+            raise JobCancelled()
+
+class JobRunner:
+    """
+    Runs jobs on a fixed pool of worker threads and keeps the latest finished ones for display.
+
+    Kinds of jobs that are heavy on the Podman host, such as builds, can get a pool of their own,
+    so they're limited separately and waiting ones don't hold on to the shared workers.
+    """
+
+    def __init__(self, max_workers=4, keep=50, identity="~/.ssh/id_ed25519", pools=None):
+        """
+        Args:
+            max_workers (int): How many jobs run at once; the rest wait in the queue.
+            keep (int): How many finished jobs are kept per Podman service.
+            identity (str): The SSH identity used for SSH connections.
+            pools (dict): Names of separate pools mapped to how many of their jobs run at once.
+        """
+        self.max_workers = max_workers
+        self.keep = keep
+        self.identity = identity
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="job")
+        self.pools = {
+            name: ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f"job-{name}")
+            for name, workers in (pools or {}).items()
+        }
+        self.lock = threading.Lock()
+        self.jobs = OrderedDict()
+        self.ids = itertools.count(1)
+
+    def submit(self, uri, title, func, *args, pool=None, **kwargs):
+        """
+        Queues a job.
+
+        Args:
+            uri (str): The Podman service URI; the job gets its own client connected to it.
+            title (str): A short description shown in the jobs panel.
+            func (callable): Called as `func(job, client, *args, **kwargs)` on a worker thread. Its
+                return value becomes the job's result.
+            *args: Positional arguments for `func`.
+            pool (str): The separate pool to run the job on, from `pools`; the shared one by default.
+            **kwargs: Keyword arguments for `func`.
+
+        Returns:
+            Job: The queued job.
+        """
+        with self.lock:
+            job = Job(next(self.ids), title, uri, func, args, kwargs)
+            self.jobs[job.id] = job
+            self.trim_locked(uri)
+        (self.pools[pool] if pool else self.executor).submit(self.run, job)
+        return job
+
+    def run(self, job):
+        """
+        Runs a job on the current worker thread, recording its outcome.
+
+        Args:
+            job (Job): The job to run.
+
+        Returns:
+            None
+        """
+        from podman import PodmanClient
+
+        with job.lock:
+            if job.status != "queued":
+                return
+            job.status = "running"
+            job.started = time.time()
+        try:
+            job.check_cancelled()
+            with PodmanClient(base_url=job.uri, identity=self.identity) as client:
+                result = job.func(job, client, *job.args, **job.kwargs)
+            status, error = "done", None
+        except JobCancelled:
+            result, status, error = None, "cancelled", None
+            job.log("Cancelled")
+        except Exception as e:
+            result, status, error = None, "failed", str(e)
+        with job.lock:
+            if status == "done":
+                job.progress = 1.0
+            job.result = result
+            job.error = error
+            job.status = status
+            job.finished = time.time()
+        if error:
+            job.log(f"Error: {error}")
+
+    def get(self, job_id):
+        """
+        Args:
+            job_id (int): The job's ID.
+
+        Returns:
+            Job: The job, or None if it was never submitted or was dropped from the history.
+        """
+        with self.lock:
+            return self.jobs.get(job_id)
+
+    def list(self, uri):
+        """
+        Args:
+            uri (str): The Podman service URI.
+
+        Returns:
+            list: The service's jobs, newest first.
+        """
+        with self.lock:
+            return [job for job in reversed(self.jobs.values()) if job.uri == uri]
+
+    def clear_finished(self, uri):
+        """
+        Drops the finished jobs of a Podman service from the history.
+
+        Args:
+            uri (str): The Podman service URI.
+
+        Returns:
+            None
+        """
+        with self.lock:
+            for job_id in [job.id for job in self.jobs.values() if job.uri == uri and not job.active]:
+                del self.jobs[job_id]
+
+    def trim_locked(self, uri):
+        """
+        Drops the oldest finished jobs of a service beyond `keep`. The caller must hold `self.lock`.
+
+        Args:
+            uri (str): The Podman service URI.
+
+        Returns:
+            None
+        """
+        finished = [job.id for job in self.jobs.values() if job.uri == uri and not job.active]
+        for job_id in finished[:max(0, len(finished) - self.keep)]:
+            del self.jobs[job_id]
+
+def create_runner():
+    """
+    Creates a job runner configured from the environment.
+
+    `PODMAN_STREAMLIT_JOB_WORKERS` sets how many jobs run at once (default 4) and
+    `PODMAN_STREAMLIT_JOB_HISTORY` how many finished jobs are kept per service (default 50).
+    Image builds run on their own "build" pool, `PODMAN_STREAMLIT_BUILD_CONCURRENCY` at once (default 2).
+
+    Returns:
+        JobRunner: A new runner.
+    """
+    return JobRunner(
+        max_workers=int(os.environ.get("PODMAN_STREAMLIT_JOB_WORKERS", 4)),
+        keep=int(os.environ.get("PODMAN_STREAMLIT_JOB_HISTORY", 50)),
+        pools={"build": int(os.environ.get("PODMAN_STREAMLIT_BUILD_CONCURRENCY", 2))},
+    )
+
+@st.cache_resource(show_spinner=False)
+def get_runner():
+    """
+    Returns the job runner shared by every session in this process.
+
+    Returns:
+        JobRunner: The process-wide runner.
+    """
+    return create_runner()
@@ -0,0 +1,288 @@
+import gzip
+import os
+import re
+import tarfile
+import tempfile
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing, contextmanager
+from datetime import datetime
+from podman import api
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+EXPORT_DIR = os.environ.get("PODMAN_STREAMLIT_EXPORT_DIR", os.path.join(tempfile.gettempdir(), "podman-streamlit-exports"))
+EXPORT_CHUNK_SIZE = 1024 * 1024
+# Streamlit holds a download in memory, so larger exports are only left on disk
+DOWNLOAD_LIMIT = int(os.environ.get("PODMAN_STREAMLIT_DOWNLOAD_LIMIT_MB", "200")) * 1024 * 1024
+
+@contextmanager
+def open_log_stream(container, since=None, until=None):
+    """
+    Opens a container's raw log stream and closes its connection when the block exits.
+
+    `container.logs(stream=True)` reads the response from a generator that never closes it, so a
+    reader that stops early would hold the connection until the generator is garbage collected.
+
+    Args:
+        container (Container): The Podman container to read logs from.
+        since (int): Optional epoch seconds to start reading from.
+        until (int): Optional epoch seconds to stop reading at.
+
+    Yields:
+        Iterator[bytes]: The log frames, stdout and stderr interleaved.
+    """
+    params = {
+        "follow": False,
+        "since": api.prepare_timestamp(since),
+        "stderr": True,
+        "stdout": True,
+        "until": api.prepare_timestamp(until),
+    }
+    response = container.client.get(f"/containers/{container.id}/logs", stream=True, params=params)
+    try:
+        response.raise_for_status()
+        yield api.stream_frames(response)
+    finally:
+        response.close()
+
+def iter_log_lines(container, since=None, until=None):
+    """
+    Streams a container's logs line by line without holding the whole log in memory.
+
+    Args:
+        container (Container): The Podman container to read logs from.
+        since (int): Optional epoch seconds to start reading from.
+        until (int): Optional epoch seconds to stop reading at.
+
+    Yields:
+        str: Each decoded log line, without the trailing newline.
+    Notes:
+        A caller that stops before the end should close the generator, which closes the stream.
+    """
+    buffer = b""
+    with open_log_stream(container, since, until) as frames:
+        for frame in frames:
+            buffer += frame
+            *lines, buffer = buffer.split(b"\n")
+            for line in lines:
+                yield line.decode("utf-8", errors="replace").rstrip("\r")
+        if buffer:
+            yield buffer.decode("utf-8", errors="replace").rstrip("\r")
+
+def search_container_logs(container, pattern, since=None, until=None, context=2, budget=None):
+    """
+    Searches one container's logs for a compiled regex, keeping only matches and their context.
+
+    Args:
+        container (Container): The Podman container to search.
+        pattern (re.Pattern): The compiled regex to match each line against.
+        since (int): Optional epoch seconds to start searching from.
+        until (int): Optional epoch seconds to stop searching at.
+        context (int): The number of lines to keep before and after each match.
+        budget (MatchBudget): Optional shared cap on the number of matches across containers.
+
+    Returns:
+        A list of dictionaries with the keys "line_number", "line", "before" and "after".
+    """
+    matches = []
+    before = deque(maxlen=context)
+    pending = []
+    # closed on the early exits below, so the log stream is released right away
+    with closing(iter_log_lines(container, since, until)) as lines:
+        for line_number, line in enumerate(lines, start=1):
+            for match in pending:
+                match["after"].append(line)
+            pending = [match for match in pending if len(match["after"]) < context]
+
+            if pattern.search(line):
+                if budget is not None and not budget.take():
+                    break
+                match = {"line_number": line_number, "line": line, "before": list(before), "after": []}
+                matches.append(match)
+                if context:
+                    pending.append(match)
+            elif budget is not None and budget.dropped and not pending:
+                # another match is known to be cut off, so the rest can't change the results
+                break
+            before.append(line)
+    return matches
+
+class MatchBudget:
+    """
+    Thread-safe counter that caps the total number of matches across concurrent searches.
+
+    Attributes:
+        dropped (bool): True once a match was refused because the limit had been reached.
+    """
+
+    def __init__(self, limit):
+        self.limit = limit
+        self.count = 0
+        self.dropped = False
+        self.lock = threading.Lock()
+
+    def take(self):
+        """
+        Claims one match from the budget.
+
+        Returns:
+            bool: True if the match fits within the limit, False once the limit is reached.
+        """
+        with self.lock:
+            if self.count >= self.limit:
+                self.dropped = True
+                return False
+            self.count += 1
+            return True
+
+def search_logs(containers, pattern, since=None, until=None, context=2, max_matches=500, max_workers=8):
+    """
+    Searches the logs of many containers concurrently.
+
+    Args:
+        containers (list): The Podman containers to search.
+        pattern (str): The regex to search for. It is compiled once and shared by all workers.
+        since (int): Optional epoch seconds to start searching from.
+        until (int): Optional epoch seconds to stop searching at.
+        context (int): The number of lines to keep before and after each match.
+        max_matches (int): The maximum number of matches to return across all containers.
+        max_workers (int): The maximum number of containers searched at once.
+
+    Returns:
+        tuple: A dictionary of container name to its matches, and a boolean that is True if the
+            results were truncated, that is a match beyond `max_matches` was left out.
+
+    Raises:
+        re.error: If the pattern is not a valid regex.
+    """
+    compiled = re.compile(pattern)
+    budget = MatchBudget(max_matches)
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(containers)))) as executor:
+        futures = {
+            container.name: executor.submit(search_container_logs, container, compiled, since, until, context, budget)
+            for container in containers
+        }
+        results = {name: future.result() for name, future in futures.items()}
+    return results, budget.dropped
+
+def export_formats():
+    """
+    Lists the log export formats available in this environment.
+
+    Returns:
+        dict: A mapping of format label to format key. zstd is only offered when `zstandard` is installed.
+    """
+    formats = {"gzip (one file per container)": "gzip"}
+    if zstandard is not None:
+        formats["zstd (one file per container)"] = "zstd"
+    formats["tar.gz bundle"] = "tar"
+    return formats
+
+def write_container_log(container, fileobj, since=None, until=None, progress=None):
+    """
+    Streams a container's raw logs into a file object in fixed-size chunks.
+
+    Args:
+        container (Container): The Podman container to export logs from.
+        fileobj (file): A binary file object to write to, such as a gzip or zstd writer.
+        since (int): Optional epoch seconds to start exporting from.
+        until (int): Optional epoch seconds to stop exporting at.
+        progress (callable): Optional callback receiving the container name and bytes written so far.
+
+    Returns:
+        int: The number of uncompressed bytes written.
+    """
+    written = 0
+    chunk = bytearray()
+    # a failed write, e.g. a full disk, still closes the stream
+    with open_log_stream(container, since, until) as frames:
+        for frame in frames:
+            chunk += frame
+            while len(chunk) >= EXPORT_CHUNK_SIZE:
+                fileobj.write(chunk[:EXPORT_CHUNK_SIZE])
+                del chunk[:EXPORT_CHUNK_SIZE]
+                written += EXPORT_CHUNK_SIZE
+                if progress:
+                    progress(container.name, written)
+        if chunk:
+            fileobj.write(chunk)
+            written += len(chunk)
+    if progress:
+        progress(container.name, written)
+    return written
+
+def read_export(path):
+    """
+    Reads an exported file for download, closing it straight away.
+
+    Args:
+        path (str): The exported file.
+
+    Returns:
+        bytes: Its contents.
+    """
+    with open(path, "rb") as fileobj:
+        return fileobj.read()
+
+def open_compressed(path, compression):
+    """
+    Opens a compressed binary file for writing.
+
+    Args:
+        path (str): The file to create.
+        compression (str): Either "gzip" or "zstd".
+
+    Returns:
+        A writable binary file object that compresses its input.
+    """
+    if compression == "zstd":
+        return zstandard.ZstdCompressor().stream_writer(open(path, "wb"))
+    return gzip.open(path, "wb")
+
+def export_logs(containers, export_format, since=None, until=None, progress=None):
+    """
+    Exports the logs of one or many containers to compressed files on disk.
+
+    Logs are streamed from Podman straight into the compressor, so memory use stays constant
+    no matter how large the logs are. Tar bundles stage each log in a temporary file first,
+    because tar headers need the size of each member up front.
+
+    Args:
+        containers (list): The Podman containers to export logs from.
+        export_format (str): One of the keys returned by `export_formats`: "gzip", "zstd" or "tar".
+        since (int): Optional epoch seconds to start exporting from.
+        until (int): Optional epoch seconds to stop exporting at.
+        progress (callable): Optional callback receiving the container name and bytes written so far.
+
+    Returns:
+        list: The paths of the exported files.
+    """
+    os.makedirs(EXPORT_DIR, exist_ok=True)
+    stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+
+    if export_format == "tar":
+        path = os.path.join(EXPORT_DIR, f"container-logs-{stamp}.tar.gz")
+        with tarfile.open(path, "w:gz") as bundle:
+            for container in containers:
+                with tempfile.TemporaryFile(dir=EXPORT_DIR) as staging:
+                    size = write_container_log(container, staging, since, until, progress)
+                    staging.seek(0)
+                    member = tarfile.TarInfo(f"{container.name}.log")
+                    member.size = size
+                    member.mtime = int(datetime.now().timestamp())
+                    bundle.addfile(member, staging)
+        return [path]
+
+    extension = "zst" if export_format == "zstd" else "gz"
+    paths = []
+    for container in containers:
+        path = os.path.join(EXPORT_DIR, f"{container.name}-{stamp}.log.{extension}")
+        with open_compressed(path, export_format) as fileobj:
+            write_container_log(container, fileobj, since, until, progress)
+        paths.append(path)
+    return paths
@@ -0,0 +1,55 @@
+import sys
+
+def deep_size(value, seen=None):
+    """
+    Estimates the memory held by a value and everything it references.
+
+    Objects shared with the rest of the process are still counted, so the result is an upper
+    bound on what dropping the value would free. DataFrames report their own deep usage.
+
+    Args:
+        value: The value to measure.
+        seen (set): IDs of objects already counted, so shared references are counted once.
+
+    Returns:
+        int: The estimated size in bytes.
+    """
+    seen = set() if seen is None else seen
+    if id(value) in seen:
+        return 0
+    seen.add(id(value))
+
+    memory_usage = getattr(value, "memory_usage", None)
+    if callable(memory_usage) and hasattr(value, "columns"):
+        return int(memory_usage(deep=True).sum())
+
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        size += sum(deep_size(key, seen) + deep_size(item, seen) for key, item in value.items())
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        size += sum(deep_size(item, seen) for item in value)
+    elif hasattr(value, "__slots__"):
+        size += sum(deep_size(getattr(value, slot), seen) for slot in value.__slots__ if hasattr(value, slot))
+    elif hasattr(value, "__dict__"):
+        size += deep_size(vars(value), seen)
+    return size
+
+def session_footprint(state):
+    """
+    Measures how much memory each session state entry holds.
+
+    Args:
+        state (Mapping): The session state, such as `st.session_state`.
+
+    Returns:
+        list: (key, bytes) pairs, largest first.
+    """
+    seen = set()
+    sizes = []
+    for key in list(state.keys()):
+        try:
+            sizes.append((key, deep_size(state[key], seen)))
+        except Exception:
+            # widgets and other entries that can't be read back are skipped
+            continue
+    return sorted(sizes, key=lambda item: item[1], reverse=True)
@@ -0,0 +1,98 @@
+"""
+The listings a full page run needs, fetched concurrently before the page is drawn.
+
+Every tab is drawn on a full run, so without this the run waits for the container, pod, image,
+volume, network and secret listings plus `version()` and `df()` one after another. Fetching them
+together with `async_client` makes the run wait only for the slowest. The payloads only live for
+the run that fetched them: fragment reruns, and anything the prefetch couldn't get, list through
+the `PodmanClient` as before.
+"""
+from contextlib import contextmanager
+import streamlit as st
+from utils import async_client
+
+# the session state key holding the current run's payloads
+STATE_KEY = "prefetched_inventory"
+
+# the arguments the `PodmanClient` listings are called with, matching `AsyncPodmanClient.inventory`
+LIST_ARGS = {
+    "containers": {"all": True},
+    "images": {"all": True},
+}
+
+@contextmanager
+def prefetched(uri, identity="~/.ssh/id_ed25519"):
+    """
+    Fetches the inventory concurrently for the page run inside the block.
+
+    A failed prefetch isn't an error: each listing then comes from the `PodmanClient`, which
+    reports any problem where it's shown.
+
+    Args:
+        uri (str): The Podman service URI.
+        identity (str): The SSH identity used for SSH connections.
+
+    Yields:
+        None
+    """
+    try:
+        payloads = async_client.fetch_inventory(uri, identity)
+    except Exception:
+        payloads = {}
+    st.session_state[STATE_KEY] = {"uri": uri, "payloads": payloads}
+    try:
+        yield
+    finally:
+        st.session_state.pop(STATE_KEY, None)
+
+def payload(kind):
+    """
+    Returns a payload prefetched for the current run.
+
+    Args:
+        kind (str): One of the keys of `AsyncPodmanClient.inventory`.
+
+    Returns:
+        The raw payload, or None outside a prefetched run or if it wasn't fetched.
+    """
+    prefetch = st.session_state.get(STATE_KEY)
+    if not prefetch or prefetch["uri"] != st.session_state.get("selected_uri"):
+        return None
+    return prefetch["payloads"].get(kind)
+
+def listing(client, kind):
+    """
+    Lists Podman objects, from the current run's prefetch when there is one.
+
+    Args:
+        client (PodmanClient): The client object used to build the objects, or to list them.
+        kind (str): "containers", "pods", "images", "volumes", "networks" or "secrets".
+
+    Returns:
+        list: The Podman objects, as `client.<kind>.list()` returns them.
+    """
+    manager = getattr(client, kind)
+    attrs = payload(kind)
+    if attrs is None:
+        return manager.list(**LIST_ARGS.get(kind, {}))
+    return [manager.prepare_model(attrs=item) for item in attrs]
+
+def version(client):
+    """
+    Args:
+        client (PodmanClient): The client object used if nothing was prefetched.
+
+    Returns:
+        dict: The Podman version report, from the current run's prefetch when there is one.
+    """
+    return payload("version") or client.version()
+
+def df(client):
+    """
+    Args:
+        client (PodmanClient): The client object used if nothing was prefetched.
+
+    Returns:
+        dict: The disk usage report, from the current run's prefetch when there is one.
+    """
+    return payload("df") or client.df()
@@ -0,0 +1,350 @@
+"""
+Opt-in profiling of whole reruns: a statistical sampler for where the time goes, wall time per
+section of the page, and tracemalloc for what each rerun allocated.
+
+Nothing here touches Streamlit, so reruns can be profiled from scripts as well. Sampling reads the
+profiled thread's stack from a background thread, which also catches time spent waiting on sockets.
+"""
+import html
+import os
+import sys
+import threading
+import time
+import tracemalloc
+import zlib
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime
+
+# seconds between stack samples
+SAMPLE_INTERVAL = 0.005
+
+# allocation sources that are the profiler's own bookkeeping
+IGNORED_ALLOCATIONS = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, __file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+)
+
+# tracemalloc is process-wide, so it runs while any rerun is being profiled
+tracing_lock = threading.Lock()
+tracing_users = 0
+
+# the profile of the rerun running on each thread, for `section`
+current = threading.local()
+
+def frame_name(code):
+    """
+    Names a function for stacks, with enough of its path to tell modules apart.
+
+    Args:
+        code (code): The function's code object.
+
+    Returns:
+        str: e.g. "show (components/container_tab.py:12)".
+    """
+    path = "/".join(code.co_filename.replace(os.sep, "/").split("/")[-2:])
+    return f"{code.co_name} ({path}:{code.co_firstlineno})"
+
+def current_stack():
+    """
+    Names the calls on the current thread's stack.
+
+    Returns:
+        tuple: Frame names from the outermost call.
+    """
+    stack = []
+    frame = sys._getframe(1)
+    while frame is not None:
+        stack.append(frame_name(frame.f_code))
+        frame = frame.f_back
+    return tuple(reversed(stack))
+
+class Sampler:
+    """
+    Samples one thread's call stack at a fixed interval from a background thread.
+
+    Attributes:
+        stacks (Counter): Stacks, as tuples of frame names from the outermost call, mapped to how
+            often they were seen.
+    """
+
+    def __init__(self, thread_id, interval=SAMPLE_INTERVAL, base=()):
+        """
+        Args:
+            thread_id (int): The thread to sample.
+            interval (float): Seconds between samples.
+            base (tuple): The stack the profiled code was entered from. The calls below its last
+                common frame, such as the script runner's, are left out of the samples.
+        """
+        self.thread_id = thread_id
+        self.interval = interval
+        self.base = base
+        self.stacks = Counter()
+        self.stop_event = threading.Event()
+        self.thread = threading.Thread(target=self.run, name="rerun-sampler", daemon=True)
+
+    def run(self):
+        while not self.stop_event.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                stack.append(frame_name(frame.f_code))
+                frame = frame.f_back
+            if stack:
+                self.stacks[self.trim(tuple(reversed(stack)))] += 1
+
+    def trim(self, stack):
+        common = 0
+        for name, base_name in zip(stack, self.base):
+            if name != base_name:
+                break
+            common += 1
+        return stack[max(common - 1, 0):]
+
+    def start(self):
+        self.thread.start()
+
+    def stop(self):
+        self.stop_event.set()
+        self.thread.join()
+
+class RerunProfile:
+    """
+    What one profiled rerun spent its time and memory on.
+
+    Attributes:
+        name (str): What was profiled, e.g. the page.
+        started (datetime): When the rerun started.
+        seconds (float): The rerun's wall time.
+        sections (list): One dict per section with its "Section", "Depth", "Wall (ms)" and
+            "Allocated (KB)", in the order the sections started.
+        stacks (Counter): The sampled stacks, see `Sampler`.
+        allocations (list): The largest allocations still alive when the rerun ended, as dicts with
+            "Location", "Size (KB)" and "Blocks".
+        peak (int): The most memory tracemalloc traced during the rerun, in bytes.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.started = datetime.now()
+        self.seconds = 0.0
+        self.sections = []
+        self.stacks = Counter()
+        self.allocations = []
+        self.peak = 0
+        self.depth = 0
+
+    @property
+    def samples(self):
+        return sum(self.stacks.values())
+
+def start_tracing():
+    global tracing_users
+    with tracing_lock:
+        if tracing_users == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        tracing_users += 1
+
+def stop_tracing():
+    global tracing_users
+    with tracing_lock:
+        tracing_users -= 1
+        if tracing_users == 0 and tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+def top_allocations(before, after, limit=25):
+    """
+    Lists the source lines that allocated the most memory still alive between two snapshots.
+
+    Args:
+        before (Snapshot): The tracemalloc snapshot taken when the rerun started.
+        after (Snapshot): The snapshot taken when it ended.
+        limit (int): How many lines to list.
+
+    Returns:
+        list: Dicts with the "Location", "Size (KB)" and "Blocks" allocated in between, largest first.
+    """
+    after = after.filter_traces(IGNORED_ALLOCATIONS)
+    before = before.filter_traces(IGNORED_ALLOCATIONS)
+    rows = []
+    for stat in after.compare_to(before, "lineno"):
+        if stat.size_diff <= 0:
+            continue
+        frame = stat.traceback[0]
+        path = "/".join(frame.filename.replace(os.sep, "/").split("/")[-2:])
+        rows.append({
+            "Location": f"{path}:{frame.lineno}",
+            "Size (KB)": round(stat.size_diff / 1024, 1),
+            "Blocks": stat.count_diff,
+        })
+        if len(rows) == limit:
+            break
+    return rows
+
+@contextmanager
+def profile(name, interval=SAMPLE_INTERVAL):
+    """
+    Profiles the code run inside the block on the current thread.
+
+    The profile is filled in when the block exits, including when it exits with an exception,
+    such as the one Streamlit raises to rerun the script.
+
+    Args:
+        name (str): What is being profiled, e.g. the page.
+        interval (float): Seconds between stack samples.
+
+    Yields:
+        RerunProfile: The profile.
+    """
+    result = RerunProfile(name)
+    sampler = Sampler(threading.get_ident(), interval, current_stack())
+    start_tracing()
+    before = tracemalloc.take_snapshot()
+    tracemalloc.reset_peak()
+    current.profile = result
+    sampler.start()
+    started = time.perf_counter()
+    try:
+        yield result
+    finally:
+        result.seconds = time.perf_counter() - started
+        sampler.stop()
+        current.profile = None
+        result.stacks = sampler.stacks
+        result.peak = tracemalloc.get_traced_memory()[1]
+        result.allocations = top_allocations(before, tracemalloc.take_snapshot())
+        stop_tracing()
+
+@contextmanager
+def section(name):
+    """
+    Times a part of a profiled rerun, such as one tab. Does nothing when the rerun isn't profiled.
+
+    Args:
+        name (str): The section's name.
+
+    Yields:
+        None
+    """
+    result = getattr(current, "profile", None)
+    if result is None:
+        yield
+        return
+    entry = {"Section": name, "Depth": result.depth, "Wall (ms)": 0.0, "Allocated (KB)": 0.0}
+    result.sections.append(entry)
+    result.depth += 1
+    allocated = tracemalloc.get_traced_memory()[0]
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        entry["Wall (ms)"] = round((time.perf_counter() - started) * 1000, 1)
+        entry["Allocated (KB)"] = round((tracemalloc.get_traced_memory()[0] - allocated) / 1024, 1)
+        result.depth -= 1
+
+def top_functions(result, limit=30):
+    """
+    Ranks the functions a profile's samples were spent in.
+
+    Args:
+        result (RerunProfile): The profile.
+        limit (int): How many functions to list.
+
+    Returns:
+        list: Dicts with the "Function", its estimated "Total (ms)" including callees and "Self (ms)",
+            most total time first.
+    """
+    total = result.samples
+    if not total:
+        return []
+    self_counts = Counter()
+    total_counts = Counter()
+    for stack, count in result.stacks.items():
+        self_counts[stack[-1]] += count
+        for name in set(stack):
+            total_counts[name] += count
+    scale = result.seconds * 1000 / total
+    return [{
+        "Function": name,
+        "Total (ms)": round(count * scale, 1),
+        "Self (ms)": round(self_counts[name] * scale, 1),
+    } for name, count in total_counts.most_common(limit)]
+
+def folded(stacks):
+    """
+    Formats sampled stacks in the folded format read by flamegraph.pl, speedscope and inferno.
+
+    Args:
+        stacks (Counter): The sampled stacks, see `Sampler`.
+
+    Returns:
+        str: One "outer;...;inner count" line per stack.
+    """
+    return "\n".join(
+        f"{';'.join(name.replace(';', ':') for name in stack)} {count}"
+        for stack, count in sorted(stacks.items())
+    ) + "\n"
+
+def flame_svg(stacks, title="Flame Graph", width=1200, row_height=16):
+    """
+    Draws sampled stacks as a self-contained flame graph.
+
+    Args:
+        stacks (Counter): The sampled stacks, see `Sampler`.
+        title (str): The heading drawn above the graph.
+        width (int): The image width in pixels.
+        row_height (int): The height of one stack frame in pixels.
+
+    Returns:
+        str: The SVG document. Hovering a frame shows its name and share of the samples.
+    """
+    tree = {"children": {}, "count": 0}
+    for stack, count in stacks.items():
+        tree["count"] += count
+        node = tree
+        for name in stack:
+            node = node["children"].setdefault(name, {"children": {}, "count": 0})
+            node["count"] += count
+
+    def depth(node):
+        return 1 + max((depth(child) for child in node["children"].values()), default=0)
+
+    total = max(tree["count"], 1)
+    rows = depth(tree) - 1
+    top = 2 * row_height
+    height = top + rows * row_height + row_height
+    scale = width / total
+    rects = []
+
+    def draw(node, x, level):
+        for name, child in node["children"].items():
+            child_width = child["count"] * scale
+            if child_width >= 0.5:
+                y = top + (rows - level - 1) * row_height
+                hue = zlib.crc32(name.split(" (")[0].encode()) % 55
+                label = html.escape(name)
+                rects.append(
+                    f'<g><title>{label} ({child["count"]} samples, {child["count"] * 100 / total:.1f}%)</title>'
+                    f'<rect x="{x:.1f}" y="{y}" width="{child_width:.1f}" height="{row_height - 1}" '
+                    f'fill="hsl({hue},85%,60%)" rx="2"/>'
+                )
+                characters = int((child_width - 6) / 7)
+                if characters >= 3:
+                    text = name if len(name) <= characters else name[:characters - 1] + "…"
+                    rects.append(f'<text x="{x + 3:.1f}" y="{y + row_height - 4}">{html.escape(text)}</text>')
+                rects.append("</g>")
+                draw(child, x, level + 1)
+            x += child_width
+
+    draw(tree, 0.0, 0)
+    return (
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" '
+        f'viewBox="0 0 {width} {height}" font-family="monospace" font-size="11">'
+        f'<rect width="100%" height="100%" fill="#fdfdf6"/>'
+        f'<text x="{width / 2}" y="{row_height}" text-anchor="middle" font-size="14">{html.escape(title)}</text>'
+        + "".join(rects)
+        + "</svg>"
+    )
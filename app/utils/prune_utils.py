@@ -0,0 +1,157 @@
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+PRUNE_TYPES = ("containers", "pods", "images", "volumes")
+
+# container and pod states `prune()` leaves alone
+ACTIVE_CONTAINER_STATES = {"running", "paused", "stopping", "restarting"}
+ACTIVE_POD_STATES = {"running", "paused", "degraded"}
+
+def is_dangling(entry):
+    """
+    Checks whether a disk usage image entry is untagged.
+
+    Args:
+        entry (dict): One entry of the "Images" list returned by `client.df()`.
+
+    Returns:
+        bool: True if the image has no repository or tag.
+    """
+    return entry.get("Repository") in (None, "", "<none>") or entry.get("Tag") in (None, "", "<none>")
+
+def preview(client, disk_usage, types=PRUNE_TYPES, all_images=False):
+    """
+    Estimates what pruning each resource type would reclaim, without changing anything.
+
+    Sizes come from the cached disk usage report. Image bytes are counted per layer, so layers
+    shared only between pruned images are counted once and layers still used elsewhere are not counted.
+
+    Args:
+        client (PodmanClient): A client object used to connect to the container runtime.
+        disk_usage (dict): The disk usage report returned by `client.df()`.
+        types (iterable): The resource types to preview, a subset of `PRUNE_TYPES`.
+        all_images (bool): Whether image pruning includes unused tagged images, not just dangling ones.
+
+    Returns:
+        dict: A mapping of resource type to the number of "Objects" that would be removed and the "Bytes" reclaimed.
+    """
+    from utils import image_utils
+
+    estimate = {}
+    if "containers" in types:
+        stopped = [
+            entry for entry in disk_usage.get("Containers") or []
+            if str(entry.get("Status", "")).lower() not in ACTIVE_CONTAINER_STATES
+        ]
+        estimate["containers"] = {
+            "Objects": len(stopped),
+            "Bytes": sum(entry.get("RWSize") or entry.get("Size") or 0 for entry in stopped),
+        }
+    if "pods" in types:
+        stopped = [pod for pod in client.pods.list() if str(pod.attrs.get("Status", "")).lower() not in ACTIVE_POD_STATES]
+        estimate["pods"] = {"Objects": len(stopped), "Bytes": 0}
+    if "images" in types:
+        unused = [
+            entry["ImageID"] for entry in disk_usage.get("Images") or []
+            if not entry.get("Containers") and (all_images or is_dangling(entry))
+        ]
+        images = client.images.list(all=True)
+        inspect_attrs = image_utils.get_inspect_attrs(client, [image.id for image in images])
+        layer_index = image_utils.build_layer_index(images, inspect_attrs, disk_usage)
+        known = [image_id for image_id in unused if image_id in layer_index.position]
+        estimate["images"] = {"Objects": len(unused), "Bytes": layer_index.reclaimable_bytes(known)}
+    if "volumes" in types:
+        unused = [entry for entry in disk_usage.get("Volumes") or [] if not entry.get("Links")]
+        estimate["volumes"] = {
+            "Objects": len(unused),
+            "Bytes": sum(entry.get("ReclaimableSize") or entry.get("Size") or 0 for entry in unused),
+        }
+    return estimate
+
+def prune(client, resource_type, all_images=False):
+    """
+    Prunes one resource type and times it.
+
+    Args:
+        client (PodmanClient): A client object used to connect to the container runtime.
+        resource_type (str): One of `PRUNE_TYPES`.
+        all_images (bool): Whether to remove unused tagged images, not just dangling ones.
+
+    Returns:
+        dict: The "Type", number of objects "Deleted", bytes "Reclaimed" as reported by Podman,
+            "Seconds" taken and any "Error".
+    """
+    started = time.perf_counter()
+    try:
+        if resource_type == "images":
+            result = client.images.prune(all=all_images)
+        else:
+            result = getattr(client, resource_type).prune()
+        deleted = next((value for key, value in result.items() if key.endswith("Deleted")), None) or []
+        return {
+            "Type": resource_type,
+            "Deleted": len(deleted),
+            "Reclaimed": result.get("SpaceReclaimed") or 0,
+            "Seconds": time.perf_counter() - started,
+            "Error": "",
+        }
+    except Exception as e:
+        return {"Type": resource_type, "Deleted": 0, "Reclaimed": 0, "Seconds": time.perf_counter() - started, "Error": str(e)}
+
+def prune_all(client, types, all_images=False, progress=None):
+    """
+    Prunes several resource types concurrently.
+
+    Objects only freed by this run, such as images of containers pruned at the same time, are
+    left for the next run, matching the preview.
+
+    Args:
+        client (PodmanClient): A client object used to connect to the container runtime.
+        types (iterable): The resource types to prune, a subset of `PRUNE_TYPES`.
+        all_images (bool): Whether to remove unused tagged images, not just dangling ones.
+        progress (callable): Called with each type's result as soon as that type is pruned.
+
+    Returns:
+        list: One result per type from `prune`, in `PRUNE_TYPES` order.
+    """
+    types = [resource_type for resource_type in PRUNE_TYPES if resource_type in types]
+    if not types:
+        return []
+    results = {}
+    with ThreadPoolExecutor(max_workers=len(types)) as executor:
+        futures = [executor.submit(prune, client, resource_type, all_images) for resource_type in types]
+        for future in as_completed(futures):
+            result = future.result()
+            results[result["Type"]] = result
+            if progress:
+                progress(result)
+    return [results[resource_type] for resource_type in types]
+
+def prune_job(job, client, types, all_images=False):
+    """
+    Prunes several resource types as a background job, logging each type's result.
+
+    Args:
+        job (Job): The job to report progress to, from `job_utils`.
+        client (PodmanClient): The job's client.
+        types (iterable): The resource types to prune, a subset of `PRUNE_TYPES`.
+        all_images (bool): Whether to remove unused tagged images, not just dangling ones.
+
+    Returns:
+        list: One result per type from `prune`, in `PRUNE_TYPES` order.
+    """
+    done = []
+
+    def progress(result):
+        done.append(result)
+        if result["Error"]:
+            job.log(f"{result['Type']}: {result['Error']}")
+        else:
+            job.log(
+                f"{result['Type']}: {result['Deleted']} deleted, "
+                f"{result['Reclaimed'] / 1024 / 1024:.2f} MB reclaimed in {result['Seconds']:.2f}s"
+            )
+        job.set_progress(len(done), len(types), f"Pruned {', '.join(item['Type'] for item in done)}")
+
+    job.set_progress(0, len(types), "Pruning...")
+    return prune_all(client, types, all_images, progress)
@@ -0,0 +1,414 @@
+"""
+Quadlet unit generation from Podman inspect data, in-process instead of running the Podlet image.
+
+Containers and pods are translated from the `podman run` or `podman pod create` command they were
+created with, the way Podlet does, falling back to their inspected configuration when they were
+created through the API. Volumes and networks are translated from their inspected configuration.
+Nothing here touches Streamlit or the Podman socket.
+"""
+import io
+import tarfile
+import time
+
+# `podman run` options without a value, so the parser knows not to consume the next argument
+CONTAINER_FLAGS = {
+    "-d", "--detach", "--rm", "--replace", "-i", "--interactive", "-t", "--tty", "--read-only",
+    "--read-only-tmpfs", "--init", "--privileged", "-P", "--publish-all", "--no-healthcheck",
+    "--no-hosts", "--oom-kill-disable", "-q", "--quiet", "--env-host", "--rootfs", "--sig-proxy",
+    "--tls-verify", "--http-proxy", "--rmi",
+}
+
+# `podman pod create` options without a value
+POD_FLAGS = {"--replace", "--infra", "--no-hosts", "--exit-policy-stop", "--share-parent"}
+
+# options Quadlet adds to the generated `podman run` itself
+DROPPED_OPTIONS = {"-d", "--detach", "--rm", "--replace", "--cidfile", "--sdnotify"}
+
+# `podman run` options and the [Container] keys they map to
+CONTAINER_KEYS = {
+    "--name": "ContainerName",
+    "-e": "Environment", "--env": "Environment",
+    "--env-file": "EnvironmentFile",
+    "-l": "Label", "--label": "Label",
+    "--annotation": "Annotation",
+    "-p": "PublishPort", "--publish": "PublishPort",
+    "--expose": "ExposeHostPort",
+    "-v": "Volume", "--volume": "Volume",
+    "--mount": "Mount",
+    "--tmpfs": "Tmpfs",
+    "--network": "Network", "--net": "Network",
+    "--network-alias": "NetworkAlias",
+    "--ip": "IP", "--ip6": "IP6",
+    "--dns": "DNS", "--dns-search": "DNSSearch", "--dns-option": "DNSOption",
+    "--add-host": "AddHost",
+    "-u": "User", "--user": "User",
+    "--group-add": "GroupAdd",
+    "-w": "WorkingDir", "--workdir": "WorkingDir",
+    "-h": "HostName", "--hostname": "HostName",
+    "--entrypoint": "Entrypoint",
+    "--cap-add": "AddCapability", "--cap-drop": "DropCapability",
+    "--device": "AddDevice",
+    "--secret": "Secret",
+    "--sysctl": "Sysctl",
+    "--ulimit": "Ulimit",
+    "--shm-size": "ShmSize",
+    "--pids-limit": "PidsLimit",
+    "--log-driver": "LogDriver", "--log-opt": "LogOpt",
+    "--userns": "UserNS", "--uidmap": "UIDMap", "--gidmap": "GIDMap",
+    "--tz": "Timezone",
+    "--stop-signal": "StopSignal", "--stop-timeout": "StopTimeout",
+    "--health-cmd": "HealthCmd", "--health-interval": "HealthInterval", "--health-retries": "HealthRetries",
+    "--health-timeout": "HealthTimeout", "--health-start-period": "HealthStartPeriod",
+    "--pull": "Pull",
+    "--read-only": "ReadOnly", "--read-only-tmpfs": "ReadOnlyTmpfs", "--init": "RunInit",
+}
+
+# `podman pod create` options and the [Pod] keys they map to
+POD_KEYS = {
+    "--name": "PodName",
+    "-p": "PublishPort", "--publish": "PublishPort",
+    "-v": "Volume", "--volume": "Volume",
+    "--network": "Network", "--net": "Network",
+    "--network-alias": "NetworkAlias",
+    "--ip": "IP", "--ip6": "IP6",
+    "--dns": "DNS", "--dns-search": "DNSSearch", "--dns-option": "DNSOption",
+    "--add-host": "AddHost",
+    "--userns": "UserNS", "--uidmap": "UIDMap", "--gidmap": "GIDMap",
+    "-l": "Label", "--label": "Label",
+}
+
+# keys Quadlet splits on whitespace, so their values have to be quoted; Exec and PodmanArgs are quoted per argument
+QUOTED_KEYS = {"Environment", "Label", "Annotation", "Options"}
+
+# keys that take a boolean, set by a flag without a value
+BOOLEAN_KEYS = {"ReadOnly", "ReadOnlyTmpfs", "RunInit"}
+
+# `--restart` policies and the [Service] Restart= values they map to
+RESTART_POLICIES = {"always": "always", "unless-stopped": "always", "on-failure": "on-failure"}
+
+# networks Podman attaches containers to unless told otherwise
+DEFAULT_NETWORKS = {"", "default", "bridge", "podman", "slirp4netns", "pasta", "private"}
+
+def quote(value):
+    """
+    Quotes a value the way systemd splits words, if it needs quoting.
+
+    Args:
+        value (str): The value.
+
+    Returns:
+        str: The value, in double quotes if it's empty or contains whitespace, quotes or backslashes.
+    """
+    value = str(value)
+    if value and not any(char in value for char in " \t\"'\\"):
+        return value
+    return '"' + value.replace("\\", "\\\\").replace('"', '\\"') + '"'
+
+def parse_command(command, subcommands, flags):
+    """
+    Splits a `podman` command line into its options and positional arguments.
+
+    Args:
+        command (list): The command line, such as a container's `CreateCommand`.
+        subcommands (tuple): The words that end the global options, e.g. ("run", "create").
+        flags (set): The options that take no value.
+
+    Returns:
+        tuple: The (option, value) pairs, with None as the value of flags, and the positional
+            arguments. None if the command has none of `subcommands`.
+    """
+    args = list(command[1:])
+    for index, arg in enumerate(args):
+        if arg in subcommands:
+            args = args[index + 1:]
+            break
+    else:
+        return None
+
+    options = []
+    index = 0
+    while index < len(args):
+        arg = args[index]
+        if arg == "--":
+            return options, args[index + 1:]
+        if not arg.startswith("-") or arg == "-":
+            return options, args[index:]
+        if arg.startswith("--"):
+            name, separator, value = arg.partition("=")
+            if separator:
+                options.append((name, value))
+            elif name in flags:
+                options.append((name, None))
+            else:
+                index += 1
+                options.append((name, args[index] if index < len(args) else ""))
+        else:
+            # short options can be combined, e.g. -dit, and take their value attached or separately
+            for position in range(1, len(arg)):
+                name = f"-{arg[position]}"
+                if name in flags:
+                    options.append((name, None))
+                    continue
+                value = arg[position + 1:].removeprefix("=")
+                if not value:
+                    index += 1
+                    value = args[index] if index < len(args) else ""
+                options.append((name, value))
+                break
+        index += 1
+    return options, []
+
+def translate_options(options, keys, entries, service):
+    """
+    Adds the unit entries for parsed command-line options.
+
+    Args:
+        options (list): The (option, value) pairs from `parse_command`.
+        keys (dict): The options and the unit keys they map to, e.g. `CONTAINER_KEYS`.
+        entries (list): The unit section's (key, value) pairs, extended in place.
+        service (list): The [Service] section's (key, value) pairs, extended in place.
+
+    Returns:
+        None
+    """
+    for name, value in options:
+        key = keys.get(name)
+        if name in DROPPED_OPTIONS:
+            continue
+        if name == "--restart":
+            policy = RESTART_POLICIES.get((value or "").split(":")[0])
+            if policy:
+                service.append(("Restart", policy))
+            continue
+        if name == "--pod" and value and not value.startswith("new:"):
+            entries.append(("Pod", f"{value}.pod"))
+            continue
+        if key in BOOLEAN_KEYS:
+            if value in (None, "true"):
+                entries.append((key, "true"))
+            continue
+        if key == "Environment" and value is not None and "=" not in value:
+            # variables passed through from the host have no Quadlet key
+            key = None
+        if key and value is not None:
+            entries.append((key, value))
+        else:
+            entries.append(("PodmanArgs", [name] if value is None else [name, value]))
+
+def render(file_name, sections):
+    """
+    Renders a unit file.
+
+    Args:
+        file_name (str): The unit's file name, written as a comment on the first line.
+        sections (list): (section, entries) pairs, where entries are (key, value) pairs. List
+            values are command-line arguments, quoted one by one. Empty sections are left out.
+
+    Returns:
+        str: The unit file's contents.
+    """
+    lines = [f"# {file_name}"]
+    for section, entries in sections:
+        if not entries:
+            continue
+        lines.append("")
+        lines.append(f"[{section}]")
+        for key, value in entries:
+            if isinstance(value, list):
+                value = " ".join(quote(arg) for arg in value)
+            elif key in QUOTED_KEYS:
+                value = quote(value)
+            lines.append(f"{key}={str(value).replace('%', '%%')}")
+    return "\n".join(lines) + "\n"
+
+def install_section(install):
+    return [("WantedBy", "default.target")] if install else []
+
+def port_entries(port_bindings):
+    """
+    Args:
+        port_bindings (dict): "80/tcp" keys and lists of {"HostIp", "HostPort"} bindings.
+
+    Returns:
+        list: ("PublishPort", value) pairs.
+    """
+    entries = []
+    for container_port, bindings in (port_bindings or {}).items():
+        port, _, protocol = container_port.partition("/")
+        suffix = f"/{protocol}" if protocol and protocol != "tcp" else ""
+        for binding in bindings or []:
+            host = f"{binding['HostIp']}:" if binding.get("HostIp") else ""
+            entries.append(("PublishPort", f"{host}{binding.get('HostPort') or ''}:{port}{suffix}"))
+    return entries
+
+def container_unit(attrs, install=False):
+    """
+    Builds a container's `.container` unit.
+
+    Args:
+        attrs (dict): The container's inspect payload.
+        install (bool): Whether to add an [Install] section that starts the container at boot.
+
+    Returns:
+        tuple: The unit's file name and contents.
+    """
+    name = attrs.get("Name", "").lstrip("/") or attrs["Id"][:12]
+    entries = []
+    service = []
+    parsed = parse_command(
+        (attrs.get("Config") or {}).get("CreateCommand") or [], ("run", "create"), CONTAINER_FLAGS
+    )
+    if parsed and parsed[1]:
+        options, positionals = parsed
+        entries.append(("Image", positionals[0]))
+        translate_options(options, CONTAINER_KEYS, entries, service)
+        if not any(key == "ContainerName" for key, _ in entries):
+            entries.append(("ContainerName", name))
+        if positionals[1:]:
+            entries.append(("Exec", positionals[1:]))
+    else:
+        # created through the API: only what can't have come from the image is kept
+        host_config = attrs.get("HostConfig") or {}
+        entries.append(("Image", attrs.get("ImageName") or (attrs.get("Config") or {}).get("Image") or attrs.get("Image")))
+        entries.append(("ContainerName", name))
+        entries.extend(port_entries(host_config.get("PortBindings")))
+        for mount in attrs.get("Mounts") or []:
+            source = mount.get("Name") if mount.get("Type") == "volume" else mount.get("Source")
+            read_only = "" if mount.get("RW", True) else ":ro"
+            entries.append(("Volume", f"{source}:{mount.get('Destination')}{read_only}"))
+        network_mode = host_config.get("NetworkMode") or ""
+        if network_mode in ("host", "none") or ":" in network_mode:
+            entries.append(("Network", network_mode))
+        else:
+            for network in ((attrs.get("NetworkSettings") or {}).get("Networks") or {}):
+                if network not in DEFAULT_NETWORKS:
+                    entries.append(("Network", network))
+        policy = RESTART_POLICIES.get((host_config.get("RestartPolicy") or {}).get("Name"))
+        if policy:
+            service.append(("Restart", policy))
+    file_name = f"{name}.container"
+    return file_name, render(file_name, [("Container", entries), ("Service", service), ("Install", install_section(install))])
+
+def pod_unit(attrs, install=False):
+    """
+    Builds a pod's `.pod` unit.
+
+    Args:
+        attrs (dict): The pod's inspect payload.
+        install (bool): Whether to add an [Install] section that starts the pod at boot.
+
+    Returns:
+        tuple: The unit's file name and contents.
+    """
+    name = attrs.get("Name") or attrs["Id"][:12]
+    entries = []
+    service = []
+    parsed = parse_command(attrs.get("CreateCommand") or [], ("create",), POD_FLAGS)
+    if parsed:
+        translate_options(parsed[0], POD_KEYS, entries, service)
+        if not any(key == "PodName" for key, _ in entries):
+            entries.insert(0, ("PodName", name))
+    else:
+        infra = attrs.get("InfraConfig") or {}
+        entries.append(("PodName", name))
+        entries.extend(port_entries(infra.get("PortBindings")))
+        if infra.get("HostNetwork"):
+            entries.append(("Network", "host"))
+        for network in infra.get("Networks") or []:
+            if network not in DEFAULT_NETWORKS:
+                entries.append(("Network", network))
+    file_name = f"{name}.pod"
+    return file_name, render(file_name, [("Pod", entries), ("Service", service), ("Install", install_section(install))])
+
+def volume_unit(attrs, install=False):
+    """
+    Builds a volume's `.volume` unit.
+
+    Args:
+        attrs (dict): The volume's inspect payload.
+        install (bool): Unused; volumes are created on demand by the units that use them.
+
+    Returns:
+        tuple: The unit's file name and contents.
+    """
+    name = attrs["Name"]
+    entries = [("VolumeName", name)]
+    if attrs.get("Driver") not in (None, "", "local"):
+        entries.append(("Driver", attrs["Driver"]))
+    options = dict(attrs.get("Options") or {})
+    for option, key in (("type", "Type"), ("device", "Device"), ("o", "Options")):
+        if options.get(option):
+            entries.append((key, options.pop(option)))
+    for key, value in sorted((attrs.get("Labels") or {}).items()):
+        entries.append(("Label", f"{key}={value}"))
+    for key, value in sorted(options.items()):
+        entries.append(("PodmanArgs", ["--opt", f"{key}={value}"]))
+    file_name = f"{name}.volume"
+    return file_name, render(file_name, [("Volume", entries)])
+
+def network_unit(attrs, install=False):
+    """
+    Builds a network's `.network` unit.
+
+    Args:
+        attrs (dict): The network's inspect payload.
+        install (bool): Unused; networks are created on demand by the units that use them.
+
+    Returns:
+        tuple: The unit's file name and contents.
+    """
+    name = attrs["name"]
+    entries = [("NetworkName", name)]
+    if attrs.get("driver") not in (None, "", "bridge"):
+        entries.append(("Driver", attrs["driver"]))
+    for subnet in attrs.get("subnets") or []:
+        entries.append(("Subnet", subnet["subnet"]))
+        if subnet.get("gateway"):
+            entries.append(("Gateway", subnet["gateway"]))
+        lease_range = subnet.get("lease_range") or {}
+        if lease_range.get("start_ip") and lease_range.get("end_ip"):
+            entries.append(("IPRange", f"{lease_range['start_ip']}-{lease_range['end_ip']}"))
+    if attrs.get("internal"):
+        entries.append(("Internal", "true"))
+    if attrs.get("ipv6_enabled"):
+        entries.append(("IPv6", "true"))
+    if attrs.get("driver", "bridge") == "bridge" and attrs.get("dns_enabled") is False:
+        entries.append(("DisableDNS", "true"))
+    ipam_driver = (attrs.get("ipam_options") or {}).get("driver")
+    if ipam_driver not in (None, "", "host-local"):
+        entries.append(("IPAMDriver", ipam_driver))
+    for key, value in sorted((attrs.get("labels") or {}).items()):
+        entries.append(("Label", f"{key}={value}"))
+    for key, value in sorted((attrs.get("options") or {}).items()):
+        entries.append(("Options", f"{key}={value}"))
+    file_name = f"{name}.network"
+    return file_name, render(file_name, [("Network", entries)])
+
+# the unit builder for each kind of resource
+UNIT_BUILDERS = {
+    "containers": container_unit,
+    "pods": pod_unit,
+    "volumes": volume_unit,
+    "networks": network_unit,
+}
+
+def bundle(units):
+    """
+    Packs units into a gzipped tarball, ready to extract into `~/.config/containers/systemd`.
+
+    Args:
+        units (list): (file name, contents) pairs.
+
+    Returns:
+        bytes: The tarball.
+    """
+    buffer = io.BytesIO()
+    with tarfile.open(fileobj=buffer, mode="w:gz") as archive:
+        for file_name, text in units:
+            data = text.encode()
+            info = tarfile.TarInfo(file_name)
+            info.size = len(data)
+            info.mtime = int(time.time())
+            info.mode = 0o644
+            archive.addfile(info, io.BytesIO(data))
+    return buffer.getvalue()
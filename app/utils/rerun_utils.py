@@ -0,0 +1,24 @@
+import streamlit as st
+from streamlit.errors import StreamlitAPIException
+
+def rerun_fragment(*reset_keys):
+    """
+    Reruns only the fragment that is currently running, such as a single tab.
+
+    Fragment-scoped reruns are only allowed while the fragment itself is being rerun, for example
+    after a widget inside it changed. During a full run of the page this falls back to rerunning
+    the whole app.
+
+    Args:
+        *reset_keys (str): Widget keys to reset before rerunning, such as the action selectbox
+            that triggered the rerun, so the action doesn't run again on the next rerun.
+
+    Returns:
+        None
+    """
+    for key in reset_keys:
+        st.session_state.pop(key, None)
+    try:
+        st.rerun(scope="fragment")
+    except StreamlitAPIException:
+        st.rerun()
@@ -0,0 +1,169 @@
+import os
+import threading
+import time
+import streamlit as st
+
+class SamplingScheduler:
+    """
+    Process-wide scheduler that paces stats sampling across every viewer.
+
+    Each view asks for a sampling interval. Views nobody has interacted with for a while back
+    off exponentially, and every sample reserves a slot from one shared samples-per-second
+    budget, so the load on the Podman API stays bounded however many views are open.
+    """
+
+    def __init__(self, samples_per_second=20.0, idle_after=60.0, max_interval=30.0):
+        """
+        Args:
+            samples_per_second (float): The global budget of samples per second across all views.
+            idle_after (float): Seconds without interaction after which a view starts backing off.
+            max_interval (float): The longest interval a backed-off view is slowed down to.
+        """
+        self.samples_per_second = samples_per_second
+        self.idle_after = idle_after
+        self.max_interval = max_interval
+        self.lock = threading.Lock()
+        self.views = {}
+        self.next_slot = 0.0
+
+    def touch(self, view_id, interval, active=True):
+        """
+        Registers a view and updates its interval, optionally recording user activity on it.
+
+        Args:
+            view_id (str): Identifies the view, e.g. the session and container being watched.
+            interval (float): The sampling interval the view asked for, in seconds.
+            active (bool): Whether the user just interacted with the view, which resets any backoff.
+
+        Returns:
+            None
+        """
+        now = time.monotonic()
+        with self.lock:
+            view = self.views.setdefault(view_id, {"last_sample": 0.0, "last_active": now})
+            view["interval"] = interval
+            if active:
+                view["last_active"] = now
+
+    def effective_interval(self, view_id):
+        """
+        Returns the interval a view is currently sampled at, including idle backoff.
+
+        Args:
+            view_id (str): The view to check.
+
+        Returns:
+            float: The interval in seconds, or None if the view isn't registered, e.g. because its
+                collector just stopped.
+        """
+        with self.lock:
+            view = self.views.get(view_id)
+            return self.view_interval(view, time.monotonic()) if view else None
+
+    def view_interval(self, view, now):
+        """
+        Computes a view's interval at a point in time, applying idle backoff.
+
+        Args:
+            view (dict): The view's registration.
+            now (float): The current monotonic time.
+
+        Returns:
+            float: The interval in seconds.
+        """
+        idle = now - view["last_active"]
+        if idle <= self.idle_after:
+            return view["interval"]
+        # double the interval for every further idle_after period without interaction
+        backoff = 2 ** int(idle // self.idle_after)
+        return min(view["interval"] * backoff, max(self.max_interval, view["interval"]))
+
+    def reserve(self, view_id):
+        """
+        Reserves the next sampling slot for a view.
+
+        Args:
+            view_id (str): The view that wants to sample. Registered with `touch`.
+
+        Returns:
+            float: How many seconds to wait before taking the sample, or None if the view isn't
+                registered, e.g. because it expired.
+        """
+        now = time.monotonic()
+        with self.lock:
+            self.expire(now, keep=view_id)
+            view = self.views.get(view_id)
+            if view is None:
+                return None
+            due = max(now, view["last_sample"] + self.view_interval(view, now))
+            slot = max(due, self.next_slot)
+            self.next_slot = slot + 1.0 / self.samples_per_second
+            view["last_sample"] = slot
+            return slot - now
+
+    def release(self, view_id):
+        """
+        Unregisters a view, e.g. when its session leaves the page.
+
+        Args:
+            view_id (str): The view to remove.
+
+        Returns:
+            None
+        """
+        with self.lock:
+            self.views.pop(view_id, None)
+
+    def expire(self, now, keep=None):
+        """
+        Drops views whose session went away without releasing them.
+
+        Args:
+            now (float): The current monotonic time.
+            keep (str): A view to keep regardless, such as the one currently reserving a slot.
+
+        Returns:
+            None
+        """
+        stale = [
+            view_id for view_id, view in self.views.items()
+            if view_id != keep and view["last_sample"]
+            and now - view["last_sample"] > 2 * max(self.max_interval, view["interval"])
+        ]
+        for view_id in stale:
+            del self.views[view_id]
+
+    def active_views(self):
+        """
+        Returns the number of registered views.
+
+        Returns:
+            int: The number of views currently sampling.
+        """
+        with self.lock:
+            return len(self.views)
+
+def create_scheduler():
+    """
+    Creates a scheduler configured from the environment.
+
+    `PODMAN_STREAMLIT_SAMPLES_PER_SECOND` sets the global budget (default 20) and
+    `PODMAN_STREAMLIT_IDLE_SECONDS` how long a view may go without interaction before backing off (default 60).
+
+    Returns:
+        SamplingScheduler: A new scheduler.
+    """
+    return SamplingScheduler(
+        samples_per_second=float(os.environ.get("PODMAN_STREAMLIT_SAMPLES_PER_SECOND", 20)),
+        idle_after=float(os.environ.get("PODMAN_STREAMLIT_IDLE_SECONDS", 60)),
+    )
+
+@st.cache_resource(show_spinner=False)
+def get_scheduler():
+    """
+    Returns the scheduler shared by every session in this process.
+
+    Returns:
+        SamplingScheduler: The process-wide scheduler.
+    """
+    return create_scheduler()
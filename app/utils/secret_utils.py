@@ -1,4 +1,34 @@
 import streamlit as st
+from utils import prefetch_utils
+
+@st.cache_resource(show_spinner=False, ttl=30)
+def cached_secret_index(_client, uri):
+    """
+    Retrieves the secrets metadata for a Podman connection and caches it as a name index.
+
+    Only secret names and IDs are cached, never secret data. Entries expire after 30 seconds, so
+    secrets created or removed outside the app show up without a refresh.
+
+    Args:
+        _client (PodmanClient): The client object used to access the secrets. Excluded from the cache key.
+        uri (str): The connection URI, used as the cache key.
+
+    Returns:
+        dict: A mapping of secret name to secret ID.
+    """
+    return {secret.name: secret.id for secret in list_secrets(_client)}
+
+def get_secret_index(client):
+    """
+    Retrieves the cached secret name index for the currently selected connection.
+
+    Args:
+        client (PodmanClient): The client object used to access the secrets.
+
+    Returns:
+        dict: A mapping of secret name to secret ID.
+    """
+    return cached_secret_index(client, st.session_state.get("selected_uri"))
 
 def get_cached_secrets(client):
     """
@@ -10,13 +40,24 @@ def get_cached_secrets(client):
     Returns:
         A list of dictionaries containing the name and ID of each secret.
     """
-    secrets_list = list_secrets(client)
-    return [{"Name": secret.name, "ID": secret.id} for secret in secrets_list]
+    return [{"Name": name, "ID": secret_id} for name, secret_id in get_secret_index(client).items()]
+
+def invalidate_cached_secrets(uri=None):
+    """
+    Clears one connection's cached secrets metadata without touching any other cached data.
+
+    Args:
+        uri (str): The connection URI, the currently selected one by default.
+
+    Returns:
+        None
+    """
+    # the client isn't part of the cache key, so only the URI picks the entry to drop
+    cached_secret_index.clear(None, uri or st.session_state.get("selected_uri"))
 
-@st.cache_data
 def refresh_cached_secrets(client):
     """
-    Refreshes the cached secrets by clearing the cache and retrieving a new list of secrets from the client.
+    Refreshes the cached secrets by invalidating the secrets cache and retrieving a new list of secrets from the client.
 
     Args:
         client (PodmanClient): The client object used to access the secrets.
@@ -24,7 +65,7 @@ def refresh_cached_secrets(client):
     Returns:
         A list of dictionaries containing the name and ID of each secret.
     """
-    st.cache_data.clear()
+    invalidate_cached_secrets()
     return get_cached_secrets(client)
 
 def list_secrets(client):
@@ -37,7 +78,7 @@ def list_secrets(client):
     Returns:
         A list of secrets.
     """
-    return client.secrets.list()
+    return prefetch_utils.listing(client, "secrets")
 
 def create_secret(client, secret_name, data):
     """
@@ -51,6 +92,7 @@ def create_secret(client, secret_name, data):
         The newly created secret object.
     """
     secret = client.secrets.create(name=secret_name, data=data)
+    invalidate_cached_secrets()
     return secret
 
 def delete_secret(client, secret_id):
@@ -71,6 +113,8 @@ def delete_secret(client, secret_id):
         print("Secret deleted successfully.")
     except Exception as e:
         print(str(e))
+    finally:
+        invalidate_cached_secrets()
 
 def secret_exists(client, secret_name):
     """
@@ -83,5 +127,4 @@ def secret_exists(client, secret_name):
     Returns:
         bool: True if a secret with the given name exists, False otherwise.
     """
-    secrets = get_cached_secrets(client)
-    return any(secret["Name"] == secret_name for secret in secrets)
\ No newline at end of file
+    return secret_name in get_secret_index(client)
\ No newline at end of file
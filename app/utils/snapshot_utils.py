@@ -0,0 +1,56 @@
+import hashlib
+
+def fingerprint(values):
+    """
+    Computes a stable fingerprint for a sequence of values.
+
+    Args:
+        values (iterable): The values to fingerprint, such as IDs, states and timestamps.
+
+    Returns:
+        str: A hex digest that changes whenever any value or their order changes.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    for value in values:
+        digest.update(repr(value).encode())
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+def patch_frame(previous, rows, changed_keys, key="ID"):
+    """
+    Builds a DataFrame for the given rows, reusing an earlier one where possible.
+
+    Rows are indexed by their stable `key`, so removed rows are dropped, new rows are added
+    and only the rows in `changed_keys` are rewritten; everything else is kept as is.
+
+    Args:
+        previous (DataFrame): The previously built DataFrame, or None.
+        rows (list): Dictionaries describing the current rows, in display order.
+        changed_keys (iterable): Keys of rows that are new or changed since `previous` was built.
+        key (str): The column holding each row's stable identifier.
+
+    Returns:
+        DataFrame: The DataFrame for `rows`, indexed by `key`.
+    """
+    import pandas as pd
+
+    keys = [row[key] for row in rows]
+    if previous is None or previous.empty or not rows:
+        return pd.DataFrame(rows, index=keys)
+
+    changed_keys = set(changed_keys)
+    changed = [row for row in rows if row[key] in changed_keys]
+    if len(changed) == len(rows):
+        return pd.DataFrame(rows, index=keys)
+
+    frame = previous.reindex(keys)
+    if changed:
+        patch = pd.DataFrame(changed, index=[row[key] for row in changed])
+        for column in patch.columns:
+            if column not in frame.columns:
+                frame[column] = None
+            frame[column] = frame[column].astype(object)
+            for row_key, value in patch[column].items():
+                frame.at[row_key, column] = value
+            frame[column] = frame[column].infer_objects()
+    return frame
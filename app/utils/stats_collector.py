@@ -0,0 +1,350 @@
+import threading
+import time
+import uuid
+from collections import deque
+from datetime import datetime, timedelta
+import streamlit as st
+from utils import sampling, stats_utils
+
+class StatsCollector:
+    """
+    Samples one container's stats on a background thread into a buffer shared by all of its viewers.
+
+    The collector samples at the shortest interval any subscribed viewer asked for and keeps
+    the longest retention any of them asked for, so API calls and memory depend on the number
+    of watched containers rather than on the number of people watching them.
+    """
+
+    def __init__(self, uri, container_id, scheduler, registry=None, identity="~/.ssh/id_ed25519"):
+        """
+        Args:
+            uri (str): The Podman service URI.
+            container_id (str): The container to sample.
+            scheduler (SamplingScheduler): Paces this collector against every other one.
+            registry (StatsCollectorRegistry): The registry holding the collector, which stops it
+                once its viewers stop polling.
+            identity (str): The SSH identity used for SSH connections.
+        """
+        self.uri = uri
+        self.container_id = container_id
+        self.scheduler = scheduler
+        self.registry = registry
+        self.identity = identity
+        self.key = f"{uri}#{container_id}"
+        # the scheduler view is this instance's own, so a stopping collector can't release the
+        # view of the one that replaced it
+        self.view_id = f"{self.key}#{uuid.uuid4().hex}"
+        self.lock = threading.Lock()
+        self.samples = deque()
+        self.viewers = {}
+        self.interval = None
+        self.error = None
+        self.next_sample = time.monotonic()
+        self.stop_event = threading.Event()
+        self.thread = threading.Thread(target=self.run, name=f"stats-{container_id[:12]}", daemon=True)
+
+    def subscribe(self, view_id, interval, retention, active=True):
+        """
+        Adds a viewer, or refreshes an existing one's options and heartbeat. Viewers call this on
+        every poll, so the heartbeat is the time of their last poll.
+
+        Args:
+            view_id (str): Identifies the viewer's session.
+            interval (float): The sampling interval the viewer asked for, in seconds.
+            retention (float): How many seconds of history the viewer shows.
+            active (bool): Whether the viewer just interacted with the page, which resets any idle backoff.
+
+        Returns:
+            None
+        """
+        with self.lock:
+            self.viewers[view_id] = {"interval": interval, "retention": retention, "last_seen": time.monotonic()}
+            self.interval = interval = min(viewer["interval"] for viewer in self.viewers.values())
+        self.scheduler.touch(self.view_id, interval, active=active)
+
+    def unsubscribe(self, view_id):
+        """
+        Removes a viewer.
+
+        Args:
+            view_id (str): The viewer to remove.
+
+        Returns:
+            int: The number of viewers left.
+        """
+        with self.lock:
+            self.viewers.pop(view_id, None)
+            return len(self.viewers)
+
+    def expire_viewers(self, timeout):
+        """
+        Drops viewers whose session went away without unsubscribing.
+
+        Args:
+            timeout (float): Seconds since the last heartbeat after which a viewer is dropped.
+
+        Returns:
+            int: The number of viewers left.
+        """
+        now = time.monotonic()
+        with self.lock:
+            for view_id in [view_id for view_id, viewer in self.viewers.items() if now - viewer["last_seen"] > timeout]:
+                del self.viewers[view_id]
+            return len(self.viewers)
+
+    def viewer_count(self):
+        """
+        Returns the number of subscribed viewers.
+
+        Returns:
+            int: The number of viewers.
+        """
+        with self.lock:
+            return len(self.viewers)
+
+    def window(self, seconds):
+        """
+        Returns the buffered samples from the last `seconds` seconds.
+
+        Args:
+            seconds (float): The length of the window.
+
+        Returns:
+            list: Records produced by `stats_utils.sample_record`, oldest first.
+        """
+        window_start = datetime.now() - timedelta(seconds=seconds)
+        with self.lock:
+            return [sample for sample in self.samples if sample["timestamp"] >= window_start]
+
+    def trim(self, now):
+        """
+        Drops samples older than the longest retention of any viewer. Must be called with the lock held.
+
+        Args:
+            now (datetime): The current time.
+
+        Returns:
+            None
+        """
+        retention = max((viewer["retention"] for viewer in self.viewers.values()), default=0)
+        window_start = now - timedelta(seconds=retention)
+        while self.samples and self.samples[0]["timestamp"] < window_start:
+            self.samples.popleft()
+
+    def run(self):
+        """
+        Samples the container until the collector is stopped.
+
+        Connecting is retried with a doubling delay, capped at the scheduler's longest interval,
+        so a collector outlives the Podman service restarting or the container being recreated.
+
+        Returns:
+            None
+        """
+        from podman import PodmanClient
+
+        retry = 1
+        try:
+            while not self.stop_event.is_set() and not self.abandoned():
+                try:
+                    with PodmanClient(base_url=self.uri, identity=self.identity) as client:
+                        container = client.containers.get(self.container_id)
+                        retry = 1
+                        self.sample(container)
+                except Exception as e:
+                    self.error = str(e)
+                    if self.stop_event.wait(retry):
+                        break
+                    retry = min(retry * 2, self.scheduler.max_interval)
+        finally:
+            self.scheduler.release(self.view_id)
+
+    def abandoned(self):
+        """
+        Stops the collector if every viewer stopped polling, e.g. because its session closed.
+
+        Returns:
+            bool: Whether the collector was stopped.
+        """
+        return self.registry is not None and self.registry.expire_collector(self)
+
+    def sample(self, container):
+        """
+        Samples a container at the pace the scheduler sets until the collector is stopped.
+
+        Args:
+            container (Container): The container to sample.
+
+        Returns:
+            None
+        """
+        while not self.stop_event.is_set() and not self.abandoned():
+            delay = self.scheduler.reserve(self.view_id)
+            if delay is None:
+                # the scheduler expired the view while a stats call hung, so it's registered again
+                self.scheduler.touch(self.view_id, self.interval, active=False)
+                continue
+            self.next_sample = time.monotonic() + delay
+            if self.stop_event.wait(delay):
+                break
+            try:
+                stats = container.stats(stream=False, decode=True)["Stats"][0]
+            except Exception as e:
+                self.error = str(e)
+                continue
+            now = datetime.now()
+            with self.lock:
+                self.samples.append(stats_utils.sample_record(stats, now))
+                self.trim(now)
+            self.error = None
+
+    def start(self):
+        """
+        Starts sampling on the background thread.
+
+        Returns:
+            None
+        """
+        self.thread.start()
+
+    def stop(self):
+        """
+        Stops sampling. The background thread exits at its next wake-up.
+
+        Returns:
+            None
+        """
+        self.stop_event.set()
+
+class StatsCollectorRegistry:
+    """
+    Process-wide registry holding one reference-counted collector per watched container.
+    """
+
+    def __init__(self, scheduler, viewer_timeout=None):
+        """
+        Args:
+            scheduler (SamplingScheduler): The scheduler pacing every collector.
+            viewer_timeout (float): Seconds without a heartbeat after which a viewer is dropped.
+                Defaults to three times the scheduler's longest backoff interval.
+        """
+        self.scheduler = scheduler
+        self.viewer_timeout = viewer_timeout or 3 * scheduler.max_interval
+        self.lock = threading.Lock()
+        self.collectors = {}
+
+    def subscribe(self, uri, container_id, view_id, interval, retention, active=True):
+        """
+        Subscribes a viewer to a container's collector, starting the collector if nobody watched it yet
+        or its thread died.
+
+        A viewer watches one container at a time, so it's unsubscribed from any other collector first.
+
+        Args:
+            uri (str): The Podman service URI.
+            container_id (str): The container to watch.
+            view_id (str): Identifies the viewer's session.
+            interval (float): The sampling interval the viewer asked for, in seconds.
+            retention (float): How many seconds of history the viewer shows.
+            active (bool): Whether the viewer just interacted with the page.
+
+        Returns:
+            StatsCollector: The container's collector.
+        """
+        key = f"{uri}#{container_id}"
+        with self.lock:
+            self.release_locked(view_id, keep=key)
+            self.expire_locked()
+            collector = self.collectors.get(key)
+            created = collector is None or not collector.thread.is_alive()
+            if created:
+                if collector is not None:
+                    collector.stop()
+                collector = self.collectors[key] = StatsCollector(uri, container_id, self.scheduler, self)
+            collector.subscribe(view_id, interval, retention, active=active)
+            if created:
+                collector.start()
+            return collector
+
+    def unsubscribe(self, view_id):
+        """
+        Unsubscribes a viewer from whatever it watches, stopping collectors nobody watches anymore.
+
+        Args:
+            view_id (str): The viewer to remove.
+
+        Returns:
+            None
+        """
+        with self.lock:
+            self.release_locked(view_id)
+
+    def release_locked(self, view_id, keep=None):
+        """
+        Unsubscribes a viewer from every collector but `keep`. Must be called with the lock held.
+
+        Args:
+            view_id (str): The viewer to remove.
+            keep (str): The key of a collector to leave the viewer subscribed to.
+
+        Returns:
+            None
+        """
+        for key, collector in list(self.collectors.items()):
+            # a collector left without viewers is stopped either way
+            if key != keep and not collector.unsubscribe(view_id):
+                collector.stop()
+                del self.collectors[key]
+
+    def expire_locked(self):
+        """
+        Stops collectors whose viewers all went away without unsubscribing. Must be called with the lock held.
+
+        Returns:
+            None
+        """
+        for key, collector in list(self.collectors.items()):
+            if not collector.expire_viewers(self.viewer_timeout):
+                collector.stop()
+                del self.collectors[key]
+
+    def expire_collector(self, collector):
+        """
+        Drops a collector's viewers that stopped polling, and stops and removes it if none are left.
+
+        Called from the collector's own thread, so a collector nobody subscribes to again after its
+        viewers left stops by itself.
+
+        Args:
+            collector (StatsCollector): The collector to check.
+
+        Returns:
+            bool: Whether the collector was stopped.
+        """
+        with self.lock:
+            if collector.expire_viewers(self.viewer_timeout):
+                return False
+            collector.stop()
+            if self.collectors.get(collector.key) is collector:
+                del self.collectors[collector.key]
+            return True
+
+    def summary(self):
+        """
+        Returns how many containers are being sampled and by how many viewers.
+
+        Returns:
+            tuple: The number of collectors and the total number of viewers.
+        """
+        with self.lock:
+            return len(self.collectors), sum(collector.viewer_count() for collector in self.collectors.values())
+
+@st.cache_resource(show_spinner=False)
+def get_registry():
+    """
+    Returns the collector registry shared by every session in this process.
+
+    Returns:
+        StatsCollectorRegistry: The process-wide registry.
+    """
+    return StatsCollectorRegistry(sampling.get_scheduler())
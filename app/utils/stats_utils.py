@@ -0,0 +1,95 @@
+def sample_record(stats, timestamp):
+    """
+    Flattens one Podman stats sample into the raw counters the stats page charts.
+
+    Args:
+        stats (dict): One entry of the "Stats" list returned by `container.stats()`.
+        timestamp (datetime): When the sample was taken.
+
+    Returns:
+        dict: The raw counters, with None for any metric the sample doesn't carry. Network
+            counters are keyed "rx:<interface>" and "tx:<interface>" for every interface.
+    """
+    record = {
+        "timestamp": timestamp,
+        "system_nano": stats.get("SystemNano"),
+        "cpu_nano": stats.get("CPUNano"),
+        "mem_usage": stats.get("MemUsage"),
+        "mem_limit": stats.get("MemLimit"),
+        "pids": stats.get("PIDs"),
+        "block_read": stats.get("BlockInput"),
+        "block_write": stats.get("BlockOutput"),
+    }
+    for interface, counters in (stats.get("Network") or {}).items():
+        record[f"rx:{interface}"] = counters.get("RxBytes")
+        record[f"tx:{interface}"] = counters.get("TxBytes")
+    return record
+
+def counter_rate(frame, column, seconds):
+    """
+    Computes the per-second rate of a monotonically increasing counter.
+
+    Negative deltas mean the counter was reset, for example by a container restart. Those
+    intervals are dropped rather than plotted as a huge negative or positive spike.
+
+    Args:
+        frame (DataFrame): The raw samples.
+        column (str): The counter column.
+        seconds (Series): The elapsed seconds between consecutive samples.
+
+    Returns:
+        Series: The rate in units per second, NaN where it can't be computed.
+    """
+    delta = frame[column].diff()
+    return (delta / seconds).where(delta >= 0)
+
+def compute_rates(samples):
+    """
+    Derives chartable metrics from consecutive raw samples, vectorized over the whole window.
+
+    Args:
+        samples (list): Records produced by `sample_record`, oldest first. Padding records may
+            carry only a timestamp.
+
+    Returns:
+        tuple: A DataFrame with "timestamp", "cpu_percent", "memory_mb", "memory_percent", "pids",
+            "block_read_kbs" and "block_write_kbs" columns, and a long-form DataFrame with
+            "timestamp", "Metric" and "Value" columns holding the KB/s rate of every network
+            interface and direction.
+    """
+    import numpy as np
+    import pandas as pd
+
+    frame = pd.DataFrame(samples)
+    if frame.empty:
+        frame = pd.DataFrame({"timestamp": pd.Series(dtype="datetime64[ns]")})
+    frame["timestamp"] = pd.to_datetime(frame["timestamp"])
+    for column in frame.columns.drop("timestamp"):
+        frame[column] = pd.to_numeric(frame[column], errors="coerce").astype(float)
+    for column in ("system_nano", "cpu_nano", "mem_usage", "mem_limit", "pids", "block_read", "block_write"):
+        if column not in frame:
+            frame[column] = np.nan
+
+    system_delta = frame["system_nano"].diff()
+    seconds = (system_delta / 1e9).where(system_delta > 0)
+    cpu_delta = frame["cpu_nano"].diff()
+
+    metrics = pd.DataFrame({
+        "timestamp": frame["timestamp"],
+        "cpu_percent": (cpu_delta / system_delta * 100.0).where((cpu_delta >= 0) & (system_delta > 0)),
+        "memory_mb": frame["mem_usage"] / (1024 * 1024),
+        "memory_percent": (frame["mem_usage"] / frame["mem_limit"] * 100.0).where(frame["mem_limit"] > 0),
+        "pids": frame["pids"],
+        "block_read_kbs": counter_rate(frame, "block_read", seconds) / 1024,
+        "block_write_kbs": counter_rate(frame, "block_write", seconds) / 1024,
+    }).replace([np.inf, -np.inf], np.nan)
+
+    network_columns = [column for column in frame.columns if column.startswith(("rx:", "tx:"))]
+    network = pd.DataFrame({
+        column: counter_rate(frame, column, seconds) / 1024 for column in network_columns
+    })
+    network["timestamp"] = frame["timestamp"]
+    network = network.melt(id_vars="timestamp", var_name="Metric", value_name="Value")
+    network["Metric"] = network["Metric"].str.replace(r"^(rx|tx):(.*)$", r"\2 \1", regex=True)
+    network = network.replace([np.inf, -np.inf], np.nan)
+    return metrics, network
@@ -0,0 +1,386 @@
+"""
+A local time series of disk usage snapshots, for trends, per-object deltas and forecasts of when
+storage fills up.
+
+Snapshots are kept in SQLite. Each snapshot stores the totals per kind in one row, and an object's
+size is only stored when it changed since the previous snapshot, with a NULL when the object is
+gone, so months of snapshots of a mostly stable host stay small. Trend queries read only the
+totals, and the size of every object at a point in time is one index lookup per object.
+
+Nothing here touches Streamlit, so snapshots can also be recorded from cron with `cli.py usage record`.
+"""
+import os
+import sqlite3
+import threading
+import time
+from contextlib import closing
+
+DEFAULT_PATH = "~/.local/share/podman-streamlit/usage.sqlite3"
+
+# how far past the last snapshot a forecast may predict storage filling up; a nearly flat series
+# would otherwise put it centuries out, past what datetimes and pandas timestamps can hold
+FORECAST_HORIZON = 10 * 365 * 86400
+
+# the kinds of objects whose sizes are tracked, and how each is identified and named in `df()`
+KINDS = {
+    "image": ("Images", lambda entry: entry.get("ImageID"), lambda entry: f"{entry.get('Repository')}:{entry.get('Tag')}"),
+    "container": ("Containers", lambda entry: entry.get("ContainerID"), lambda entry: entry.get("Names")),
+    "volume": ("Volumes", lambda entry: entry.get("VolumeName"), lambda entry: entry.get("VolumeName")),
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS snapshots (
+    id INTEGER PRIMARY KEY,
+    uri TEXT NOT NULL,
+    taken INTEGER NOT NULL,
+    images INTEGER NOT NULL,
+    containers INTEGER NOT NULL,
+    volumes INTEGER NOT NULL,
+    reclaimable INTEGER NOT NULL,
+    used INTEGER,
+    capacity INTEGER
+);
+CREATE INDEX IF NOT EXISTS snapshots_uri_taken ON snapshots (uri, taken);
+CREATE TABLE IF NOT EXISTS objects (
+    id INTEGER PRIMARY KEY,
+    uri TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    key TEXT NOT NULL,
+    name TEXT,
+    last_size INTEGER,
+    UNIQUE (uri, kind, key)
+);
+CREATE TABLE IF NOT EXISTS sizes (
+    object INTEGER NOT NULL,
+    snapshot INTEGER NOT NULL,
+    size INTEGER,
+    PRIMARY KEY (object, snapshot)
+) WITHOUT ROWID;
+"""
+
+def image_total(images):
+    """
+    Estimates the disk space used by images, counting layers shared between images once.
+
+    Args:
+        images (list): The "Images" entries of a `df()` report.
+
+    Returns:
+        int: The unique sizes of all images plus the largest shared size, in bytes.
+    """
+    if not images:
+        return 0
+    if all("UniqueSize" in image for image in images):
+        return sum(image["UniqueSize"] for image in images) + max(image.get("SharedSize", 0) for image in images)
+    return sum(image.get("Size", 0) for image in images)
+
+def storage_capacity(info):
+    """
+    Reads how much of the storage filesystem is used and how big it is from `client.info()`.
+
+    Args:
+        info (dict): The Podman info report, or None.
+
+    Returns:
+        tuple: The used and total bytes, each None if Podman doesn't report it.
+    """
+    store = (info or {}).get("store") or {}
+    return store.get("graphRootUsed"), store.get("graphRootAllocated")
+
+class UsageHistory:
+    """
+    The disk usage time series stored in one SQLite file.
+
+    Every method opens its own connection, so one instance can be shared between threads and
+    processes can record and read the same file at once.
+    """
+
+    def __init__(self, path):
+        """
+        Args:
+            path (str): The SQLite file. Its directory is created if needed.
+        """
+        self.path = os.path.expanduser(path)
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with closing(self.connect()) as connection:
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.executescript(SCHEMA)
+
+    def connect(self):
+        return sqlite3.connect(self.path, timeout=30)
+
+    def record(self, uri, report, info=None, taken=None):
+        """
+        Stores a snapshot, writing only the object sizes that changed since the last one.
+
+        Args:
+            uri (str): The Podman service URI the report is from.
+            report (dict): The `client.df()` report.
+            info (dict): The `client.info()` report, for the filesystem's used and total space.
+            taken (float): When the report was taken, as a Unix timestamp; now by default.
+
+        Returns:
+            int: How many object sizes were written.
+        """
+        used, capacity = storage_capacity(info)
+        taken = int(taken if taken is not None else time.time())
+        totals = {
+            "images": image_total(report.get("Images") or []),
+            "containers": sum(entry.get("Size", 0) for entry in report.get("Containers") or []),
+            "volumes": sum(entry.get("Size", 0) for entry in report.get("Volumes") or []),
+            "reclaimable": sum(entry.get("ReclaimableSize", 0) for entry in report.get("Volumes") or []),
+        }
+        current = {}
+        for kind, (section, key, name) in KINDS.items():
+            for entry in report.get(section) or []:
+                if key(entry):
+                    current[(kind, key(entry))] = (name(entry), entry.get("Size", 0))
+
+        with closing(self.connect()) as connection, connection:
+            snapshot = connection.execute(
+                "INSERT INTO snapshots (uri, taken, images, containers, volumes, reclaimable, used, capacity) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (uri, taken, totals["images"], totals["containers"], totals["volumes"], totals["reclaimable"], used, capacity),
+            ).lastrowid
+            known = {
+                (kind, key): (object_id, last_name, last_size)
+                for object_id, kind, key, last_name, last_size in connection.execute(
+                    "SELECT id, kind, key, name, last_size FROM objects WHERE uri = ?", (uri,)
+                )
+            }
+            changes = []
+            renames = []
+            for (kind, key), (name, size) in current.items():
+                object_id, last_name, last_size = known.get((kind, key), (None, None, None))
+                if object_id is None:
+                    object_id = connection.execute(
+                        "INSERT INTO objects (uri, kind, key, name, last_size) VALUES (?, ?, ?, ?, ?)",
+                        (uri, kind, key, name, size),
+                    ).lastrowid
+                elif last_name != name:
+                    renames.append((name, object_id))
+                if last_size != size:
+                    changes.append((object_id, snapshot, size))
+            # objects that are gone get a NULL size, once
+            changes.extend(
+                (object_id, snapshot, None)
+                for (kind, key), (object_id, last_name, last_size) in known.items()
+                if last_size is not None and (kind, key) not in current
+            )
+            connection.executemany("INSERT INTO sizes (object, snapshot, size) VALUES (?, ?, ?)", changes)
+            connection.executemany(
+                "UPDATE objects SET last_size = ? WHERE id = ?", [(size, object_id) for object_id, _, size in changes]
+            )
+            connection.executemany("UPDATE objects SET name = ? WHERE id = ?", renames)
+        return len(changes)
+
+    def last_taken(self, uri):
+        """
+        Returns when the latest snapshot of a Podman service was taken.
+
+        Args:
+            uri (str): The Podman service URI.
+
+        Returns:
+            int: The Unix timestamp, or None if there are no snapshots.
+        """
+        with closing(self.connect()) as connection:
+            return connection.execute("SELECT MAX(taken) FROM snapshots WHERE uri = ?", (uri,)).fetchone()[0]
+
+    def totals(self, uri, since, until=None, points=500):
+        """
+        Reads the total usage per kind over a time range, averaged into at most `points` buckets.
+
+        Args:
+            uri (str): The Podman service URI.
+            since (float): The start of the range, as a Unix timestamp.
+            until (float): The end of the range; now by default.
+            points (int): The most rows to return.
+
+        Returns:
+            list: Dicts with the bucket's "taken" timestamp and average "images", "containers",
+                "volumes", "reclaimable", "used" and "capacity" bytes, oldest first.
+        """
+        until = int(until if until is not None else time.time())
+        bucket = max(1, (until - int(since)) // max(points, 1))
+        with closing(self.connect()) as connection:
+            rows = connection.execute(
+                "SELECT MAX(taken), AVG(images), AVG(containers), AVG(volumes), AVG(reclaimable), AVG(used), MAX(capacity) "
+                "FROM snapshots WHERE uri = ? AND taken BETWEEN ? AND ? GROUP BY taken / ? ORDER BY 1",
+                (uri, int(since), until, bucket),
+            ).fetchall()
+        columns = ("taken", "images", "containers", "volumes", "reclaimable", "used", "capacity")
+        return [dict(zip(columns, row)) for row in rows]
+
+    def sizes_at(self, uri, when):
+        """
+        Reads the size of every object as of a point in time.
+
+        Args:
+            uri (str): The Podman service URI.
+            when (float): The point in time, as a Unix timestamp.
+
+        Returns:
+            dict: (kind, key) mapped to (name, size in bytes) for the objects present in the
+                latest snapshot taken at or before `when`, or in the first snapshot if `when` is
+                earlier than all of them.
+        """
+        with closing(self.connect()) as connection:
+            snapshot = connection.execute(
+                "SELECT COALESCE((SELECT MAX(id) FROM snapshots WHERE uri = ? AND taken <= ?), "
+                "(SELECT MIN(id) FROM snapshots WHERE uri = ?))",
+                (uri, int(when), uri),
+            ).fetchone()[0]
+            if snapshot is None:
+                return {}
+            rows = connection.execute(
+                "SELECT o.kind, o.key, o.name, s.size FROM objects o JOIN sizes s ON s.object = o.id "
+                "WHERE o.uri = ? AND s.snapshot = "
+                "(SELECT MAX(snapshot) FROM sizes WHERE object = o.id AND snapshot <= ?)",
+                (uri, snapshot),
+            ).fetchall()
+        return {(kind, key): (name, size) for kind, key, name, size in rows if size is not None}
+
+    def deltas(self, uri, since, until=None):
+        """
+        Compares every object's size between two points in time.
+
+        Args:
+            uri (str): The Podman service URI.
+            since (float): The earlier point, as a Unix timestamp.
+            until (float): The later point; now by default.
+
+        Returns:
+            list: Dicts with the object's "Kind", "Name", "Before (MB)", "After (MB)", "Change (MB)"
+                and whether it was "Added" or "Removed" in between, largest change first. Unchanged
+                objects are left out.
+        """
+        before = self.sizes_at(uri, since)
+        after = self.sizes_at(uri, until if until is not None else time.time())
+        rows = []
+        for object_key in before.keys() | after.keys():
+            name, old = before.get(object_key, (None, 0))
+            new_name, new = after.get(object_key, (None, 0))
+            if old == new and object_key in before and object_key in after:
+                continue
+            rows.append({
+                "Kind": object_key[0],
+                "Name": new_name or name,
+                "Before (MB)": round(old / 1024 / 1024, 2),
+                "After (MB)": round(new / 1024 / 1024, 2),
+                "Change (MB)": round((new - old) / 1024 / 1024, 2),
+                "Status": "Added" if object_key not in before else "Removed" if object_key not in after else "Changed",
+            })
+        return sorted(rows, key=lambda row: abs(row["Change (MB)"]), reverse=True)
+
+def linear_forecast(times, values, capacity=None, horizon=FORECAST_HORIZON):
+    """
+    Fits a least-squares line through a usage series and estimates when it reaches the capacity.
+
+    Args:
+        times (list): Unix timestamps.
+        values (list): The bytes used at each timestamp.
+        capacity (float): The bytes available in total, or None.
+        horizon (float): How many seconds past the last timestamp to look for the capacity.
+
+    Returns:
+        dict: The "slope" in bytes per second, the "intercept" at Unix time 0, and "full_at",
+            the Unix timestamp when the line reaches `capacity`, or None if it won't within
+            `horizon`. None if there are fewer than two distinct timestamps.
+    """
+    points = [(t, v) for t, v in zip(times, values) if t is not None and v is not None]
+    if len({t for t, _ in points}) < 2:
+        return None
+    mean_t = sum(t for t, _ in points) / len(points)
+    mean_v = sum(v for _, v in points) / len(points)
+    slope = sum((t - mean_t) * (v - mean_v) for t, v in points) / sum((t - mean_t) ** 2 for t, _ in points)
+    intercept = mean_v - slope * mean_t
+    full_at = None
+    if capacity and slope > 0:
+        last = max(t for t, _ in points)
+        full_at = max((capacity - intercept) / slope, last)
+        if full_at > last + horizon:
+            full_at = None
+    return {"slope": slope, "intercept": intercept, "full_at": full_at}
+
+def open_history():
+    """
+    Opens the history file configured by `PODMAN_STREAMLIT_USAGE_DB`.
+
+    Returns:
+        UsageHistory: The history.
+    """
+    return UsageHistory(os.environ.get("PODMAN_STREAMLIT_USAGE_DB", DEFAULT_PATH))
+
+def take_snapshot(history, client, uri):
+    """
+    Records the current disk usage of a Podman service.
+
+    Args:
+        history (UsageHistory): Where to record it.
+        client (PodmanClient): A client connected to the service.
+        uri (str): The service URI the snapshot is stored under.
+
+    Returns:
+        int: How many object sizes were written.
+    """
+    try:
+        info = client.info()
+    except Exception:
+        # the filesystem totals are optional; forecasts then fall back to the df() totals
+        info = None
+    return history.record(uri, client.df(), info)
+
+class Recorder:
+    """
+    Records a snapshot of one Podman service at a fixed interval on a background thread.
+
+    A snapshot is taken at start only if the latest one is older than the interval, so restarting
+    the app doesn't add snapshots.
+    """
+
+    def __init__(self, history, uri, interval, identity="~/.ssh/id_ed25519"):
+        self.history = history
+        self.uri = uri
+        self.interval = interval
+        self.identity = identity
+        self.error = None
+        self.stop_event = threading.Event()
+        self.thread = threading.Thread(target=self.run, name="usage-recorder", daemon=True)
+
+    def run(self):
+        from podman import PodmanClient
+
+        last = self.history.last_taken(self.uri) or 0
+        delay = max(0, last + self.interval - time.time())
+        while not self.stop_event.wait(delay):
+            try:
+                with PodmanClient(base_url=self.uri, identity=self.identity) as client:
+                    take_snapshot(self.history, client, self.uri)
+                self.error = None
+            except Exception as e:
+                self.error = str(e)
+            delay = self.interval
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.stop_event.set()
+
+def start_recorder(uri):
+    """
+    Starts recording snapshots next to the Streamlit app, every `PODMAN_STREAMLIT_USAGE_INTERVAL`
+    seconds (default 900). An interval of 0 turns recording off.
+
+    Args:
+        uri (str): The Podman service URI to record.
+
+    Returns:
+        Recorder: The running recorder, or None if recording is off.
+    """
+    interval = float(os.environ.get("PODMAN_STREAMLIT_USAGE_INTERVAL", 900))
+    if interval <= 0:
+        return None
+    return Recorder(open_history(), uri, interval).start()
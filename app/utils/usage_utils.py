@@ -0,0 +1,40 @@
+import streamlit as st
+from utils import prefetch_utils
+
+@st.cache_data(ttl=30, show_spinner=False)
+def cached_df(_client, uri):
+    """
+    Retrieves the disk usage report for a Podman connection and caches it.
+
+    Args:
+        _client (PodmanClient): The client object used to call `df()`. Excluded from the cache key.
+        uri (str): The connection URI, used as the cache key.
+
+    Returns:
+        dict: The disk usage report with "Containers", "Images" and "Volumes" entries.
+    """
+    return prefetch_utils.df(_client)
+
+def get_disk_usage(client):
+    """
+    Retrieves the cached disk usage report for the currently selected connection.
+
+    Args:
+        client (PodmanClient): The client object used to interact with the Podman API.
+
+    Returns:
+        dict: The disk usage report returned by `client.df()`.
+    """
+    return cached_df(client, st.session_state.get("selected_uri"))
+
+def clear_disk_usage(uri=None):
+    """
+    Clears one connection's cached disk usage report so the next call re-queries Podman.
+
+    Args:
+        uri (str): The connection URI, the currently selected one by default.
+
+    Returns:
+        None
+    """
+    cached_df.clear(None, uri or st.session_state.get("selected_uri"))
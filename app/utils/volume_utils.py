@@ -0,0 +1,52 @@
+def mounted_volumes(container):
+    """
+    Returns the names of the named volumes an inspected container mounts.
+
+    Args:
+        container (Container): An inspected Podman container object.
+
+    Returns:
+        list: The volume names.
+    """
+    return [
+        mount["Name"] for mount in container.attrs.get("Mounts") or []
+        # list() payloads only carry mount destinations, inspect payloads carry dicts
+        if isinstance(mount, dict) and mount.get("Type") == "volume" and mount.get("Name")
+    ]
+
+def build_mount_index(containers):
+    """
+    Builds an index of volume names to the names of the containers that mount them.
+
+    Args:
+        containers (iterable): Inspected Podman container objects, or `ContainerRecord`s from
+            `st.session_state.container_records`, which carry their mounted volume names.
+
+    Returns:
+        dict: A mapping of volume name to a sorted list of container names.
+    """
+    index = {}
+    for container in containers:
+        # records carry no inspect payload, just the volume names
+        volumes = mounted_volumes(container) if hasattr(container, "attrs") else container.volumes
+        for volume in volumes:
+            index.setdefault(volume, set()).add(container.name)
+    return {name: sorted(users) for name, users in index.items()}
+
+def build_usage_index(disk_usage):
+    """
+    Builds an index of volume names to their disk usage entries.
+
+    Args:
+        disk_usage (dict): The disk usage report returned by `client.df()`.
+
+    Returns:
+        dict: A mapping of volume name to its `Size` and `ReclaimableSize` in bytes.
+    """
+    return {
+        volume["VolumeName"]: {
+            "Size": volume.get("Size", 0),
+            "ReclaimableSize": volume.get("ReclaimableSize", 0),
+        }
+        for volume in disk_usage.get("Volumes") or []
+    }
@@ -0,0 +1,88 @@
+"""
+Measures cold-start time-to-first-render of the Streamlit pages against a fake Podman socket.
+
+Each page is rendered in a fresh interpreter with Streamlit's AppTest, so module imports
+are paid exactly as on the first request after a container restart. The run fails when a
+page exceeds `--max-seconds`, which makes it usable as a regression check.
+
+Usage:
+    python benchmarks/cold_start.py --runs 3 --containers 200 --max-seconds 10
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+from fake_podman import build_inventory, serve
+
+APP_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app")
+PAGES = ["app.py", os.path.join("pages", "container_stats.py")]
+
+# runs inside the fresh interpreter; everything it imports counts towards the cold start
+RENDER_SCRIPT = """
+import json, sys, time
+start = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+streamlit_loaded = time.perf_counter()
+at = AppTest.from_file(sys.argv[1], default_timeout=120).run()
+done = time.perf_counter()
+heavy = [name for name in ("pandas", "numpy", "altair", "dateutil", "tzlocal") if name in sys.modules]
+print(json.dumps({
+    "streamlit_import": streamlit_loaded - start,
+    "first_render": done - streamlit_loaded,
+    "exceptions": [str(e.value) for e in at.exception] + [str(e.value) for e in at.error],
+    "heavy_modules": heavy,
+}))
+"""
+
+def render_once(page, uri):
+    """
+    Renders a page once in a fresh interpreter.
+
+    Args:
+        page (str): The page path, relative to the app directory.
+        uri (str): The Podman URI the page should connect to.
+
+    Returns:
+        dict: The timings, uncaught exceptions and heavy modules loaded by the render.
+    """
+    env = {**os.environ, "PODMAN_STREAMLIT_URI": uri, "PYTHONDONTWRITEBYTECODE": "1"}
+    result = subprocess.run(
+        [sys.executable, "-c", RENDER_SCRIPT, page],
+        cwd=APP_DIR, env=env, capture_output=True, text=True, check=True,
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument("--runs", type=int, default=3, help="Cold renders per page.")
+    arg_parser.add_argument("--containers", type=int, default=50, help="Containers in the fake inventory.")
+    arg_parser.add_argument("--images", type=int, default=20, help="Images in the fake inventory.")
+    arg_parser.add_argument("--max-seconds", type=float, default=None, help="Fail if a page's median first render is slower.")
+    args = arg_parser.parse_args()
+
+    socket_path = os.path.join(tempfile.mkdtemp(), "podman.sock")
+    server = serve(socket_path, build_inventory(containers=args.containers, images=args.images))
+    failed = False
+    try:
+        for page in PAGES:
+            runs = [render_once(page, f"unix://{socket_path}") for _ in range(args.runs)]
+            first_render = statistics.median(run["first_render"] for run in runs)
+            streamlit_import = statistics.median(run["streamlit_import"] for run in runs)
+            print(f"{page}: first render {first_render:.3f}s (median of {args.runs}), streamlit import {streamlit_import:.3f}s")
+            print(f"  heavy modules loaded: {', '.join(runs[-1]['heavy_modules']) or 'none'}")
+            for exception in runs[-1]["exceptions"]:
+                print(f"  exception: {exception}")
+                failed = True
+            if args.max_seconds is not None and first_render > args.max_seconds:
+                print(f"  slower than {args.max_seconds:.3f}s")
+                failed = True
+    finally:
+        server.shutdown()
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
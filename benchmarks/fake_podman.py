@@ -0,0 +1,290 @@
+"""
+A fake Podman service that answers the libpod endpoints the app uses with canned data.
+
+It listens on a unix socket so the app can be pointed at it with `PODMAN_STREAMLIT_URI`,
+which makes startup and rerun timings reproducible without a real Podman host.
+
+Usage:
+    python benchmarks/fake_podman.py --socket /tmp/fake-podman.sock --containers 200
+"""
+import argparse
+import hashlib
+import io
+import itertools
+import json
+import os
+import re
+import socketserver
+import tarfile
+import threading
+from http.server import BaseHTTPRequestHandler
+from urllib.parse import parse_qs
+
+CREATED = "2024-01-01T00:00:00Z"
+
+def fake_id(kind, index):
+    """
+    Returns a deterministic 64 character ID whose 12 character short form is unique too.
+    """
+    return hashlib.sha256(f"{kind}-{index}".encode()).hexdigest()
+
+def build_inventory(containers=50, images=20, volumes=20, networks=5, pods=5, secrets=5):
+    """
+    Builds a deterministic inventory of fake Podman objects.
+
+    Args:
+        containers (int): The number of containers.
+        images (int): The number of images.
+        volumes (int): The number of volumes.
+        networks (int): The number of networks.
+        pods (int): The number of pods.
+        secrets (int): The number of secrets.
+
+    Returns:
+        dict: The list and inspect payloads keyed by resource type.
+    """
+    image_ids = [fake_id("image", i) for i in range(images)]
+    base_layers = [f"sha256:{'b' * 60}{i:04d}" for i in range(3)]
+    image_list = [{
+        "Id": image_id,
+        "ParentId": "",
+        "RepoTags": [f"localhost/image-{i}:latest"],
+        "Created": 1704067200,
+        "Size": 100 * 1024 * 1024 + i * 1024 * 1024,
+        "Containers": 0,
+    } for i, image_id in enumerate(image_ids)]
+    image_inspect = {image["Id"]: {
+        **image,
+        "Parent": "",
+        "RootFS": {"Type": "layers", "Layers": base_layers + [f"sha256:{image['Id']}"]},
+    } for image in image_list}
+
+    container_list = []
+    container_inspect = {}
+    for i in range(containers):
+        container_id = fake_id("container", i)
+        image_id = image_ids[i % len(image_ids)] if image_ids else ""
+        state = "running" if i % 3 else "exited"
+        container_list.append({
+            "Id": container_id,
+            "Names": [f"container-{i}"],
+            "State": state,
+            "Created": CREATED,
+            "StartedAt": 1704067200,
+            "ExitedAt": 0,
+            "ImageID": image_id,
+            "Image": f"localhost/image-{i % max(images, 1)}:latest",
+            "Mounts": [f"/data-{i}"],
+        })
+        container_inspect[container_id] = {
+            "Id": container_id,
+            "Name": f"container-{i}",
+            "Created": CREATED,
+            "Image": image_id,
+            "ImageName": f"localhost/image-{i % max(images, 1)}:latest",
+            "State": {"Status": state, "Running": state == "running", "StartedAt": CREATED},
+            "Config": {
+                "CreateCommand": ["/usr/bin/podman", "run", "-d", "--name", f"container-{i}", f"localhost/image-{i % max(images, 1)}:latest"],
+                "Env": ["PATH=/usr/bin"],
+                "Labels": {"app": f"group-{i % 5}"},
+            },
+            "HostConfig": {"RestartPolicy": {"Name": "no"}},
+            "NetworkSettings": {"Ports": {"80/tcp": [{"HostIp": "", "HostPort": str(8000 + i)}]}},
+            "Mounts": [{"Type": "volume", "Name": f"volume-{i % max(volumes, 1)}", "Source": "", "Destination": f"/data-{i}"}],
+        }
+
+    return {
+        "containers": container_list,
+        "container_inspect": container_inspect,
+        "images": image_list,
+        "image_inspect": image_inspect,
+        "volumes": [{
+            "Name": f"volume-{i}", "Driver": "local", "Scope": "local", "CreatedAt": CREATED,
+            "Mountpoint": f"/var/lib/containers/storage/volumes/volume-{i}/_data",
+        } for i in range(volumes)],
+        "networks": [{
+            "name": f"network-{i}", "id": fake_id("network", i), "driver": "bridge", "created": CREATED,
+        } for i in range(networks)],
+        "pods": [{
+            "Id": fake_id("pod", i), "Name": f"pod-{i}", "Created": CREATED, "Status": "Running",
+            "Containers": [{"Id": fake_id("container", i), "Status": "running"}],
+        } for i in range(pods)],
+        "secrets": [{
+            "ID": f"{i + 1:025x}", "Spec": {"Name": f"secret-{i}"}, "CreatedAt": CREATED,
+        } for i in range(secrets)],
+        "df": {
+            "Images": [{
+                "Repository": f"localhost/image-{i}", "Tag": "latest", "ImageID": image["Id"],
+                "Size": image["Size"], "SharedSize": 3 * 1024 * 1024, "UniqueSize": image["Size"] - 3 * 1024 * 1024,
+                "Containers": 1,
+            } for i, image in enumerate(image_list)],
+            "Containers": [{
+                "ContainerID": c["Id"], "Names": c["Names"][0], "Status": c["State"], "Size": 1024 * 1024,
+                "RWSize": 1024, "Image": c["Image"],
+            } for c in container_list],
+            "Volumes": [{
+                "VolumeName": f"volume-{i}", "Links": 1, "Size": 10 * 1024 * 1024, "ReclaimableSize": 0,
+            } for i in range(volumes)],
+        },
+        "info": {"store": {
+            "graphRoot": "/var/lib/containers/storage",
+            "graphRootAllocated": 100 * 1024 ** 3,
+            "graphRootUsed": 40 * 1024 ** 3,
+        }},
+        "version": {
+            "Version": "5.0.0", "ApiVersion": "1.41", "Arch": "amd64", "GoVersion": "go1.22",
+            "Os": "linux", "Components": [{"Name": "Podman Engine", "Details": {"Os": "linux"}}],
+        },
+    }
+
+def stats_sample(container_id, inventory, counter=itertools.count(1)):
+    """
+    Builds an ever-increasing stats sample for a container.
+
+    Args:
+        container_id (str): The container to report on.
+        inventory (dict): The payloads returned by `build_inventory`.
+        counter (itertools.count): Shared tick counter driving the monotonically increasing counters.
+
+    Returns:
+        dict: A libpod stats response with one sample.
+    """
+    tick = next(counter)
+    inspect = inventory["container_inspect"].get(container_id, {})
+    return {"Error": None, "Stats": [{
+        "ContainerID": container_id,
+        "Name": inspect.get("Name", ""),
+        "SystemNano": tick * 1_000_000_000,
+        "CPUNano": tick * 250_000_000,
+        "MemUsage": 64 * 1024 * 1024 + tick % 10 * 1024 * 1024,
+        "MemLimit": 512 * 1024 * 1024,
+        "PIDs": 4 + tick % 3,
+        "BlockInput": tick * 4096,
+        "BlockOutput": tick * 8192,
+        "Network": {"eth0": {"RxBytes": tick * 2048, "TxBytes": tick * 1024}},
+    }]}
+
+def make_handler(inventory):
+    """
+    Creates a request handler class serving the given inventory.
+
+    Args:
+        inventory (dict): The payloads returned by `build_inventory`.
+
+    Returns:
+        type: A `BaseHTTPRequestHandler` subclass.
+    """
+    routes = [
+        (r"/_ping$", lambda match: "OK"),
+        (r"/version$", lambda match: inventory["version"]),
+        (r"/info$", lambda match: inventory["info"]),
+        (r"/system/df$", lambda match: inventory["df"]),
+        (r"/containers/json$", lambda match: inventory["containers"]),
+        (r"/containers/([^/]+)/json$", lambda match: inventory["container_inspect"].get(match.group(1))),
+        (r"/images/json$", lambda match: inventory["images"]),
+        (r"/images/([^/]+)/json$", lambda match: inventory["image_inspect"].get(match.group(1))),
+        (r"/volumes/json$", lambda match: inventory["volumes"]),
+        (r"/networks/json$", lambda match: inventory["networks"]),
+        (r"/pods/json$", lambda match: inventory["pods"]),
+        (r"/secrets/json$", lambda match: inventory["secrets"]),
+    ]
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def address_string(self):
+            return "fake-podman"
+
+        def log_message(self, format, *args):
+            pass
+
+        def do_GET(self):
+            path, _, query = self.path.partition("?")
+            if path.endswith("/containers/stats"):
+                container_id = parse_qs(query).get("containers", [""])[0]
+                return self.respond(200, stats_sample(container_id, inventory))
+            for pattern, handler in routes:
+                match = re.search(pattern, path)
+                if match:
+                    payload = handler(match)
+                    if payload is not None:
+                        return self.respond(200, payload)
+            self.respond(404, {"cause": "no such object", "message": f"{path} not found", "response": 404})
+
+        def do_POST(self):
+            path = self.path.partition("?")[0]
+            if re.search(r"/(containers|pods|images|volumes)/prune$", path):
+                # nothing is ever removed from the canned inventory
+                return self.respond(200, [])
+            if path.endswith("/build"):
+                return self.build(parse_qs(self.path.partition("?")[2]))
+            self.respond(404, {"cause": "no such object", "message": f"{path} not found", "response": 404})
+
+        def read_body(self):
+            if self.headers.get("Transfer-Encoding", "").lower() != "chunked":
+                return self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            body = bytearray()
+            while size := int(self.rfile.readline().split(b";")[0], 16):
+                body += self.rfile.read(size)
+                self.rfile.readline()
+            self.rfile.readline()
+            return bytes(body)
+
+        def build(self, params):
+            # reads the whole context, then reports a two-step build of it; nothing is added to the inventory
+            with tarfile.open(fileobj=io.BytesIO(self.read_body())) as context:
+                names = context.getnames()
+            containerfile = params.get("dockerfile", ["Containerfile"])[0]
+            if containerfile not in names:
+                return self.respond(200, json.dumps({"error": f"no Containerfile {containerfile} in the context"}) + "\n")
+            image_id = fake_id("build", len(names))
+            lines = [
+                {"stream": "STEP 1/2: FROM scratch\n"},
+                {"stream": f"STEP 2/2: COPY . /context ({len(names)} entries)\n"},
+                {"stream": f"COMMIT {params.get('t', [''])[0]}\n"},
+                {"stream": f"{image_id}\n"},
+            ]
+            self.respond(200, "".join(json.dumps(line) + "\n" for line in lines))
+
+        def respond(self, status, payload):
+            body = payload.encode() if isinstance(payload, str) else json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    return Handler
+
+class FakePodmanServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+def serve(socket_path, inventory):
+    """
+    Starts the fake Podman service on a background thread.
+
+    Args:
+        socket_path (str): The unix socket path to listen on.
+        inventory (dict): The payloads returned by `build_inventory`.
+
+    Returns:
+        FakePodmanServer: The running server. Call `shutdown()` to stop it.
+    """
+    if os.path.exists(socket_path):
+        os.unlink(socket_path)
+    server = FakePodmanServer(socket_path, make_handler(inventory))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument("--socket", default="/tmp/fake-podman.sock")
+    arg_parser.add_argument("--containers", type=int, default=50)
+    arg_parser.add_argument("--images", type=int, default=20)
+    args = arg_parser.parse_args()
+    fake = serve(args.socket, build_inventory(containers=args.containers, images=args.images))
+    print(f"Fake Podman listening on unix://{args.socket}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        fake.shutdown()